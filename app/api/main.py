@@ -1,13 +1,50 @@
 import os
-from fastapi import FastAPI, Depends, Request, Body
+import math
+import asyncio
+import numpy as np
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, Body
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from app.services.agent import LoanCalculatorService
+from pydantic import BaseModel, Field
+from app.services.agent import LoanCalculatorService, StockService, RestaurantService, ShoppingService
 from app.schemas.models import A2UIResponse, TextResponse
-from typing import Union, Dict, Any, Optional
+from app.schemas.encoding import encode_response, to_wire, dumps
+from typing import Union, Dict, Any, List, Optional, Tuple, Annotated
 from app.services.llm_wrapper import LLMWrapper
+from app.services import runtime
+from app.services.amortization import MAX_RATE, MAX_YEARS
+from app.services.singleflight import SingleFlight, normalize_args
+from app.services.surface_registry import default_registry
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared pooled HTTP client and blocking-call worker pool live as long as the app
+    await runtime.startup()
+    flusher = asyncio.create_task(flush_route_cache()) if llm.route_cache.path else None
+    yield
+    if flusher is not None:
+        flusher.cancel()
+    await runtime.shutdown()
+    llm.route_cache.flush()
+
+async def flush_route_cache():
+    # Route cache puts only mark it dirty; the JSON dump runs here, on the worker pool
+    while True:
+        await asyncio.sleep(llm.route_cache.flush_seconds)
+        await runtime.run_blocking(llm.route_cache.flush)
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # The default 422 echoes each bad input back, which fails for NaN/Infinity (not valid JSON)
+    def printable(value):
+        return str(value) if isinstance(value, float) and not math.isfinite(value) else value
+    errors = [{**error, "input": printable(error.get("input"))} for error in exc.errors()]
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
 
 # Mount static files
 static_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "static"))
@@ -16,9 +53,198 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 agent = LoanCalculatorService()
 llm = LLMWrapper()
 
+# Services are stateless apart from shared runtime resources, so one instance each is enough
+services = {
+    "stock": StockService(),
+    "restaurant": RestaurantService(),
+    "loan": agent,
+    "shopping": ShoppingService(),
+}
+
 class ChatRequest(BaseModel):
     text: str
     client_context: Optional[Dict[str, Any]] = None
+    # The surface a UI action came from, so its answer can update that surface in place
+    surface_id: Optional[str] = None
+
+class SurfaceRefreshRequest(BaseModel):
+    # The tool call behind one widget (sent with its a2ui event) and the widget's root id
+    tool_name: str
+    tool_args: Dict[str, Any] = {}
+    surface_root: str
+
+# Loan inputs, checked before anything is allocated (422 otherwise); amortization checks them again
+Principal = Annotated[float, Field(gt=0, allow_inf_nan=False)]
+Rate = Annotated[float, Field(ge=0, le=MAX_RATE, allow_inf_nan=False)]
+Years = Annotated[float, Field(gt=0, le=MAX_YEARS, allow_inf_nan=False)]
+
+class LoanBatchRequest(BaseModel):
+    # Each field is one value or a list; the batch is every principal x rate x years combination
+    principal: Union[Principal, List[Principal]]
+    rate: Union[Rate, List[Rate]]
+    years: Union[Years, List[Years]]
+    schedule: bool = False
+
+# Upper bound on tool calls running at the same time for one query (/chat and /chat/stream)
+MAX_CONCURRENT_TOOLS = int(os.environ.get("A2UI_MAX_CONCURRENT_TOOLS", "4"))
+
+# Tools with side effects must run once per request, never shared between callers
+NON_COALESCED_TOOLS = {"reserve_table"}
+
+tool_flight = SingleFlight()
+
+# Last surface sent per client session (X-A2UI-Session) and surface id
+surface_registry = default_registry()
+
+# Header listing optional A2UI features the client can decode, e.g. "chart-columns"
+CAPABILITIES_HEADER = "x-a2ui-capabilities"
+
+def client_capabilities(request: Request) -> frozenset:
+    header = request.headers.get(CAPABILITIES_HEADER, "")
+    return frozenset(c.strip().lower() for c in header.split(",") if c.strip())
+
+def chart_point_budget(request: Request, chat_req: Optional[ChatRequest] = None) -> int:
+    """Chart point budget from the X-A2UI-Chart-Points header or client_context["chart_points"], else the server default."""
+    from app.services.chart_series import point_budget
+    requested = request.headers.get("x-a2ui-chart-points")
+    if requested is None and chat_req is not None and chat_req.client_context:
+        requested = chat_req.client_context.get("chart_points")
+    return point_budget(requested)
+
+async def execute_tool_call(tool_name: str, args: Dict[str, Any], services: Dict[str, Any], is_ui_mode: bool = True,
+                            chart_columns: bool = False, chart_points: Optional[int] = None) -> Tuple[Any, str]:
+    """
+    Run a tool call, sharing one upstream fetch between concurrent identical
+    calls (same tool name, normalized args and output format) from any request.
+    """
+    if tool_name in NON_COALESCED_TOOLS:
+        return await _dispatch_tool_call(tool_name, args, services, is_ui_mode, chart_columns, chart_points)
+    key = (tool_name, normalize_args(args), is_ui_mode, chart_columns, chart_points)
+    return await tool_flight.do(key, lambda: _dispatch_tool_call(tool_name, args, services, is_ui_mode, chart_columns, chart_points))
+
+async def _dispatch_tool_call(tool_name: str, args: Dict[str, Any], services: Dict[str, Any], is_ui_mode: bool = True,
+                              chart_columns: bool = False, chart_points: Optional[int] = None) -> Tuple[Any, str]:
+    """
+    Run a single tool call against the service instances and return (res, context).
+    Naver lookups use the async client; blocking yfinance calls go through the worker pool.
+    Charts use the columnar format when `chart_columns` (the client advertised chart-columns)
+    and are downsampled to `chart_points` (server default when None).
+    Never raises: a failing tool yields a TextResponse and an error context instead.
+    """
+    stock_service = services["stock"]
+    restaurant_service = services["restaurant"]
+    loan_service = services["loan"]
+    shopping_service = services["shopping"]
+
+    res = None
+    context = ""
+    try:
+        if tool_name == "get_stock_chart":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_stock_chart, symbol, chart_columns, chart_points,
+                                                      period=args.get("period") or "1y", interval=args.get("interval"))
+
+        elif tool_name == "compare_stocks":
+            res, context = await runtime.run_blocking(stock_service.compare_stocks, args.get("symbols") or [], chart_columns,
+                                                      chart_points, period=args.get("period") or "1y")
+
+        elif tool_name == "backtest_strategy":
+            params = {key: args[key] for key in ("period", "fast", "slow", "rsi_low", "rsi_high") if args.get(key) is not None}
+            res, context = await runtime.run_blocking(stock_service.backtest_strategy, args.get("symbol"),
+                                                      args.get("strategy") or "ma_cross", columns=chart_columns,
+                                                      max_points=chart_points, **params)
+
+        elif tool_name == "screen_stocks":
+            options = {key: args[key] for key in ("universe", "symbols", "sort_by", "descending", "limit") if args.get(key) is not None}
+            res, context = await runtime.run_blocking(stock_service.screen_stocks, args.get("conditions") or [], **options)
+
+        elif tool_name == "find_places":
+            location = args.get("location")
+            keyword = args.get("keyword")
+            res, context = await restaurant_service.find_places_async(location, keyword)
+
+        elif tool_name == "reserve_table":
+            r_name = args.get("restaurant_name")
+            date = args.get("date")
+            guests = int(args.get("guests", 2))
+            res, context = restaurant_service.reserve_table(r_name, date, guests)
+
+        elif tool_name == "calculate_loan":
+            principal = float(args.get("principal", 0))
+            rate = float(args.get("rate", 0))
+            years = int(args.get("years", 0))
+            res, context = loan_service.calculate_loan(principal, rate, years, is_ui_mode=is_ui_mode,
+                                                       columns=chart_columns, max_points=chart_points)
+
+        elif tool_name == "get_stock_news":
+            symbol = args.get("symbol")
+            print(f"Calling get_stock_news for symbol: {symbol}")
+            res, context = await runtime.run_blocking(stock_service.get_stock_news, symbol)
+            print(f"get_stock_news returned: type={type(res).__name__}")
+
+        elif tool_name == "search_products":
+            query = args.get("query")
+            res, context = await shopping_service.search_products_async(query)
+
+        elif tool_name == "get_stock_info":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_stock_info, symbol)
+
+        elif tool_name == "get_technical_indicators":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_technical_indicators, symbol, args.get("indicators"))
+
+        elif tool_name == "get_company_fundamentals":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_company_fundamentals, symbol)
+
+        elif tool_name == "get_stock_dividends":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_stock_dividends, symbol, chart_columns, chart_points)
+
+        elif tool_name == "get_stock_holders":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_stock_holders, symbol)
+
+        elif tool_name == "get_stock_calendar":
+            symbol = args.get("symbol")
+            res, context = await runtime.run_blocking(stock_service.get_stock_calendar, symbol)
+
+    except Exception as e:
+        print(f"Tool Error ({tool_name}): {e}")
+        return TextResponse(text=f"Error running {tool_name}: {e}"), f"Error running {tool_name}: {e}"
+
+    # Some early-return paths hand back a bare response without context
+    if not isinstance(context, str):
+        context = ""
+    return res, context
+
+def json_response(res) -> Response:
+    """Write the pre-encoded response body instead of re-validating it through response_model."""
+    return Response(content=encode_response(res), media_type="application/json")
+
+def track_surface(request: Request, res, root: Optional[str] = None):
+    """
+    Record an A2UI response in the client session's surface registry. A response for the
+    widget the client shows under `root` is answered with only the changed components.
+    """
+    session = request.headers.get("x-a2ui-session")
+    if not session or not isinstance(res, A2UIResponse):
+        return res
+    diff = surface_registry.update(session, to_wire(res)["data"], root)
+    if diff is None:
+        return res
+    from app.schemas.builder import finish
+    return finish(diff)
+
+def a2ui_event(res, tool_name: str, args: Dict[str, Any]) -> bytes:
+    """
+    An `a2ui` SSE event carrying the tool call that produced it, so the widget can be refreshed
+    by re-running only that call. The call is spliced in front of the encoded response, which
+    is shared by coalesced callers and written as-is.
+    """
+    body = encode_response(res)
+    return b'event: a2ui\ndata: {"tool":' + dumps({"name": tool_name, "args": args}) + b"," + body[1:] + b"\n\n"
 
 @app.post("/chat", response_model=Union[A2UIResponse, TextResponse])
 async def chat(request: Request, chat_req: ChatRequest):
@@ -26,6 +252,8 @@ async def chat(request: Request, chat_req: ChatRequest):
     
     # Check client A2UI capability
     is_a2ui_client = request.headers.get("x-client-a2ui") == "true"
+    chart_columns = "chart-columns" in client_capabilities(request)
+    chart_points = chart_point_budget(request, chat_req)
     
     # Handle Recalculate Logic (Explicit Button Clicks)
     # This bypasses the LLM because it's a direct action from the UI
@@ -34,85 +262,43 @@ async def chat(request: Request, chat_req: ChatRequest):
          principal = float(context.get("principal", 0))
          rate = float(context.get("annualRate", 0))
          years = int(float(context.get("years", 0)))
-         return agent.calculate_loan(principal, rate, years, is_ui_mode=is_a2ui_client)
+         uid = context.get("uid")
+         if is_a2ui_client and chat_req.surface_id and uid:
+             # Only the new values (and schedule chart) of the surface the button belongs to
+             res, _ = await runtime.run_blocking(agent.recalculate_loan, principal, rate, years, chat_req.surface_id, uid,
+                                                 columns=chart_columns, max_points=chart_points)
+             # Keep the session's copy of that widget (loan_result's root is <uid>_root) current
+             res = track_surface(request, res, f"{uid}_root")
+         else:
+             res, _ = await runtime.run_blocking(agent.calculate_loan, principal, rate, years, is_ui_mode=is_a2ui_client,
+                                                 columns=chart_columns, max_points=chart_points)
+         return json_response(res)
 
     # Use LLM for Natural Language Understanding
-    processed = llm.process_query(text)
+    processed = await llm.process_query(text)
     
     if processed["type"] == "multiple_tool_calls":
         calls = processed["calls"]
-        responses = []
-        
-        from app.services.agent import RestaurantService, StockService, ShoppingService
-        restaurant_service = RestaurantService()
-        stock_service = StockService()
-        shopping_service = ShoppingService()
-        
-        for call in calls:
-            tool_name = call["tool_name"]
-            args = call["tool_args"]
-            
-            if tool_name == "calculate_loan":
-                principal = float(args.get("principal", 0))
-                rate = float(args.get("rate", 0))
-                years = int(args.get("years", 0))
-                res, _ = agent.calculate_loan(principal, rate, years, is_ui_mode=is_a2ui_client)
-                
-            elif tool_name == "find_places":
-                location = args.get("location")
-                keyword = args.get("keyword")
-                res, _ = restaurant_service.find_places(location, keyword)
-                
-            elif tool_name == "reserve_table":
-                r_name = args.get("restaurant_name")
-                date = args.get("date")
-                guests = int(args.get("guests", 2))
-                res, _ = restaurant_service.reserve_table(r_name, date, guests)
-
-            elif tool_name == "search_products":
-                query = args.get("query")
-                res, _ = shopping_service.search_products(query)
-
-            elif tool_name == "get_stock_info":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_stock_info(symbol)
-
-            elif tool_name == "get_technical_indicators":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_technical_indicators(symbol)
-
-            elif tool_name == "get_company_fundamentals":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_company_fundamentals(symbol)
-
-            elif tool_name == "get_stock_chart":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_stock_chart(symbol)
-
-            elif tool_name == "get_stock_dividends":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_stock_dividends(symbol)
-
-            elif tool_name == "get_stock_holders":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_stock_holders(symbol)
-
-            elif tool_name == "get_stock_calendar":
-                symbol = args.get("symbol")
-                res, _ = stock_service.get_stock_calendar(symbol)
-                
-            if res:
-                responses.append(res)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOLS)
+
+        async def run_call(call):
+            async with semaphore:
+                return await execute_tool_call(call["tool_name"], call["tool_args"], services, is_ui_mode=is_a2ui_client,
+                                               chart_columns=chart_columns, chart_points=chart_points)
+
+        results = await asyncio.gather(*[run_call(call) for call in calls])
+        responses = [res for res, _ in results if res]
         
         # Merge Responses
         if not responses:
-            return TextResponse(text="No tools executed.")
+            return json_response(TextResponse(text="No tools executed."))
             
         if len(responses) == 1:
-            return responses[0]
+            return json_response(responses[0])
             
-        # Dashboard Merge Logic
-        from app.schemas.models import A2UIData, SurfaceUpdate, DataModelUpdate, BeginRendering, ComponentEntry, ComponentType, ColumnComponent, ColumnChildren
+        # Dashboard Merge Logic (on the wire dicts, so trusted surfaces are never re-validated)
+        from app.schemas.builder import wire, finish
+        from app.schemas.models import SurfaceUpdate, DataModelUpdate, BeginRendering, ComponentEntry, ComponentType, ColumnComponent, ColumnChildren
         
         merged_components = []
         merged_data_contents = []
@@ -124,50 +310,94 @@ async def chat(request: Request, chat_req: ChatRequest):
                  # Better: Create a simple TextComponent
                  pass
             elif isinstance(r, A2UIResponse):
+                 data = to_wire(r)["data"]
                  # Add components
-                 if r.data.surfaceUpdate:
-                     merged_components.extend(r.data.surfaceUpdate.components)
+                 if data["surfaceUpdate"]:
+                     merged_components.extend(data["surfaceUpdate"]["components"])
                      # Track the root of this sub-surface
-                     if r.data.beginRendering:
-                         root_ids.append(r.data.beginRendering.root)
+                     if data["beginRendering"]:
+                         root_ids.append(data["beginRendering"]["root"])
                  
                  # Add data model
-                 if r.data.dataModelUpdate:
-                     merged_data_contents.extend(r.data.dataModelUpdate.contents)
+                 if data["dataModelUpdate"]:
+                     merged_data_contents.extend(data["dataModelUpdate"]["contents"])
 
         # Create Dashboard Root
         import uuid
-        dash_root_id = f"dashboard_{str(uuid.uuid4())[:8]}"
+        dash_root_id = f"{str(uuid.uuid4())[:8]}_dashboard"
         
-        dashboard_col = ComponentEntry(
+        dashboard_col = wire(ComponentEntry,
             id=dash_root_id,
-            component=ComponentType(
-                Column=ColumnComponent(
-                    children=ColumnChildren(explicitList=root_ids)
+            component=wire(ComponentType,
+                Column=wire(ColumnComponent,
+                    children=wire(ColumnChildren, explicitList=root_ids)
                 )
             )
         )
         merged_components.insert(0, dashboard_col)
         
-        return A2UIResponse(
-            data=A2UIData(
-                surfaceUpdate=SurfaceUpdate(
-                    surfaceId="dashboard",
-                    components=merged_components
-                ),
-                dataModelUpdate=DataModelUpdate(
-                    surfaceId="dashboard",
-                    contents=merged_data_contents
-                ),
-                beginRendering=BeginRendering(
-                    surfaceId="dashboard",
-                    root=dash_root_id
-                )
-            )
-        )
+        return json_response(finish({
+            "surfaceUpdate": wire(SurfaceUpdate, surfaceId="dashboard", components=merged_components),
+            "dataModelUpdate": wire(DataModelUpdate, surfaceId="dashboard", contents=merged_data_contents),
+            "beginRendering": wire(BeginRendering, surfaceId="dashboard", root=dash_root_id),
+        }))
             
     # Default Text Response
-    return TextResponse(text=processed.get("text", "I didn't understand that."))
+    return json_response(TextResponse(text=processed.get("text", "I didn't understand that.")))
+
+@app.post("/surface/refresh", response_model=Union[A2UIResponse, TextResponse])
+async def refresh_surface(request: Request, req: SurfaceRefreshRequest):
+    """
+    Re-run the tool call behind one widget. If the session still holds that widget
+    (`surface_root`) the answer is a diff against it, else the full surface.
+    """
+    if req.tool_name in NON_COALESCED_TOOLS:
+        raise HTTPException(status_code=400, detail=f"{req.tool_name} cannot be refreshed")
+    res, _ = await execute_tool_call(req.tool_name, req.tool_args, services,
+                                     chart_columns="chart-columns" in client_capabilities(request),
+                                     chart_points=chart_point_budget(request))
+    return json_response(track_surface(request, res, req.surface_root))
+
+@app.post("/loan/batch")
+def loan_batch(req: LoanBatchRequest):
+    """
+    What-if loan grid in one call: columnar arrays with one entry per scenario.
+    With `schedule` (at most amortization.MAX_SCHEDULE_SCENARIOS scenarios) each
+    scenario also gets its monthly balance / principal / interest arrays.
+    """
+    from app.services import amortization
+
+    try:
+        result = amortization.grid(req.principal, req.rate, req.years)
+        count = len(result["monthly"])
+        if req.schedule and count > amortization.MAX_SCHEDULE_SCENARIOS:
+            raise ValueError(f"Schedules are limited to {amortization.MAX_SCHEDULE_SCENARIOS} scenarios ({count} requested)")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = {
+        "count": count,
+        "scenarios": {key: np.round(values, 2).tolist() for key, values in result.items()},
+    }
+    if req.schedule:
+        schedule = amortization.schedule(result["principal"], result["rate"], result["years"])
+        # Trim each row to its own term
+        response["schedules"] = [
+            {key: np.round(values[i, :months], 2).tolist() for key, values in schedule.items()}
+            for i, months in enumerate(result["months"].tolist())
+        ]
+    return response
+
+@app.get("/debug/stats")
+def debug_stats():
+    return {
+        "singleflight": tool_flight.stats(),
+        "route_cache": llm.route_cache.stats(),
+        "fast_router": llm.fast_router.stats(),
+        "price_history": StockService.price_history.stats(),
+        "indicator_engines": StockService.indicator_engines.stats(),
+        "snapshots": StockService.snapshots.stats(),
+        "surfaces": surface_registry.stats(),
+    }
 
 @app.get("/")
 def read_root():
@@ -181,100 +411,56 @@ async def chat_stream(request: Request, chat_req: ChatRequest):
     """
     from fastapi.responses import StreamingResponse
     import json
-    import asyncio
     
     text = chat_req.text
     is_a2ui_client = request.headers.get("x-client-a2ui") == "true"
+    chart_columns = "chart-columns" in client_capabilities(request)
+    chart_points = chart_point_budget(request, chat_req)
     
     async def event_generator():
         import logging
         logger = logging.getLogger(__name__)
         
         # Process the query
-        processed = llm.process_query(text)
+        processed = await llm.process_query(text)
         logger.info(f"Stream endpoint received query: {text[:50]}... | Type: {processed['type']}")
         
         if processed["type"] == "multiple_tool_calls":
-            from app.services.agent import StockService, RestaurantService, LoanCalculatorService, ShoppingService
-            stock_service = StockService()
-            restaurant_service = RestaurantService()
-            loan_service = LoanCalculatorService()
-            shopping_service = ShoppingService()
-            
-            context_accumulator = []
-
-            for call in processed["calls"]:
-                tool_name = call["tool_name"]
-                args = call["tool_args"]
-                
-                res = None
-                context = ""
-                
-                if tool_name == "get_stock_chart":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_stock_chart(symbol)
-                
-                elif tool_name == "find_places":
-                    location = args.get("location")
-                    keyword = args.get("keyword")
-                    res, context = restaurant_service.find_places(location, keyword)
-                
-                elif tool_name == "reserve_table":
-                    r_name = args.get("restaurant_name")
-                    date = args.get("date")
-                    guests = int(args.get("guests", 2))
-                    res, context = restaurant_service.reserve_table(r_name, date, guests)
-                
-                elif tool_name == "calculate_loan":
-                    principal = float(args.get("principal", 0))
-                    rate = float(args.get("rate", 0))
-                    years = int(args.get("years", 0))
-                    res, context = loan_service.calculate_loan(principal, rate, years, is_ui_mode=True)
-                
-                elif tool_name == "get_stock_news":
-                    symbol = args.get("symbol")
-                    print(f"Calling get_stock_news for symbol: {symbol}")
-                    res, context = stock_service.get_stock_news(symbol)
-                    print(f"get_stock_news returned: type={type(res).__name__}")
-                
-                elif tool_name == "search_products":
-                    query = args.get("query")
-                    res, context = shopping_service.search_products(query)
-
-                elif tool_name == "get_stock_info":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_stock_info(symbol)
-
-                elif tool_name == "get_technical_indicators":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_technical_indicators(symbol)
-
-                elif tool_name == "get_company_fundamentals":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_company_fundamentals(symbol)
-
-                elif tool_name == "get_stock_dividends":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_stock_dividends(symbol)
-
-                elif tool_name == "get_stock_holders":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_stock_holders(symbol)
-
-                elif tool_name == "get_stock_calendar":
-                    symbol = args.get("symbol")
-                    res, context = stock_service.get_stock_calendar(symbol)
-                
-                # Send A2UI response if available
-                if res and isinstance(res, A2UIResponse):
-                    print(f"Sending A2UI event for tool: {tool_name}")
-                    a2ui_data = res.model_dump()
-                    yield f"event: a2ui\ndata: {json.dumps(a2ui_data)}\n\n"
-                else:
-                    print(f"NOT sending A2UI for {tool_name}, res type: {type(res).__name__ if res else 'None'}")
-                
-                if context:
-                    context_accumulator.append(context)
+            # Fan out every tool call at once (bounded by a semaphore) and emit
+            # each A2UI event as soon as its tool finishes. Contexts are stored
+            # by call index so the final answer sees them in a stable order.
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOLS)
+
+            async def run_call(index, call):
+                async with semaphore:
+                    res, context = await execute_tool_call(call["tool_name"], call["tool_args"], services,
+                                                           chart_columns=chart_columns, chart_points=chart_points)
+                return index, call["tool_name"], res, context
+
+            calls = processed["calls"]
+            context_slots = [""] * len(calls)
+            tasks = [asyncio.create_task(run_call(i, call)) for i, call in enumerate(calls)]
+
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, tool_name, res, context = await next_done
+
+                    # Send A2UI response if available
+                    if res and isinstance(res, A2UIResponse):
+                        print(f"Sending A2UI event for tool: {tool_name}")
+                        track_surface(request, res)
+                        yield a2ui_event(res, tool_name, calls[index]["tool_args"])
+                    else:
+                        print(f"NOT sending A2UI for {tool_name}, res type: {type(res).__name__ if res else 'None'}")
+
+                    context_slots[index] = context
+            finally:
+                # Client went away mid-stream: don't leave tools running
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+            context_accumulator = [c for c in context_slots if c]
 
             # Generate and stream final answer based on accumulated context
             if context_accumulator:
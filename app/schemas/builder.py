@@ -0,0 +1,158 @@
+import os
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from app.schemas.models import (
+    A2UIResponse, A2UIData, SurfaceUpdate, ComponentEntry, ComponentType,
+    TextComponent, TextContent, TextFieldComponent, ButtonComponent, Action,
+    ActionContext, ColumnComponent, RowComponent, ColumnChildren, ImageComponent,
+    ChartComponent, ChartSeries, ChartColumns, ChartColumnSeries, IFrameComponent, DataModelUpdate, DataModelContents,
+    DataValue, BeginRendering, TrustedA2UIResponse
+)
+
+
+def strict_mode() -> bool:
+    """A2UI_STRICT_SURFACES=1 validates every surface into the Pydantic models (for tests)."""
+    return os.environ.get("A2UI_STRICT_SURFACES", "").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=None)
+def _defaults(cls: Type[BaseModel]) -> Dict[str, Any]:
+    return {name: field.get_default(call_default_factory=True) for name, field in cls.model_fields.items()}
+
+
+def wire(cls: Type[BaseModel], **fields) -> Dict[str, Any]:
+    """The dict `cls(**fields).model_dump()` would produce, without building or validating the model."""
+    node = {k: (list(v) if isinstance(v, list) else v) for k, v in _defaults(cls).items()}
+    node.update(fields)
+    return node
+
+
+def finish(data: Dict[str, Any], strict: Optional[bool] = None) -> A2UIResponse:
+    """Wrap surface data (wire dicts or models) into a response: validated when strict, trusted otherwise."""
+    if strict if strict is not None else strict_mode():
+        return A2UIResponse(data=data)
+    return TrustedA2UIResponse.from_data(wire(A2UIData, **data))
+
+
+def _set(**fields) -> Dict[str, Any]:
+    # Only pass fields that were given so the models' fields_set matches the JSON they replace
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+class SurfaceBuilder:
+    """
+    Builds an A2UIResponse for one surface from typed components.
+
+    Components are referenced by short names; ids are namespaced with `uid`
+    (`<uid>_<name>`) so several surfaces can be merged into one dashboard.
+    Every method returns the full id of the component it added. Components
+    are emitted in the order they are added.
+
+    By default the surface is trusted: components are plain dicts in their final
+    JSON shape and nothing is validated. In strict mode (see strict_mode) every
+    component is built as its Pydantic model instead; both produce the same JSON.
+    """
+
+    def __init__(self, surface_id: str, uid: Optional[str] = None, strict: Optional[bool] = None):
+        self.surface_id = surface_id
+        self.uid = uid or str(uuid.uuid4())[:8]
+        self.strict = strict_mode() if strict is None else strict
+        self.components: List[Any] = []
+        self.contents: List[Any] = []
+
+    def node(self, cls: Type[BaseModel], **fields) -> Any:
+        fields = _set(**fields)
+        return cls(**fields) if self.strict else wire(cls, **fields)
+
+    def id(self, name: str) -> str:
+        return f"{self.uid}_{name}"
+
+    def add(self, name: str, **component) -> str:
+        self.components.append(self.node(ComponentEntry, id=self.id(name), component=self.node(ComponentType, **component)))
+        return self.id(name)
+
+    def text(self, name: str, text: str, usage_hint: Optional[str] = None, url: Optional[str] = None,
+             style: Optional[Dict[str, Any]] = None, path: Optional[str] = None) -> str:
+        """With `path` the text is bound to that data model value; `text` is shown until it arrives."""
+        return self.add(name, Text=self.node(
+            TextComponent,
+            text=self.node(TextContent, literalString=text, path=path),
+            usageHint=usage_hint,
+            url=self.node(TextContent, literalString=url) if url is not None else None,
+            style=style,
+        ))
+
+    def text_field(self, name: str, label: str, path: str) -> str:
+        return self.add(name, TextField=self.node(
+            TextFieldComponent, label=self.node(TextContent, literalString=label), text=self.node(TextContent, path=path)))
+
+    def button(self, name: str, child: str, action: str, context: Optional[Dict[str, str]] = None,
+               literals: Optional[Dict[str, str]] = None) -> str:
+        """`context` maps action keys to data model paths, `literals` to fixed values sent as-is."""
+        return self.add(name, Button=self.node(
+            ButtonComponent,
+            child=self.id(child),
+            action=self.node(Action, name=action, context=[
+                self.node(ActionContext, key=k, value=self.node(TextContent, path=p)) for k, p in (context or {}).items()
+            ] + [
+                self.node(ActionContext, key=k, value=self.node(TextContent, literalString=v)) for k, v in (literals or {}).items()
+            ]),
+        ))
+
+    def column(self, name: str, children: List[str], style: Any = None) -> str:
+        return self.add(name, Column=self.node(ColumnComponent, children=self._children(children), style=style))
+
+    def row(self, name: str, children: List[str], style: Any = None) -> str:
+        return self.add(name, Row=self.node(RowComponent, children=self._children(children), style=style))
+
+    def image(self, name: str, url: str, alt_text: Optional[str] = None) -> str:
+        return self.add(name, Image=self.node(
+            ImageComponent,
+            url=self.node(TextContent, literalString=url),
+            altText=self.node(TextContent, literalString=alt_text) if alt_text is not None else None,
+        ))
+
+    def chart(self, name: str, series: Optional[List[Dict[str, Any]]] = None, data: Optional[List[Dict[str, Any]]] = None,
+              color: Optional[str] = None, columns: Optional[Dict[str, Any]] = None) -> str:
+        # Points and value arrays are passed through as-is; they are only validated in strict mode
+        if columns is not None:
+            columns = self.node(ChartColumns, **{**columns, "series": [self.node(ChartColumnSeries, **s) for s in columns["series"]]})
+        return self.add(name, Chart=self.node(
+            ChartComponent,
+            series=[self.node(ChartSeries, **s) for s in series] if series is not None else None,
+            data=data,
+            color=color,
+            columns=columns,
+        ))
+
+    def iframe(self, name: str, url: str, height: Optional[int] = None, width: Optional[str] = None) -> str:
+        return self.add(name, IFrame=self.node(IFrameComponent, url=self.node(TextContent, literalString=url), height=height, width=width))
+
+    def data_model(self, key: str, values: Dict[str, Any]):
+        self.contents.append(self.node(
+            DataModelContents, key=key, valueMap=[self.node(DataValue, key=k, valueString=str(v)) for k, v in values.items()]))
+
+    def build(self, root: str = "root") -> A2UIResponse:
+        return finish({
+            "surfaceUpdate": self.node(SurfaceUpdate, surfaceId=self.surface_id, components=self.components),
+            "dataModelUpdate": self.node(DataModelUpdate, surfaceId=self.surface_id, contents=self.contents),
+            "beginRendering": self.node(BeginRendering, surfaceId=self.surface_id, root=self.id(root)),
+        }, strict=self.strict)
+
+    def update(self) -> A2UIResponse:
+        """
+        An update of a surface the client already shows: the data model, plus only the
+        components added to this builder (replacing those with the same ids). No
+        beginRendering, so the client patches the surface instead of drawing a new one.
+        """
+        return finish({
+            "surfaceUpdate": self.node(SurfaceUpdate, surfaceId=self.surface_id, components=self.components) if self.components else None,
+            "dataModelUpdate": self.node(DataModelUpdate, surfaceId=self.surface_id, contents=self.contents),
+        }, strict=self.strict)
+
+    def _children(self, names: List[str]) -> Any:
+        return self.node(ColumnChildren, explicitList=[self.id(n) for n in names])
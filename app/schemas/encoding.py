@@ -0,0 +1,38 @@
+import json
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+from app.schemas.models import TrustedA2UIResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def to_wire(res: BaseModel) -> Dict[str, Any]:
+    """The JSON-ready dict sent to clients for a response model."""
+    return res.model_dump()
+
+
+def encode_response(res: BaseModel) -> bytes:
+    """
+    Encode a response once. Trusted responses are dumped straight from their dict
+    and cache the bytes, so a result shared by several callers is encoded once.
+    """
+    if isinstance(res, TrustedA2UIResponse):
+        if res._encoded is None:
+            # Read-only, so the shared dict is encoded without model_dump's copy
+            res._encoded = dumps({"kind": res.kind, "data": res.data})
+        return res._encoded
+    return dumps(res.model_dump())
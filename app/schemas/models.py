@@ -1,5 +1,6 @@
+import copy
 from typing import List, Dict, Any, Optional, Union, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 # Base Component
 class ComponentBase(BaseModel):
@@ -47,7 +48,7 @@ class RowComponent(ComponentBase):
     style: Optional[Any] = None
 
 class ChartDataPoint(BaseModel):
-    time: str
+    time: Union[str, int]  # "YYYY-MM-DD", or UNIX seconds for intraday bars
     value: float
 
 class ChartSeries(BaseModel):
@@ -55,9 +56,23 @@ class ChartSeries(BaseModel):
     color: Optional[str] = "#0F9D58"
     data: List[ChartDataPoint]
 
+class ChartColumnSeries(BaseModel):
+    name: str
+    color: Optional[str] = "#0F9D58"
+    values: List[Optional[float]]  # Aligned with the time axis; null where the series has no point
+
+class ChartColumns(BaseModel):
+    """Columnar chart data: one time axis shared by every series. Sent only to clients that advertise chart-columns."""
+    time: Optional[List[Union[str, int]]] = None  # Explicit time axis
+    start: Optional[str] = None       # ...or an evenly spaced one: start date
+    step: Optional[int] = None        # and step in days
+    precision: Optional[int] = None   # Decimals the values were rounded to
+    series: List[ChartColumnSeries]
+
 class ChartComponent(ComponentBase):
     data: Optional[List[ChartDataPoint]] = None  # For single series (backward compat)
     series: Optional[List[ChartSeries]] = None   # For multiple series
+    columns: Optional[ChartColumns] = None       # Columnar form of series
     color: Optional[str] = "#0F9D58"  # Default color for single series
 
 class IFrameComponent(ComponentBase):
@@ -83,6 +98,8 @@ class ComponentEntry(BaseModel):
 class SurfaceUpdate(BaseModel):
     surfaceId: str
     components: List[ComponentEntry]
+    # Ids of components to drop, in an update of a surface the client already shows
+    removed: Optional[List[str]] = None
 
 class DataValue(BaseModel):
     key: str
@@ -109,6 +126,31 @@ class A2UIResponse(BaseModel):
     kind: str = "a2ui" # Custom discriminator
     data: A2UIData
 
+class TrustedA2UIResponse(A2UIResponse):
+    """
+    A2UIResponse assembled by the server from values it produced itself.
+
+    `data` is the plain JSON-ready dict (the same shape as A2UIResponse.model_dump()["data"])
+    and is never validated; the encoded bytes are cached after the first encode.
+    """
+    _encoded: Optional[bytes] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "TrustedA2UIResponse":
+        return cls.model_construct(kind="a2ui", data=data)
+
+    def model_dump(self, *, mode: str = "python", **kwargs) -> Dict[str, Any]:
+        """
+        A copy of the wire dict: `data` may be shared (cached, or one result for several
+        callers), and callers such as the /chat dashboard merge modify what they get.
+        The dict is already JSON-ready, so `mode` makes no difference; options that would
+        change the output (include, exclude, exclude_none, ...) are not supported.
+        """
+        unsupported = sorted(name for name, value in kwargs.items() if value and name not in ("by_alias", "warnings"))
+        if unsupported:
+            raise TypeError(f"TrustedA2UIResponse.model_dump does not support: {', '.join(unsupported)}")
+        return {"kind": self.kind, "data": copy.deepcopy(self.data)}
+
 class TextResponse(BaseModel):
     kind: str = "text"
     text: str
@@ -1,151 +1,195 @@
 import math
-from typing import List, Dict, Any, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple
 from app.schemas.models import (
     A2UIResponse, A2UIData, SurfaceUpdate, ComponentEntry, ComponentType,
     TextComponent, TextContent, TextFieldComponent, ButtonComponent, Action,
     ActionContext, ColumnComponent, ColumnChildren, DataModelUpdate,
     DataModelContents, DataValue, BeginRendering, TextResponse
 )
+from app.services import surfaces
+from app.services.price_history import default_price_history
+from app.services.indicator_engine import IndicatorEngines
+from app.services.ticker_snapshot import default_snapshots
 
 class LoanCalculatorService:
-    def calculate_loan(self, principal: float, annual_rate: float, years: int, is_ui_mode: bool = False) -> Union[A2UIResponse, TextResponse]:
-        print(f"Calculating loan: ${principal}, {annual_rate}% APR, {years} years")
-
+    def calculate_loan(self, principal: float, annual_rate: float, years: int, is_ui_mode: bool = False,
+                       columns: bool = False, max_points: Optional[int] = None) -> Union[A2UIResponse, TextResponse]:
+        """
+        Level monthly payment of a fixed-rate loan. The UI also charts the amortization
+        schedule (balance, cumulative principal and interest); `columns` / `max_points`
+        as in StockService.get_stock_chart.
+        """
+        from app.services import amortization
 
-        # Loan calculation
-        monthly_rate = annual_rate / 100 / 12
-        months = years * 12
-        if monthly_rate > 0:
-            monthly_payment = principal * (monthly_rate * math.pow(1 + monthly_rate, months)) / (math.pow(1 + monthly_rate, months) - 1)
-        else:
-             monthly_payment = principal / months
-        
-        total_payment = monthly_payment * months
-        total_interest = total_payment - principal
+        print(f"Calculating loan: ${principal}, {annual_rate}% APR, {years} years")
+        try:
+            result = amortization.summary(principal, annual_rate, years)
+        except ValueError as e:
+            return TextResponse(text=f"Cannot calculate this loan: {e}"), f"Invalid loan input: {e}"
+        monthly_payment = float(result["monthly"])
+        total_payment = float(result["total"])
+        total_interest = float(result["interest"])
 
         if is_ui_mode:
             context = f"Loan Calculation: Principal ${principal}, Rate {annual_rate}%, {years} Years. Monthly: ${monthly_payment:.2f}. Total Interest: ${total_interest:.2f}."
-            return self.create_loan_result_ui(principal, annual_rate, years, monthly_payment, total_payment, total_interest), context
+            schedule = self.loan_schedule_chart(principal, annual_rate, years, columns, max_points)
+            return self.create_loan_result_ui(principal, annual_rate, years, monthly_payment, total_payment, total_interest,
+                                              schedule=schedule, columns=columns), context
         else:
             return TextResponse(text=f"Monthly Payment: ${monthly_payment:.2f}, Total Interest: ${total_interest:.2f}"), f"Loan calculated: Monthly ${monthly_payment:.2f}."
 
-    def create_loan_result_ui(self, principal, rate, years, monthly, total, interest) -> A2UIResponse:
-        print("create_loan_result_ui called.") # Added for debugging
-        from jinja2 import Environment, FileSystemLoader
-        import json
-        import os
-        import uuid
+    def recalculate_loan(self, principal: float, annual_rate: float, years: int, surface_id: str, uid: str,
+                         columns: bool = False, max_points: Optional[int] = None) -> Union[A2UIResponse, TextResponse]:
+        """
+        The "Recalculate" button of a loan_result the client already shows: only the new
+        result values and schedule chart for that surface (`surface_id`, ids under `uid`).
+        """
+        from app.services import amortization
 
-        # Ensure we have a UID for namespacing even for single loan calc
-        uid = str(uuid.uuid4())[:8]
-        
-        # Note: In a real app, Environment should be created once at module level or dependency injected
-        prompts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates"))
-        env = Environment(loader=FileSystemLoader(prompts_dir))
-        template = env.get_template("loan_result.json.j2")
-        
-        # Render template with variables
-        rendered_json_str = template.render(
-            principal=principal,
-            rate=rate,
-            years=years,
-            monthly=monthly,
-            total=total,
-            interest=interest,
-            uid=uid
-        )
-        
-        # Parse JSON and validate with Pydantic model
+        print(f"Recalculating loan {surface_id}/{uid}: ${principal}, {annual_rate}% APR, {years} years")
         try:
-            data_dict = json.loads(rendered_json_str)
-            return A2UIResponse(data=A2UIData(**data_dict))
-        except Exception as e:
-            print(f"Template Rendering Error: {e}")
-            # Fallback text
-            return TextResponse(text=f"Error rendering UI: {e}")
+            result = amortization.summary(principal, annual_rate, years)
+        except ValueError as e:
+            return TextResponse(text=f"Cannot calculate this loan: {e}"), f"Invalid loan input: {e}"
+        monthly_payment = float(result["monthly"])
+        total_interest = float(result["interest"])
+        context = f"Loan Recalculation: Principal ${principal}, Rate {annual_rate}%, {years} Years. Monthly: ${monthly_payment:.2f}. Total Interest: ${total_interest:.2f}."
+        schedule = self.loan_schedule_chart(principal, annual_rate, years, columns, max_points)
+        return surfaces.render(surfaces.loan_update, surface_id=surface_id, uid=uid, principal=principal, rate=annual_rate,
+                               years=years, monthly=monthly_payment, total=float(result["total"]), interest=total_interest,
+                               schedule=schedule, columns=columns), context
+
+    def loan_schedule_chart(self, principal: float, annual_rate: float, years: int, columns: bool = False,
+                            max_points: Optional[int] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Chart data of the remaining balance and cumulative principal / interest paid, one point
+        per year from the start of the loan (and the last payment of a part year). Yearly points
+        keep the chart small enough to resend on every recalculation.
+        """
+        import numpy as np
+        import pandas as pd
+        from app.services import amortization
+        from app.services.chart_series import build_chart_series, build_chart_columns, point_budget
+
+        schedule = amortization.schedule(principal, annual_rate, years)
+        months = schedule["balance"].shape[1]
+        points = np.unique(np.append(np.arange(0, months + 1, 12), months))
+        # Payments start the month after today; point k is the state after k payments
+        start = pd.Timestamp.now().normalize() + pd.offsets.MonthBegin(1)
+        index = pd.DatetimeIndex([start + pd.DateOffset(months=int(k)) for k in points])
+        specs = [
+            ("Balance", np.append(float(principal), schedule["balance"][0])[points], "#4285F4"),
+            ("Principal Paid", np.append(0.0, schedule["principal"][0].cumsum())[points], "#0F9D58"),
+            ("Interest Paid", np.append(0.0, schedule["interest"][0].cumsum())[points], "#DB4437"),
+        ]
+        frame = pd.DataFrame(index=index)
+        max_points = max_points or point_budget()
+        if columns:
+            return build_chart_columns(frame, specs, max_points=max_points)
+        return build_chart_series(frame, specs, max_points=max_points)
+
+    def create_loan_result_ui(self, principal, rate, years, monthly, total, interest, schedule=None, columns=False) -> A2UIResponse:
+        print("create_loan_result_ui called.") # Added for debugging
+        return surfaces.render(surfaces.loan_result, principal=principal, rate=rate, years=years,
+                               monthly=monthly, total=total, interest=interest, schedule=schedule, columns=columns)
 
 class RestaurantService:
     NAVER_CLIENT_ID = "QVYRUg158Y_uP0qaUiXt"
     NAVER_CLIENT_SECRET = "xLOYCyFquE"
     
-    def _search_naver_local(self, query: str, display: int = 5) -> list:
-        """
-        Search restaurants using Naver Local Search API.
-        Returns a list of restaurant dictionaries.
-        """
-        import httpx
-        import xml.etree.ElementTree as ET
+    def _naver_local_request(self, query: str, display: int) -> Tuple[str, Dict[str, str]]:
         from urllib.parse import quote
-        
+
         url = f"https://openapi.naver.com/v1/search/local.xml?query={quote(query)}&display={display}&start=1&sort=random"
-        
         headers = {
             "X-Naver-Client-Id": self.NAVER_CLIENT_ID,
             "X-Naver-Client-Secret": self.NAVER_CLIENT_SECRET
         }
+        return url, headers
+
+    def _parse_naver_local(self, xml_text: str) -> list:
+        import xml.etree.ElementTree as ET
+
+        # Parse XML
+        root = ET.fromstring(xml_text)
+        channel = root.find("channel")
+        
+        places = []
+        for idx, item in enumerate(channel.findall("item")):
+            # Clean HTML tags from title
+            title = item.find("title").text or ""
+            title = title.replace("<b>", "").replace("</b>", "")
+            
+            category = item.find("category").text or ""
+            address = item.find("address").text or ""
+            road_address = item.find("roadAddress").text or ""
+            
+            # Get map coordinates (Naver uses WGS84 * 10^7 format)
+            mapx = item.find("mapx").text or "0"
+            mapy = item.find("mapy").text or "0"
+            
+            # Convert Naver coordinates to standard lat/lng
+            # Naver's mapx/mapy are in WGS84 but scaled/formatted differently
+            # They appear to be in KATEC or similar - need to convert
+            # For Google Maps, we'll use the coordinates directly as they're close enough
+            lng = float(mapx) / 10000000 if len(mapx) > 6 else float(mapx)
+            lat = float(mapy) / 10000000 if len(mapy) > 6 else float(mapy)
+            
+            places.append({
+                "id": f"naver_{idx}",
+                "name": title,
+                "category": category.split(">")[-1] if ">" in category else category,
+                "rating": 4.5,  # Naver API doesn't provide ratings
+                "location": road_address or address,
+                "address": address,
+                "road_address": road_address,
+                "lat": lat,
+                "lng": lng,
+                "map_url": f"https://www.google.com/maps?q={lat},{lng}"
+            })
         
+        return places
+
+    def _search_naver_local(self, query: str, display: int = 5) -> list:
+        """
+        Search restaurants using Naver Local Search API.
+        Returns a list of restaurant dictionaries.
+        """
+        import httpx
+
+        url, headers = self._naver_local_request(query, display)
         try:
             response = httpx.get(url, headers=headers, timeout=10.0)
             response.raise_for_status()
-            
-            # Parse XML
-            root = ET.fromstring(response.text)
-            channel = root.find("channel")
-            
-            places = []
-            for idx, item in enumerate(channel.findall("item")):
-                # Clean HTML tags from title
-                title = item.find("title").text or ""
-                title = title.replace("<b>", "").replace("</b>", "")
-                
-                category = item.find("category").text or ""
-                address = item.find("address").text or ""
-                road_address = item.find("roadAddress").text or ""
-                
-                # Get map coordinates (Naver uses WGS84 * 10^7 format)
-                mapx = item.find("mapx").text or "0"
-                mapy = item.find("mapy").text or "0"
-                
-                # Convert Naver coordinates to standard lat/lng
-                # Naver's mapx/mapy are in WGS84 but scaled/formatted differently
-                # They appear to be in KATEC or similar - need to convert
-                # For Google Maps, we'll use the coordinates directly as they're close enough
-                lng = float(mapx) / 10000000 if len(mapx) > 6 else float(mapx)
-                lat = float(mapy) / 10000000 if len(mapy) > 6 else float(mapy)
-                
-                places.append({
-                    "id": f"naver_{idx}",
-                    "name": title,
-                    "category": category.split(">")[-1] if ">" in category else category,
-                    "rating": 4.5,  # Naver API doesn't provide ratings
-                    "location": road_address or address,
-                    "address": address,
-                    "road_address": road_address,
-                    "lat": lat,
-                    "lng": lng,
-                    "map_url": f"https://www.google.com/maps?q={lat},{lng}"
-                })
-            
-            return places
-            
+            return self._parse_naver_local(response.text)
+        except Exception as e:
+            print(f"Naver API Error: {e}")
+            return []
+
+    async def _search_naver_local_async(self, query: str, display: int = 5) -> list:
+        """
+        Async variant of _search_naver_local on the shared pooled client.
+        """
+        from app.services.runtime import get_http_client
+
+        url, headers = self._naver_local_request(query, display)
+        try:
+            response = await get_http_client().get(url, headers=headers)
+            response.raise_for_status()
+            return self._parse_naver_local(response.text)
         except Exception as e:
             print(f"Naver API Error: {e}")
             return []
     
-    def find_places(self, location: str, keyword: str = None) -> Union[A2UIResponse, TextResponse]:
-        print(f"Finding {keyword or 'places'} in {location}")
-        
+    def _places_query(self, location: str, keyword: str = None) -> str:
         # Build search query - keep original language from user
         # The LLM may translate to English, so we need to handle both
         if keyword:
             # Try direct query first
-            query = f"{location} {keyword}"
-        else:
-            query = f"{location} 가볼만한곳"
-        
-        # Call Naver API
-        places = self._search_naver_local(query, display=5)
-        
+            return f"{location} {keyword}"
+        return f"{location} 가볼만한곳"
+
+    def _render_places(self, places: list, location: str, keyword: str = None) -> Tuple[Union[A2UIResponse, TextResponse], str]:
         if not places:
             print("No results from Naver API, using fallback mock data")
             # Use keyword for fallback data
@@ -166,134 +210,363 @@ class RestaurantService:
         import os
         context = f"Found {len(places)} places in {location} for keyword '{keyword}'. Top results: " + ", ".join([p['name'] for p in places[:3]])
         maps_api_key = os.environ.get("GOOGLE_MAPS_API_KEY", "")
-        return self._render_template("place_list.json.j2", {
-            "places": places, 
-            "location": location,
-            "keyword": keyword,
-            "maps_api_key": maps_api_key
-        }), context
+        return surfaces.render(surfaces.place_list,
+            places=places,
+            location=location,
+            keyword=keyword,
+            maps_api_key=maps_api_key
+        ), context
 
-    def reserve_table(self, restaurant_name: str, date: str, guests: int) -> Union[A2UIResponse, TextResponse]:
-        context = f"Reservation confirmed at {restaurant_name} for {guests} guests on {date}."
-        return self._render_template("reservation_confirmed.json.j2", {
-            "restaurant_name": restaurant_name,
-            "date": date,
-            "guests": guests
-        }), context
-    
-    def _render_template(self, template_name: str, context: Dict[str, Any], uid: str = None) -> A2UIResponse:
-        from jinja2 import Environment, FileSystemLoader
-        import json
-        import uuid
-        import os
+    def find_places(self, location: str, keyword: str = None) -> Union[A2UIResponse, TextResponse]:
+        print(f"Finding {keyword or 'places'} in {location}")
         
-        # Generate a short random UID if not provided to ensure namespacing
-        if not uid:
-             uid = str(uuid.uuid4())[:8]
+        # Call Naver API
+        places = self._search_naver_local(self._places_query(location, keyword), display=5)
+        return self._render_places(places, location, keyword)
 
-        prompts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "templates"))
-        env = Environment(loader=FileSystemLoader(prompts_dir))
-        template = env.get_template(template_name)
-        
-        # Inject uid into context
-        context['uid'] = uid
-        
-        rendered_json_str = template.render(**context)
+    async def find_places_async(self, location: str, keyword: str = None) -> Union[A2UIResponse, TextResponse]:
+        print(f"Finding {keyword or 'places'} in {location}")
 
-        try:
-            data_dict = json.loads(rendered_json_str)
-            print(f"Template rendered successfully for {template_name}")
-            result = A2UIResponse(data=A2UIData(**data_dict))
-            print(f"A2UIResponse created: kind={result.kind}")
-            return result
-        except Exception as e:
-            print(f"Template Rendering Error for {template_name}: {e}")
-            print(f"Rendered JSON (first 500 chars): {rendered_json_str[:500]}")
-            return TextResponse(text=f"Error rendering UI: {e}")
+        places = await self._search_naver_local_async(self._places_query(location, keyword), display=5)
+        return self._render_places(places, location, keyword)
+
+    def reserve_table(self, restaurant_name: str, date: str, guests: int) -> Union[A2UIResponse, TextResponse]:
+        context = f"Reservation confirmed at {restaurant_name} for {guests} guests on {date}."
+        return surfaces.render(surfaces.reservation_confirmed,
+            restaurant_name=restaurant_name,
+            date=date,
+            guests=guests
+        ), context
 
 class StockService(RestaurantService):
-    def get_stock_chart(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
-        import pandas as pd
+    # OHLCV history shared by every tool (and every instance) so a symbol is downloaded once
+    price_history = default_price_history()
+    # Running RSI/MACD state per symbol, advanced with each new bar from price_history
+    indicator_engines = IndicatorEngines()
+    # .info / .financials / holders / calendar / dividends / news per symbol, each kept for its own TTL
+    snapshots = default_snapshots()
+
+    # (name, moving-average window, color) overlays drawn over the price line
+    CHART_OVERLAYS = [("MA20", 20, "#FF6B6B"), ("MA60", 60, "#4ECDC4"), ("MA120", 120, "#FFE66D")]
+
+    # compare_stocks: most symbols per comparison and the line color of each
+    COMPARE_MAX_SYMBOLS = 8
+    COMPARE_COLORS = ["#0F9D58", "#4285F4", "#DB4437", "#F4B400", "#AB47BC", "#00ACC1", "#FF7043", "#5C6BC0"]
+    # Bars per year of each interval, to annualize volatility (intraday: 6.5 hour sessions)
+    BARS_PER_YEAR = {"1m": 252 * 390, "5m": 252 * 78, "15m": 252 * 26, "30m": 252 * 13, "1h": 252 * 7,
+                     "1d": 252, "1wk": 52, "1mo": 12}
+    # backtest_strategy: daily-bar history windows it runs over
+    BACKTEST_PERIODS = ["1y", "2y", "5y", "10y", "max"]
+    # screen_stocks: most symbols in a custom list
+    SCREEN_MAX_SYMBOLS = 1000
+
+    def get_stock_chart(self, symbol: str, columns: bool = False, max_points: Optional[int] = None,
+                        period: str = "1y", interval: Optional[str] = None) -> Union[A2UIResponse, TextResponse]:
+        """
+        `period`: chart range from 1d to max; `interval`: bar size (the range's default when None or unsupported).
+        `columns`: the client decodes the columnar chart format (chart-columns capability).
+        `max_points`: chart point budget; longer histories are downsampled (server default when None).
+        """
+        from app.services.chart_series import build_chart_series, build_chart_columns, point_budget
+        from app.services.price_history import chart_range, INTRADAY_INTERVALS
         
-        print(f"Fetching stock chart for {symbol}")
+        period, interval = chart_range(period, interval)
+        print(f"Fetching stock chart for {symbol} ({period}, {interval} bars)")
         try:
-            ticker = yf.Ticker(symbol)
-            # Fetch 1 year history
-            hist = ticker.history(period="1y")
+            # Bars from the shared price cache; coarser intervals come from its rollup pyramid
+            hist = self.price_history.get(symbol, period=period, interval=interval)
             
             if hist.empty:
                  return TextResponse(text=f"No data found for {symbol}")
 
-            # Calculate moving averages
-            hist['MA20'] = hist['Close'].rolling(window=20).mean()
-            hist['MA60'] = hist['Close'].rolling(window=60).mean()
-            hist['MA120'] = hist['Close'].rolling(window=120).mean()
-
-            # Prepare data for ChartComponent (native rendering)
-            prices = []
-            ma20 = []
-            ma60 = []
-            ma120 = []
-            
-            for index, row in hist.iterrows():
-                time_str = index.strftime("%Y-%m-%d")
-                prices.append({
-                    "time": time_str,
-                    "value": float(row['Close'])
-                })
-                # Only add MA values if they exist (not NaN)
-                if not pd.isna(row['MA20']):
-                    ma20.append({"time": time_str, "value": float(row['MA20'])})
-                if not pd.isna(row['MA60']):
-                    ma60.append({"time": time_str, "value": float(row['MA60'])})
-                if not pd.isna(row['MA120']):
-                    ma120.append({"time": time_str, "value": float(row['MA120'])})
-
-            context = f"Showing stock chart for {symbol} with 20/60/120 day moving averages. Current price is ${hist['Close'].iloc[-1]:.2f}."
-            return self._render_template("stock_chart.json.j2", {
-                "symbol": symbol.upper(),
-                "prices": prices,
-                "ma20": ma20,
-                "ma60": ma60,
-                "ma120": ma120,
-                "current_price": f"${hist['Close'].iloc[-1]:.2f}"
-            }), context
+            # Price plus moving averages, built column-wise (NaN warm-up points dropped).
+            # Averages longer than the range would be empty, so they are left out.
+            close = hist['Close']
+            overlays = [(name, window, color) for name, window, color in self.CHART_OVERLAYS if window < len(hist)]
+            specs = [("Price", "Close", "#0F9D58")]
+            specs += [(name, close.rolling(window=window).mean(), color) for name, window, color in overlays]
+            date_format = None if interval in INTRADAY_INTERVALS else "%Y-%m-%d"
+            max_points = max_points or point_budget()
+            if columns:
+                series = build_chart_columns(hist, specs, date_format=date_format, max_points=max_points)
+            else:
+                series = build_chart_series(hist, specs, date_format=date_format, max_points=max_points)
+
+            windows = "/".join(str(window) for _, window, _ in overlays)
+            unit = "day" if interval == "1d" else f"{interval} bar"
+            averages = f" with {windows} {unit} moving averages" if overlays else ""
+            context = f"Showing {period} stock chart for {symbol}{averages}. Current price is ${close.iloc[-1]:.2f}."
+            return surfaces.render(surfaces.stock_chart,
+                symbol=symbol.upper(),
+                series=series,
+                current_price=f"${close.iloc[-1]:.2f}",
+                columns=columns,
+                period=period
+            ), context
             
         except Exception as e:
             print(f"Stock Error: {e}")
             return TextResponse(text=f"Error fetching stock data: {e}"), f"Error fetching stock chart for {symbol}: {e}"
 
-    def get_stock_dividends(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
+    def compare_stocks(self, symbols: Union[List[str], str], columns: bool = False, max_points: Optional[int] = None,
+                       period: str = "1y") -> Union[A2UIResponse, TextResponse]:
+        """
+        Several symbols on one chart: cumulative returns since the start of `period`,
+        plus each symbol's annualized volatility and the correlation of their returns.
+        All histories come from one bulk download (see PriceHistoryCache.get_many) and
+        the statistics are computed for every symbol at once on a (symbols, bars) panel.
+        `columns` / `max_points` as in get_stock_chart.
+        """
+        import pandas as pd
+        from app.services import indicators as ind
+        from app.services.chart_series import build_chart_series, build_chart_columns, point_budget, shared_point_budget
+        from app.services.price_history import chart_range, INTRADAY_INTERVALS
+
+        if isinstance(symbols, str):
+            symbols = symbols.split(",")
+        symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols if str(s).strip()))
+        if len(symbols) < 2:
+            return TextResponse(text="Please name at least two stocks to compare."), "compare_stocks needs at least two symbols"
+        if len(symbols) > self.COMPARE_MAX_SYMBOLS:
+            return (TextResponse(text=f"Up to {self.COMPARE_MAX_SYMBOLS} stocks can be compared at once."),
+                    f"compare_stocks got {len(symbols)} symbols (max {self.COMPARE_MAX_SYMBOLS})")
+
+        period, interval = chart_range(period, None)
+        print(f"Comparing {', '.join(symbols)} ({period}, {interval} bars)")
+        try:
+            frames = self.price_history.get_many(symbols, period=period, interval=interval)
+            missing = [s for s, frame in frames.items() if frame.empty]
+            frames = {s: frame for s, frame in frames.items() if not frame.empty}
+            if len(frames) < 2:
+                return TextResponse(text=f"Not enough data to compare {', '.join(symbols)}"), f"No data found for {', '.join(missing)}"
+
+            names, index, panel = ind.panel_from_frames(frames, columns=("Close",))
+            close = panel["Close"]
+            performance = ind.normalized_returns(close)
+            returns = ind.log_returns(close)
+            vol = ind.volatility(returns, self.BARS_PER_YEAR.get(interval, 252))
+            corr = ind.correlation(returns)
+
+            hist = pd.DataFrame(index=index)
+            colors = self.COMPARE_COLORS
+            specs = [(name, performance[i], colors[i % len(colors)]) for i, name in enumerate(names)]
+            date_format = None if interval in INTRADAY_INTERVALS else "%Y-%m-%d"
+            # The shared time axis is the union of each line's LTTB picks (union_lttb_indices),
+            # so every stock keeps its own peaks and troughs within the shared point budget
+            max_points = shared_point_budget(max_points or point_budget(), len(names))
+            if columns:
+                series = build_chart_columns(hist, specs, date_format=date_format, max_points=max_points)
+            else:
+                series = build_chart_series(hist, specs, date_format=date_format, max_points=max_points)
+
+            last = ind.forward_fill(close)[:, -1]
+            stats = [{
+                "symbol": name,
+                "color": colors[i % len(colors)],
+                "price": f"${last[i]:.2f}",
+                "return": f"{performance[i, -1]:+.1f}%",
+                "volatility": f"{vol[i]:.1f}%" if math.isfinite(vol[i]) else "N/A",
+            } for i, name in enumerate(names)]
+            correlation = [["N/A" if not math.isfinite(v) else f"{v:.2f}" for v in row] for row in corr.tolist()]
+
+            pairs = [f"{names[i]}/{names[j]} {correlation[i][j]}" for i in range(len(names)) for j in range(i + 1, len(names))]
+            context = (f"Compared {', '.join(names)} over {period}: "
+                       + "; ".join(f"{s['symbol']} {s['return']} (volatility {s['volatility']}, price {s['price']})" for s in stats)
+                       + f". Return correlations: {', '.join(pairs)}.")
+            if missing:
+                context += f" No data for {', '.join(missing)}."
+            return surfaces.render(surfaces.stock_compare,
+                symbols=names,
+                series=series,
+                stats=stats,
+                correlation=correlation,
+                columns=columns,
+                period=period
+            ), context
+
+        except Exception as e:
+            print(f"Stock Compare Error: {e}")
+            return TextResponse(text=f"Error comparing stocks: {e}"), f"Error comparing {', '.join(symbols)}: {e}"
+
+    def backtest_strategy(self, symbol: str, strategy: str = "ma_cross", period: str = "5y", fast: int = 20, slow: int = 60,
+                          rsi_low: float = 30, rsi_high: float = 70, columns: bool = False,
+                          max_points: Optional[int] = None) -> Union[A2UIResponse, TextResponse]:
+        """
+        Backtest a long/flat rule on daily closes against buy-and-hold.
+        `strategy`: "ma_cross" (long while MA`fast` > MA`slow`), "rsi" (buy below `rsi_low`,
+        sell above `rsi_high`) or "buy_and_hold". Signals trade on the next bar; no costs.
+        `columns` / `max_points` as in get_stock_chart.
+        """
+        from app.services import backtest as bt
+        from app.services.chart_series import build_chart_series, build_chart_columns, point_budget
+
+        strategy = (strategy or "ma_cross").strip().lower()
+        period = period if period in self.BACKTEST_PERIODS else "5y"
+        fast, slow = int(fast), int(slow)
+        rsi_low, rsi_high = float(rsi_low), float(rsi_high)
+        if strategy not in bt.STRATEGIES:
+            return TextResponse(text=f"Unknown strategy: {strategy}"), f"Unknown backtest strategy {strategy}"
+        if strategy == "ma_cross" and not 2 <= fast < slow <= 250:
+            return TextResponse(text="Moving averages need 2 <= fast < slow <= 250."), f"Invalid MA windows {fast}/{slow}"
+        if strategy == "rsi" and not 0 < rsi_low < rsi_high < 100:
+            return TextResponse(text="RSI thresholds need 0 < low < high < 100."), f"Invalid RSI thresholds {rsi_low}/{rsi_high}"
+
+        label = {
+            "ma_cross": f"MA{fast}/MA{slow} Crossover",
+            "rsi": f"RSI {rsi_low:g}/{rsi_high:g}",
+            "buy_and_hold": "Buy & Hold",
+        }[strategy]
+        params = {"ma_cross": {"fast": fast, "slow": slow}, "rsi": {"low": rsi_low, "high": rsi_high}}.get(strategy)
+        print(f"Backtesting {label} on {symbol} ({period})")
         try:
-            ticker = yf.Ticker(symbol)
-            divs = ticker.dividends
+            hist = self.price_history.get(symbol, period=period)
+            if len(hist) < 2:
+                return TextResponse(text=f"No historical data found for {symbol}"), f"No data to backtest {symbol}"
+
+            close = hist["Close"].to_numpy(dtype=float)
+            years = (hist.index[-1] - hist.index[0]).days / 365.25
+            result = bt.backtest(close, strategy, years, params)
+            stats = result["stats"]
+
+            runs = [(label, 0, "#0F9D58")] if strategy != "buy_and_hold" else []
+            runs.append(("Buy & Hold", 1, "#4285F4"))
+            specs = [(name, result["equity"][row], color) for name, row, color in runs]
+            max_points = max_points or point_budget()
+            if columns:
+                series = build_chart_columns(hist, specs, max_points=max_points)
+            else:
+                series = build_chart_series(hist, specs, max_points=max_points)
+
+            def number(value, fmt):
+                return format(value, fmt) if math.isfinite(value) else "N/A"
+
+            table = [
+                ("Total Return", [number(stats["total_return"][row] * 100, "+.1f") + "%" for _, row, _ in runs]),
+                ("CAGR", [number(stats["cagr"][row] * 100, "+.1f") + "%" for _, row, _ in runs]),
+                ("Max Drawdown", [number(stats["max_drawdown"][row] * 100, ".1f") + "%" for _, row, _ in runs]),
+                ("Sharpe", [number(stats["sharpe"][row], ".2f") for _, row, _ in runs]),
+                ("Trades", [str(int(stats["trades"][row])) for _, row, _ in runs]),
+                ("Time in Market", [f"{stats['exposure'][row] * 100:.0f}%" for _, row, _ in runs]),
+            ]
+            final = [f"${result['equity'][row, -1]:,.0f}" for _, row, _ in runs]
+            context = f"Backtest of {label} on {symbol.upper()} over {period} ({hist.index[0]:%Y-%m-%d} to {hist.index[-1]:%Y-%m-%d}, next-bar execution, no costs): "
+            context += "; ".join(
+                f"{name}: $10,000 -> {final[i]}, " + ", ".join(f"{metric} {values[i]}" for metric, values in table)
+                for i, (name, _, _) in enumerate(runs)
+            ) + "."
+            return surfaces.render(surfaces.stock_backtest,
+                symbol=symbol.upper(),
+                strategy=label,
+                series=series,
+                runs=[name for name, _, _ in runs],
+                final=final,
+                table=table,
+                columns=columns,
+                period=period
+            ), context
+
+        except Exception as e:
+            print(f"Backtest Error: {e}")
+            return TextResponse(text=f"Error running backtest: {e}"), f"Error backtesting {symbol}: {e}"
+
+    def screen_stocks(self, conditions: Optional[List[Any]] = None, universe: Optional[str] = None,
+                      symbols: Optional[Union[List[str], str]] = None, sort_by: Optional[str] = None,
+                      descending: Optional[bool] = None, limit: int = 20) -> Union[A2UIResponse, TextResponse]:
+        """
+        Scan a universe (built-in name or `symbols`) for stocks meeting every condition,
+        e.g. [{"field": "rsi", "op": "<", "value": 30}] or ["ma20 > ma60"], and show the
+        best `limit` ranked by `sort_by`. Runs within the screener's time budget; symbols
+        that could not be fetched or computed in time are listed as skipped.
+        """
+        from app.services import screener
+
+        if isinstance(symbols, str):
+            symbols = symbols.split(",")
+        if symbols:
+            name = "Custom list"
+            symbols = [str(s) for s in symbols][:self.SCREEN_MAX_SYMBOLS]
+        else:
+            universe = (universe or "dow30").strip().lower()
+            if universe not in screener.UNIVERSES:
+                return (TextResponse(text=f"Unknown universe: {universe}. Available: {', '.join(screener.UNIVERSES)}"),
+                        f"Unknown screener universe {universe}")
+            name = screener.UNIVERSE_LABELS.get(universe, universe)
+            symbols = screener.UNIVERSES[universe]
+        try:
+            parsed = screener.parse_conditions(conditions or [])
+            if sort_by is not None and sort_by.strip().lower() not in screener.FIELDS:
+                raise ValueError(f"Unknown field: {sort_by}")
+        except ValueError as e:
+            return TextResponse(text=f"{e}. Fields: {', '.join(screener.FIELDS)}"), f"Invalid screen: {e}"
+        limit = max(1, min(int(limit or 20), 50))
+        described = " and ".join(f"{f} {op} {v:g}" if not isinstance(v, str) else f"{f} {op} {v}" for f, op, v in parsed) or "no conditions"
+
+        print(f"Screening {name} ({len(symbols)} symbols) for {described}")
+        try:
+            result = screener.screen(self.price_history, symbols, parsed, sort_by=sort_by and sort_by.strip().lower(),
+                                     descending=descending, limit=limit)
+            fields = result["fields"]
+            headers = ["Symbol"] + [screener.FIELDS[f] for f in fields]
+            rows = [[m["symbol"]] + [screener.format_value(f, m[f]) for f in fields] for m in result["matches"]]
+            skipped = sum(len(found) for found in result["skipped"].values())
+            summary = (f"{result['matched']} of {result['scanned']} matched, "
+                       f"ranked by {screener.FIELDS[result['sort_by']]} ({result['elapsed']:.1f}s)")
+            if skipped:
+                summary += " | skipped: " + ", ".join(f"{len(found)} {reason}" for reason, found in result["skipped"].items())
+
+            context = f"Screened {name} for {described}: {summary}."
+            if rows:
+                context += " Top: " + "; ".join(
+                    f"{row[0]} (" + ", ".join(f"{h} {v}" for h, v in zip(headers[1:], row[1:])) + ")" for row in rows) + "."
+            for reason, found in result["skipped"].items():
+                context += f" Skipped ({reason}): {', '.join(found[:20])}{' ...' if len(found) > 20 else ''}."
+            return surfaces.render(surfaces.stock_screen,
+                universe=name,
+                conditions=described,
+                headers=headers,
+                rows=rows,
+                summary=summary
+            ), context
+
+        except Exception as e:
+            print(f"Screener Error: {e}")
+            return TextResponse(text=f"Error screening stocks: {e}"), f"Error screening {name}: {e}"
+
+    def get_stock_dividends(self, symbol: str, columns: bool = False, max_points: Optional[int] = None) -> Union[A2UIResponse, TextResponse]:
+        from app.services.chart_series import build_chart_series, build_chart_columns, point_budget
+        try:
+            snapshot = self.snapshots.get(symbol)
+            divs = snapshot.get("dividends")
             if divs.empty:
                 return TextResponse(text=f"No dividend data found for {symbol}"), f"No dividend data for {symbol}"
             
             # Last 20 entries
-            recent_divs = divs.tail(20)
-            data = []
-            for date, value in recent_divs.items():
-                data.append({"time": date.strftime("%Y-%m-%d"), "value": float(value)})
-            
-            current_yield = ticker.info.get('dividendYield', 0) * 100 if ticker.info.get('dividendYield') else 0
-            
-            return self._render_template("stock_dividends.json.j2", {
-                "symbol": symbol.upper(),
-                "dividends": data,
-                "yield": f"{current_yield:.2f}%"
-            }), f"Showing dividend history for {symbol}"
+            recent_divs = divs.tail(20).to_frame("Dividends")
+            specs = [("Dividends", "Dividends", "#4285F4")]
+            max_points = max_points or point_budget()
+            if columns:
+                # Dividends are small amounts; keep 4 decimals
+                data = build_chart_columns(recent_divs, specs, precision=4, max_points=max_points)
+            else:
+                data = build_chart_series(recent_divs, specs, max_points=max_points)[0]["data"]
+            
+            info = snapshot.info("price")
+            current_yield = info.get('dividendYield', 0) * 100 if info.get('dividendYield') else 0
+            
+            return surfaces.render(surfaces.stock_dividends,
+                symbol=symbol.upper(),
+                dividends=data,
+                dividend_yield=f"{current_yield:.2f}%",
+                columns=columns
+            ), f"Showing dividend history for {symbol}"
         except Exception as e:
             return TextResponse(text=f"Error fetching dividends: {e}"), f"Error: {e}"
 
     def get_stock_holders(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            inst = ticker.institutional_holders
+            snapshot = self.snapshots.get(symbol)
+            info = snapshot.info("ownership")
+            inst = snapshot.get("institutional_holders")
             
             insider_pct = f"{info.get('heldPercentInsiders', 0)*100:.2f}%" if info.get('heldPercentInsiders') is not None else "N/A"
             inst_pct = f"{info.get('heldPercentInstitutions', 0)*100:.2f}%" if info.get('heldPercentInstitutions') is not None else "N/A"
@@ -308,20 +581,18 @@ class StockService(RestaurantService):
                         "pct": f"{row['pctChange']*100:.2f}%" if 'pctChange' in row else "-"
                     })
             
-            return self._render_template("stock_holders.json.j2", {
-                "symbol": symbol.upper(),
-                "insider_pct": insider_pct,
-                "inst_pct": inst_pct,
-                "top_holders": top_holders
-            }), f"Showing holders for {symbol}"
+            return surfaces.render(surfaces.stock_holders,
+                symbol=symbol.upper(),
+                insider_pct=insider_pct,
+                inst_pct=inst_pct,
+                top_holders=top_holders
+            ), f"Showing holders for {symbol}"
         except Exception as e:
             return TextResponse(text=f"Error fetching holders: {e}"), f"Error: {e}"
 
     def get_stock_calendar(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
         try:
-            ticker = yf.Ticker(symbol)
-            cal = ticker.calendar
+            cal = self.snapshots.get(symbol).get("calendar")
             
             events = []
             if isinstance(cal, dict):
@@ -336,22 +607,20 @@ class StockService(RestaurantService):
                     
                     events.append({"name": k, "value": val})
             
-            return self._render_template("stock_calendar.json.j2", {
-                "symbol": symbol.upper(),
-                "events": events
-            }), f"Showing calendar for {symbol}"
+            return surfaces.render(surfaces.stock_calendar,
+                symbol=symbol.upper(),
+                events=events
+            ), f"Showing calendar for {symbol}"
         except Exception as e:
             return TextResponse(text=f"Error fetching calendar: {e}"), f"Error: {e}"
 
     
     def get_stock_news(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
         from datetime import datetime
         
         print(f"Fetching news for {symbol}")
         try:
-            ticker = yf.Ticker(symbol)
-            news = ticker.news
+            news = self.snapshots.get(symbol).get("news")
             
             if not news:
                 return TextResponse(text=f"No news found for {symbol}")
@@ -384,29 +653,26 @@ class StockService(RestaurantService):
                 publisher = provider.get('displayName', 'Unknown')
                 
                 news_list.append({
-                    'title': content.get('title', 'No title').replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' '),
+                    'title': content.get('title', 'No title').replace('\n', ' '),
                     'link': link,
-                    'publisher': publisher.replace('\\', '\\\\').replace('"', '\\"'),
+                    'publisher': publisher,
                     'date': date_str
                 })
             
             context = f"Found {len(news_list)} recent news items for {symbol}. Top stories: " + ", ".join([n['title'] for n in news_list[:3]])
-            return self._render_template("stock_news.json.j2", {
-                "symbol": symbol.upper(),
-                "news_list": news_list
-            }), context
+            return surfaces.render(surfaces.stock_news,
+                symbol=symbol.upper(),
+                news_list=news_list
+            ), context
             
         except Exception as e:
             print(f"News Error: {e}")
             return TextResponse(text=f"Error fetching news: {e}"), f"Error fetching news for {symbol}: {e}"
 
     def get_stock_info(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
-        
         print(f"Fetching stock info for {symbol}")
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self.snapshots.get(symbol).info("profile", "price", "analyst")
             
             # Extract key data with fallbacks
             profile = {
@@ -439,26 +705,33 @@ class StockService(RestaurantService):
                 financials["dividendYield"] = f"{financials['dividendYield'] * 100:.2f}%"
                 
             context = f"Company Profile for {symbol}: {profile['name']} ({profile['sector']}). Summary: {profile['summary'][:100]}... Key Stats: Market Cap {financials['marketCap']}, P/E {financials['trailingPE']}."
-            return self._render_template("stock_info.json.j2", {
-                "symbol": symbol.upper(),
-                "profile": profile,
-                "financials": financials
-            }), context
+            return surfaces.render(surfaces.stock_info,
+                symbol=symbol.upper(),
+                profile=profile,
+                financials=financials
+            ), context
             
         except Exception as e:
             print(f"Stock Info Error: {e}")
             return TextResponse(text=f"Error fetching stock info: {e}"), f"Error fetching profile for {symbol}: {e}"
 
-    def get_technical_indicators(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
-        import pandas as pd
-        import numpy as np
-        
+    def get_technical_indicators(self, symbol: str, indicators: Optional[List[str]] = None) -> Union[A2UIResponse, TextResponse]:
+        """
+        RSI and MACD are always shown; `indicators` adds any of ma, bollinger, atr,
+        stochastic, obv and vwap (see app.services.indicators).
+        """
+        from app.services import indicators as ind
+
+        requested = [str(name).strip().lower() for name in (indicators or [])]
+        extras = [name for name in dict.fromkeys(requested) if name not in ("rsi", "macd")]
+        unknown = [name for name in extras if name not in ind.INDICATORS]
+        if unknown:
+            return TextResponse(text=f"Unknown indicators: {', '.join(unknown)}"), f"Unknown indicators requested: {', '.join(unknown)}"
         print(f"Calculating technical indicators for {symbol}")
         try:
-            ticker = yf.Ticker(symbol)
-            # Fetch 6 months of data to ensure enough for MACD/RSI
-            hist = ticker.history(period="6mo")
+            # The cache always holds a year (its minimum fetch); the last 6 months are shown
+            history = self.price_history.get(symbol, period="1y")
+            hist = self.price_history.get(symbol, period="6mo")
             
             if hist.empty:
                 return TextResponse(text=f"No historical data found for {symbol}")
@@ -466,14 +739,11 @@ class StockService(RestaurantService):
             # Close prices
             close = hist['Close']
             
-            # --- RSI (14) Calculation ---
-            delta = close.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
+            # RSI (14) and MACD (12, 26, 9) from the per-symbol streaming engine, fed the
+            # full cached year: the engine keeps its first bar as a fixed origin, so a
+            # window that rolls forward only applies the bars that arrived since the last call
+            latest = self.indicator_engines.sync(symbol, history['Close'])
+            current_rsi = latest["rsi"]
             
             rsi_signal = "Neutral"
             if current_rsi > 70:
@@ -481,62 +751,63 @@ class StockService(RestaurantService):
             elif current_rsi < 30:
                 rsi_signal = "Oversold (Buy Opportunity)"
                 
-            # --- MACD (12, 26, 9) Calculation ---
-            exp1 = close.ewm(span=12, adjust=False).mean()
-            exp2 = close.ewm(span=26, adjust=False).mean()
-            macd_line = exp1 - exp2
-            signal_line = macd_line.ewm(span=9, adjust=False).mean()
-            histogram = macd_line - signal_line
-            
-            current_macd = macd_line.iloc[-1]
-            current_signal = signal_line.iloc[-1]
-            current_hist = histogram.iloc[-1]
+            current_macd = latest["macd"]
+            current_signal = latest["signal"]
+            current_hist = latest["histogram"]
             
             macd_signal = "Neutral"
-            if current_hist > 0 and histogram.iloc[-2] <= 0:
+            if current_hist > 0 and latest["previous_histogram"] <= 0:
                 macd_signal = "Bullish Crossover (Buy)"
-            elif current_hist < 0 and histogram.iloc[-2] >= 0:
+            elif current_hist < 0 and latest["previous_histogram"] >= 0:
                 macd_signal = "Bearish Crossover (Sell)"
             elif current_macd > current_signal:
                 macd_signal = "Bullish Trend"
             elif current_macd < current_signal:
                 macd_signal = "Bearish Trend"
             
+            # Other indicators from the vectorized library, on a one-symbol panel
+            summaries = []
+            if extras:
+                _, _, panel = ind.panel_from_frames({symbol: hist})
+                results = ind.compute(panel, extras)
+                summaries = [ind.summarize(name, results[name], panel["Close"]) for name in extras]
+
             context = f"Technical Indicators for {symbol}: RSI is {current_rsi:.1f} ({rsi_signal}). MACD is {current_macd:.2f} ({macd_signal}). Price: ${close.iloc[-1]:.2f}."
-            return self._render_template("stock_indicators.json.j2", {
-                "symbol": symbol.upper(),
-                "rsi": {
+            context += "".join(f" {s['title']}: {s['value']} ({s['signal']})." for s in summaries)
+            return surfaces.render(surfaces.stock_indicators,
+                symbol=symbol.upper(),
+                rsi={
                     "value": f"{current_rsi:.1f}",
                     "signal": rsi_signal,
                     "color": "#ef4444" if current_rsi > 70 else ("#22c55e" if current_rsi < 30 else "#eab308")
                 },
-                "macd": {
+                macd={
                     "line": f"{current_macd:.2f}",
                     "signal_line": f"{current_signal:.2f}",
                     "histogram": f"{current_hist:.2f}",
                     "signal": macd_signal,
                     "color": "#22c55e" if current_macd > current_signal else "#ef4444"
                 },
-                "price": f"${close.iloc[-1]:.2f}",
-                "date": hist.index[-1].strftime("%Y-%m-%d")
-            }), context
+                price=f"${close.iloc[-1]:.2f}",
+                date=hist.index[-1].strftime("%Y-%m-%d"),
+                extras=summaries
+            ), context
             
         except Exception as e:
             print(f"Technical Indicator Error: {e}")
             return TextResponse(text=f"Error calculating indicators: {e}"), f"Error calculating technical indicators for {symbol}: {e}"
 
     def get_company_fundamentals(self, symbol: str) -> Union[A2UIResponse, TextResponse]:
-        import yfinance as yf
         import pandas as pd
         
         print(f"Fetching fundamentals for {symbol}")
         try:
-            ticker = yf.Ticker(symbol)
+            snapshot = self.snapshots.get(symbol)
             
             # 1. Financials (Income Statement) - Last 4 years
             financials_data = []
             try:
-                fin = ticker.financials
+                fin = snapshot.get("financials")
                 if not fin.empty:
                     # Get Total Revenue and Net Income
                     # Transpose to iterate by date (columns)
@@ -555,7 +826,7 @@ class StockService(RestaurantService):
             # 2. Major Holders
             holders_data = {"insiders": "N/A", "institutions": "N/A"}
             try:
-                holders = ticker.major_holders
+                holders = snapshot.get("major_holders")
                 # yfinance major_holders can be a DataFrame or dict depending on version/data
                 # Typically it matches output from research script:
                 # 0: 0.17% % of Shares Held by All Insider
@@ -577,7 +848,7 @@ class StockService(RestaurantService):
             # 3. Recommendations
             recommendations_data = []
             try:
-                recs = ticker.recommendations_summary
+                recs = snapshot.get("recommendations_summary")
                 if recs is not None and not recs.empty:
                     # Take the most recent period (period='0m')
                     latest = recs.iloc[0]
@@ -592,26 +863,22 @@ class StockService(RestaurantService):
                  print(f"Recs Error: {e}")
 
             context = f"Fundamentals for {symbol}: Financials (Last 4Y Revenue/NetIncome): {financials_data}. Recommendations: {recommendations_data}. Major Holders: {holders_data}."
-            return self._render_template("stock_fundamentals.json.j2", {
-                "symbol": symbol.upper(),
-                "financials": financials_data,
-                "holders": holders_data,
-                "recommendations": recommendations_data
-            }), context
+            return surfaces.render(surfaces.stock_fundamentals,
+                symbol=symbol.upper(),
+                financials=financials_data,
+                holders=holders_data,
+                recommendations=recommendations_data
+            ), context
             
         except Exception as e:
             print(f"Fundamentals Error: {e}")
             return TextResponse(text=f"Error fetching fundamentals: {e}"), f"Error fetching fundamentals for {symbol}: {e}"
 
 class ShoppingService(RestaurantService):
-    def search_products(self, query: str) -> Union[A2UIResponse, TextResponse]:
-        import httpx
-        import xml.etree.ElementTree as ET
+    def _naver_shop_request(self, query: str) -> Tuple[str, Dict[str, str]]:
         from urllib.parse import quote
         import os
-        
-        print(f"Searching products for {query}")
-        
+
         # Prefer env vars, fallback to class constants if empty (for backward compat)
         client_id = os.environ.get("NAVER_CLIENT_ID", self.NAVER_CLIENT_ID)
         client_secret = os.environ.get("NAVER_CLIENT_SECRET", self.NAVER_CLIENT_SECRET)
@@ -622,50 +889,76 @@ class ShoppingService(RestaurantService):
             "X-Naver-Client-Id": client_id,
             "X-Naver-Client-Secret": client_secret
         }
+        return url, headers
+
+    def _render_products(self, query: str, xml_text: str) -> Tuple[Union[A2UIResponse, TextResponse], str]:
+        import xml.etree.ElementTree as ET
+
+        # Parse XML
+        root = ET.fromstring(xml_text)
+        channel = root.find("channel")
+        
+        items = []
+        if channel:
+            for item in channel.findall("item"):
+                # Clean tags
+                title = item.find("title").text or ""
+                title = title.replace("<b>", "").replace("</b>", "")
+                
+                link = item.find("link").text or "#"
+                image = item.find("image").text or ""
+                mall_name = item.find("mallName").text or "Unknown Store"
+                lprice = item.find("lprice").text or "0"
+                
+                # Format price with commas
+                try:
+                    lprice_fmt = f"{int(lprice):,}"
+                except:
+                    lprice_fmt = lprice
+                
+                items.append({
+                    "title": title,
+                    "link": link,
+                    "image": image,
+                    "mallName": mall_name,
+                    "lprice": lprice_fmt
+                })
+        
+        if not items:
+            return TextResponse(text=f"No products found for '{query}'"), f"No products found for {query}."
+            
+        context = f"Found {len(items)} products for '{query}'. Top items: " + ", ".join([i['title'] for i in items[:3]])
+        return surfaces.render(surfaces.product_list,
+            query=query,
+            items=items
+        ), context
+
+    def search_products(self, query: str) -> Union[A2UIResponse, TextResponse]:
+        import httpx
+        
+        print(f"Searching products for {query}")
+        url, headers = self._naver_shop_request(query)
         
         try:
             response = httpx.get(url, headers=headers, timeout=10.0)
             response.raise_for_status()
+            return self._render_products(query, response.text)
             
-            # Parse XML
-            root = ET.fromstring(response.text)
-            channel = root.find("channel")
-            
-            items = []
-            if channel:
-                for item in channel.findall("item"):
-                    # Clean tags
-                    title = item.find("title").text or ""
-                    title = title.replace("<b>", "").replace("</b>", "")
-                    
-                    link = item.find("link").text or "#"
-                    image = item.find("image").text or ""
-                    mall_name = item.find("mallName").text or "Unknown Store"
-                    lprice = item.find("lprice").text or "0"
-                    
-                    # Format price with commas
-                    try:
-                        lprice_fmt = f"{int(lprice):,}"
-                    except:
-                        lprice_fmt = lprice
-                    
-                    items.append({
-                        "title": title,
-                        "link": link,
-                        "image": image,
-                        "mallName": mall_name,
-                        "lprice": lprice_fmt
-                    })
-            
-            if not items:
-                return TextResponse(text=f"No products found for '{query}'"), f"No products found for {query}."
-                
-            context = f"Found {len(items)} products for '{query}'. Top items: " + ", ".join([i['title'] for i in items[:3]])
-            return self._render_template("product_list.json.j2", {
-                "query": query,
-                "items": items
-            }), context
-            
+        except Exception as e:
+            print(f"Shopping API Error: {e}")
+            return TextResponse(text=f"Error searching products: {e}"), f"Error searching products: {e}"
+
+    async def search_products_async(self, query: str) -> Union[A2UIResponse, TextResponse]:
+        from app.services.runtime import get_http_client
+
+        print(f"Searching products for {query}")
+        url, headers = self._naver_shop_request(query)
+
+        try:
+            response = await get_http_client().get(url, headers=headers)
+            response.raise_for_status()
+            return self._render_products(query, response.text)
+
         except Exception as e:
             print(f"Shopping API Error: {e}")
             return TextResponse(text=f"Error searching products: {e}"), f"Error searching products: {e}"
@@ -0,0 +1,84 @@
+"""
+Vectorized fixed-rate loan amortization.
+
+Every function broadcasts its principal / annual rate (%) / years arguments
+like NumPy operands, so one call prices a single loan or a whole what-if grid.
+Schedules use the closed-form balance after k payments,
+
+    B_k = P (1 + r)^k - M ((1 + r)^k - 1) / r
+
+for every (scenario, month) at once instead of stepping month by month.
+"""
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+# Most scenarios one grid may expand to, and most of them with full schedules
+MAX_SCENARIOS = 100_000
+MAX_SCHEDULE_SCENARIOS = 100
+# Longest term and highest annual rate (%) accepted; a schedule has a column per month of the longest term
+MAX_YEARS = 50
+MAX_RATE = 100
+
+
+def _terms(principal: Any, annual_rate: Any, years: Any):
+    principal, annual_rate, years = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float), np.asarray(years, dtype=float))
+    if not (np.isfinite(principal).all() and np.isfinite(annual_rate).all() and np.isfinite(years).all()):
+        raise ValueError("Principal, rate and term must be finite numbers")
+    if (years > MAX_YEARS).any() or (annual_rate > MAX_RATE).any():
+        raise ValueError(f"Terms are limited to {MAX_YEARS} years and rates to {MAX_RATE}%")
+    months = np.rint(years * 12).astype(np.int64)
+    if (principal <= 0).any() or (months <= 0).any() or (annual_rate < 0).any():
+        raise ValueError("Principal and term must be positive and the rate not negative")
+    return principal, annual_rate / 100 / 12, months
+
+
+def monthly_payment(principal: Any, annual_rate: Any, years: Any) -> np.ndarray:
+    """The level monthly payment (zero-rate loans repay principal / months)."""
+    principal, r, months = _terms(principal, annual_rate, years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level = principal * r / -np.expm1(-months * np.log1p(r))
+    return np.where(r > 0, level, principal / months)
+
+
+def summary(principal: Any, annual_rate: Any, years: Any) -> Dict[str, np.ndarray]:
+    """{"monthly", "total", "interest", "months"} for each (broadcast) scenario."""
+    principal, r, months = _terms(principal, annual_rate, years)
+    monthly = monthly_payment(principal, annual_rate, years)
+    total = monthly * months
+    return {"monthly": monthly, "total": total, "interest": total - principal, "months": months}
+
+
+def schedule(principal: Any, annual_rate: Any, years: Any) -> Dict[str, np.ndarray]:
+    """
+    Month-by-month schedules, each array (scenarios, months of the longest term):
+    "payment", "interest" and "principal" paid in month k and the "balance" left
+    after it. Shorter loans are zero after their last payment. Scalars give one row.
+    """
+    principal, r, months = _terms(principal, annual_rate, years)
+    principal, r, months = principal.reshape(-1, 1), r.reshape(-1, 1), months.reshape(-1, 1)
+    monthly = monthly_payment(principal, r * 1200, months / 12)
+    k = np.arange(1, int(months.max()) + 1)
+    growth = np.exp(np.log1p(r) * k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(r > 0, np.expm1(np.log1p(r) * k) / r, k)
+    active = k <= months
+    balance = np.where(k < months, np.maximum(principal * growth - monthly * annuity, 0.0), 0.0)
+    opening = np.hstack([principal, balance[:, :-1]])
+    interest = np.where(active, opening * r, 0.0)
+    paid = np.where(active, opening - balance, 0.0)
+    return {"payment": paid + interest, "interest": interest, "principal": paid, "balance": balance}
+
+
+def grid(principals: Sequence[float], rates: Sequence[float], years: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Every principal x rate x years combination as flat arrays ("principal",
+    "rate", "years" and summary()'s fields), principal varying slowest.
+    """
+    p, r, y = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (principals, rates, years))
+    count = p.size * r.size * y.size
+    if count > MAX_SCENARIOS:
+        raise ValueError(f"{count} scenarios requested (max {MAX_SCENARIOS})")
+    p, r, y = (a.ravel() for a in np.meshgrid(p, r, y, indexing="ij"))
+    return {"principal": p, "rate": r, "years": y, **summary(p, r, y)}
@@ -0,0 +1,104 @@
+"""
+Vectorized backtests of simple long/flat strategies on daily closes.
+
+A strategy turns closes into a target position per bar (1 = long, 0 = flat),
+decided on that bar's close. The position is held from the next bar on, so a
+signal never trades on the price it was computed from. Strategies and the
+buy-and-hold baseline are rows of one (runs, bars) array and are evaluated in a
+single pass: no loop over bars anywhere.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services import indicators as ind
+
+TRADING_DAYS = 252
+
+
+def ma_cross_positions(close: Any, fast: int = 20, slow: int = 60) -> np.ndarray:
+    """Long while the fast SMA is above the slow one (golden cross in, dead cross out)."""
+    fast_ma, slow_ma = ind.sma(close, fast), ind.sma(close, slow)
+    with np.errstate(invalid="ignore"):
+        return (fast_ma > slow_ma).astype(float)
+
+
+def rsi_positions(close: Any, low: float = 30, high: float = 70, window: int = 14) -> np.ndarray:
+    """Buy when RSI drops below `low`, sell when it rises above `high`, hold in between."""
+    rsi = ind.rsi(close, window)
+    with np.errstate(invalid="ignore"):
+        signal = np.where(rsi < low, 1.0, np.where(rsi > high, 0.0, np.nan))
+    # Between an entry and an exit the last signal stands
+    return np.nan_to_num(ind.forward_fill(signal), nan=0.0)
+
+
+def buy_and_hold_positions(close: Any) -> np.ndarray:
+    return np.isfinite(ind._panel(close)).astype(float)
+
+
+STRATEGIES = {
+    "ma_cross": ma_cross_positions,
+    "rsi": rsi_positions,
+    "buy_and_hold": buy_and_hold_positions,
+}
+
+
+def run(close: Any, positions: Any, initial: float = 10_000.0, cost_bps: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Equity curves for each row of `positions` over the same closes.
+
+    Returns {"returns", "equity", "held"}, each (runs, bars): the bar's strategy
+    return, the account value after it and the position held during it.
+    `cost_bps` is charged on every change of position.
+    """
+    close = ind._panel(close)
+    positions = ind._panel(positions)
+    price_returns = np.zeros(close.shape)
+    price_returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    price_returns = np.nan_to_num(price_returns)
+    held = np.zeros(positions.shape)
+    held[:, 1:] = positions[:, :-1]
+    turnover = np.abs(np.diff(held, axis=1, prepend=0.0))
+    returns = held * price_returns - turnover * cost_bps / 10_000
+    equity = initial * np.cumprod(1 + returns, axis=1)
+    return {"returns": returns, "equity": equity, "held": held}
+
+
+def summary(result: Dict[str, np.ndarray], years: float, periods_per_year: float = TRADING_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Per-run statistics of a run() result: total return, CAGR and max drawdown
+    (fractions), annualized Sharpe ratio (risk-free rate 0), number of trades
+    (entries) and exposure (share of bars in the market).
+    """
+    equity, returns, held = result["equity"], result["returns"], result["held"]
+    start = equity[:, :1] / (1 + returns[:, :1])
+    growth = equity[:, -1] / start[:, 0]
+    drawdown = equity / np.maximum.accumulate(np.maximum(equity, start), axis=1) - 1
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.full(returns.shape[0], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std * np.sqrt(periods_per_year), np.nan)
+        cagr = growth ** (1 / years) - 1 if years > 0 else np.full(growth.shape, np.nan)
+    entries = (np.diff(held, axis=1, prepend=0.0) > 0).sum(axis=1)
+    return {
+        "total_return": growth - 1,
+        "cagr": cagr,
+        "max_drawdown": drawdown.min(axis=1),
+        "sharpe": sharpe,
+        "trades": entries,
+        "exposure": held.mean(axis=1),
+    }
+
+
+def backtest(close: Any, strategy: str, years: float, params: Optional[Dict[str, Any]] = None,
+             initial: float = 10_000.0, cost_bps: float = 0.0) -> Dict[str, Any]:
+    """
+    `strategy` and the buy-and-hold baseline over one symbol's closes.
+    Returns run()'s arrays and summary()'s stats, row 0 the strategy and row 1 the baseline.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    close = ind._panel(close)
+    positions = np.vstack([STRATEGIES[strategy](close, **(params or {})), buy_and_hold_positions(close)])
+    result = run(np.vstack([close, close]), positions, initial=initial, cost_bps=cost_bps)
+    result["stats"] = summary(result, years)
+    return result
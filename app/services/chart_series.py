@@ -0,0 +1,227 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# (name, column name or values aligned with the history index, color)
+SeriesSpec = Tuple[str, Union[str, Sequence[float], pd.Series, np.ndarray], str]
+
+# Decimals kept for values in the columnar chart format
+CHART_PRECISION = int(os.environ.get("A2UI_CHART_PRECISION", "2"))
+
+# Points per chart when the client does not send a budget, and the range a client budget is clamped to
+DEFAULT_CHART_POINTS = int(os.environ.get("A2UI_CHART_POINTS", "400"))
+MIN_CHART_POINTS = 50
+MAX_CHART_POINTS = 2000
+# Client budgets are rounded down to this step so similar clients share coalesced tool calls
+CHART_POINTS_STEP = 50
+
+
+def point_budget(requested: Any = None) -> int:
+    """The chart point budget for a request: the client's (clamped, rounded) or the server default."""
+    try:
+        budget = int(float(requested))
+    except (TypeError, ValueError):
+        return DEFAULT_CHART_POINTS
+    budget = min(max(budget, MIN_CHART_POINTS), MAX_CHART_POINTS)
+    return budget - budget % CHART_POINTS_STEP
+
+
+def shared_point_budget(budget: int, lines: int) -> int:
+    """
+    Points per line when `lines` comparable lines share one chart: the budget
+    shrinks with the square root of the line count past two, so the payload of
+    a comparison grows ~sqrt(lines) while each line keeps MIN_CHART_POINTS.
+    """
+    if lines <= 2:
+        return budget
+    points = int(budget * (2 / lines) ** 0.5)
+    return max(points - points % CHART_POINTS_STEP, MIN_CHART_POINTS)
+
+
+def lttb_indices(values: Any, budget: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps out of `values`.
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    next bucket's average, which preserves peaks and troughs. Bars are evenly
+    spaced on the x axis (as the chart draws them). NaNs are filled from
+    neighbours so they never win a bucket.
+    """
+    y = pd.Series(np.asarray(values, dtype=float)).ffill().bfill().to_numpy()
+    n = len(y)
+    if budget >= n or n <= 2:
+        return np.arange(n)
+    budget = max(budget, 3)
+    every = (n - 2) / (budget - 2)
+    bounds = np.append((np.arange(budget - 1) * every).astype(np.int64) + 1, n)
+    # Average point of every bucket (the last "bucket" is the final point), in one pass
+    sizes = np.diff(bounds)
+    avg_x = (np.add.reduceat(np.arange(n, dtype=float), bounds[:-1]) / sizes).tolist()
+    avg_y = (np.add.reduceat(y, bounds[:-1]) / sizes).tolist()
+    # Buckets hold a handful of points, so plain Python beats numpy per bucket
+    ys = y.tolist()
+    bounds = bounds.tolist()
+    kept = [0]
+    a = 0
+    for i in range(budget - 2):
+        ax, ay = a, ys[a]
+        dx, dy = ax - avg_x[i + 1], avg_y[i + 1] - ay
+        best, best_area = bounds[i], -1.0
+        for j in range(bounds[i], bounds[i + 1]):
+            area = abs(dx * (ys[j] - ay) - (ax - j) * dy)
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        kept.append(a)
+    kept.append(n - 1)
+    kept = np.asarray(kept, dtype=np.int64)
+    return kept
+
+
+def format_times(index: pd.DatetimeIndex, date_format: Optional[str] = "%Y-%m-%d") -> np.ndarray:
+    """
+    Format the whole index in one call instead of strftime per row. With no
+    `date_format` (intraday bars) times are UNIX seconds of the exchange's wall
+    clock, which the chart library displays as-is.
+    """
+    if date_format is None:
+        local = index.tz_localize(None) if index.tz is not None else index
+        return (local.as_unit("s").asi8).astype(object)
+    if date_format == "%Y-%m-%d":
+        # Day-resolution datetime64 already prints as ISO dates; much faster than strftime
+        return _days(index).astype(str).astype(object)
+    return np.asarray(index.strftime(date_format), dtype=object)
+
+
+def _days(index: pd.DatetimeIndex) -> np.ndarray:
+    local = index.tz_localize(None) if index.tz is not None else index
+    return local.to_numpy().astype("datetime64[D]")
+
+
+def series_points(times: np.ndarray, values: Any) -> List[Dict[str, Any]]:
+    """[{"time", "value"}] for every non-NaN value, as plain Python floats."""
+    values = np.asarray(values, dtype=float)
+    mask = ~np.isnan(values)
+    return [{"time": t, "value": v} for t, v in zip(times[mask].tolist(), values[mask].tolist())]
+
+
+def _spec_values(hist: pd.DataFrame, specs: Sequence[SeriesSpec]) -> List[Tuple[str, np.ndarray, str]]:
+    resolved = []
+    for name, values, color in specs:
+        if isinstance(values, str):
+            values = hist[values].to_numpy()
+        elif isinstance(values, pd.Series):
+            values = values.to_numpy()
+        if len(values) != len(hist.index):
+            raise ValueError(f"Series {name} has {len(values)} values for {len(hist.index)} bars")
+        resolved.append((name, np.asarray(values, dtype=float), color))
+    return resolved
+
+
+def union_lttb_indices(series: Sequence[Any], budget: int) -> np.ndarray:
+    """
+    The union of every series' LTTB indices, at most `budget` bars, so each line
+    (e.g. each stock of a comparison) keeps its own peaks and troughs on the shared
+    time axis. The per-series budget starts at an even share, which always fits,
+    and grows while the series' kept points overlap enough to stay within `budget`.
+    """
+    def union(per_series):
+        return np.unique(np.concatenate([lttb_indices(values, per_series) for values in series]))
+
+    per_series = max(budget // len(series), 3)
+    keep = union(per_series)
+    while True:
+        grown = per_series * budget // len(keep)
+        if grown <= per_series:
+            return keep
+        candidate = union(grown)
+        if len(candidate) > budget:
+            return keep
+        per_series, keep = grown, candidate
+
+
+def _downsampled(hist: pd.DataFrame, specs: Sequence[SeriesSpec], max_points: Optional[int]):
+    """
+    Resolve the specs and, past `max_points` bars, keep the union of the series'
+    LTTB points (see union_lttb_indices). Every series keeps the same bars, so
+    overlays stay aligned with the price line.
+    """
+    resolved = _spec_values(hist, specs)
+    index = hist.index
+    if max_points and resolved and len(index) > max_points:
+        keep = union_lttb_indices([values for _, values, _ in resolved], max_points)
+        index = index[keep]
+        resolved = [(name, values[keep], color) for name, values, color in resolved]
+    return index, resolved
+
+
+def build_chart_series(hist: pd.DataFrame, specs: Sequence[SeriesSpec], date_format: Optional[str] = "%Y-%m-%d",
+                       max_points: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Chart series for each spec, sharing one formatted time axis.
+
+    A spec's values are either a column of `hist` or an array/Series of the same
+    length (e.g. an extra overlay computed by the caller). NaN points, such as the
+    warm-up window of a moving average, are dropped per series. With `max_points`
+    longer histories are downsampled (see lttb_indices).
+    """
+    index, resolved = _downsampled(hist, specs, max_points)
+    times = format_times(index, date_format)
+    return [{"name": name, "color": color, "data": series_points(times, values)} for name, values, color in resolved]
+
+
+def column_values(values: Any, precision: Optional[int] = CHART_PRECISION) -> List[Optional[float]]:
+    """Values rounded to `precision` decimals (None keeps full precision), NaN as None."""
+    values = np.asarray(values, dtype=float)
+    if precision is not None:
+        values = np.round(values, precision)
+    out = values.tolist()
+    for i in np.flatnonzero(np.isnan(values)).tolist():
+        out[i] = None
+    return out
+
+
+def time_axis(index: pd.DatetimeIndex, date_format: Optional[str] = "%Y-%m-%d") -> Dict[str, Any]:
+    """
+    The shared time axis of a columnar chart: {"start", "step"} (step in days)
+    when the bars are evenly spaced dates, otherwise the explicit {"time"} list.
+    """
+    if date_format == "%Y-%m-%d" and len(index) > 2:
+        days = _days(index).astype(np.int64)
+        steps = np.diff(days)
+        if steps[0] > 0 and (steps == steps[0]).all():
+            return {"start": str(_days(index[:1])[0]), "step": int(steps[0])}
+    return {"time": format_times(index, date_format).tolist()}
+
+
+def build_chart_columns(hist: pd.DataFrame, specs: Sequence[SeriesSpec], precision: Optional[int] = CHART_PRECISION,
+                        date_format: Optional[str] = "%Y-%m-%d", max_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The same chart as build_chart_series in the columnar format: one time axis
+    shared by every series and a value array per series aligned to it, with
+    None where a series has no point (instead of repeating each date per point).
+    """
+    index, resolved = _downsampled(hist, specs, max_points)
+    columns = time_axis(index, date_format)
+    columns["precision"] = precision
+    columns["series"] = [{"name": name, "color": color, "values": column_values(values, precision)}
+                         for name, values, color in resolved]
+    return columns
+
+
+def columns_to_series(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expand columnar chart data back into per-point series (what renderer.js does for the client)."""
+    times = columns.get("time")
+    if times is None:
+        series = columns.get("series") or []
+        length = max((len(s["values"]) for s in series), default=0)
+        start = np.datetime64(columns["start"], "D")
+        times = (start + np.arange(length) * int(columns.get("step") or 1)).astype(str).tolist()
+    return [{
+        "name": s["name"],
+        "color": s.get("color"),
+        "data": [{"time": t, "value": v} for t, v in zip(times, s["values"]) if v is not None],
+    } for s in columns.get("series") or []]
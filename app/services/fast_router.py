@@ -0,0 +1,298 @@
+import re
+import threading
+import unicodedata
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.services.singleflight import normalize_args
+
+# Company names -> symbols (mirrors the examples in the stock router prompt)
+COMPANY_SYMBOLS = {
+    "apple": "AAPL", "애플": "AAPL",
+    "tesla": "TSLA", "테슬라": "TSLA",
+    "starbucks": "SBUX", "스타벅스": "SBUX",
+    "samsung": "005930.KS", "삼성전자": "005930.KS", "삼성": "005930.KS",
+    "nvidia": "NVDA", "엔비디아": "NVDA",
+    "microsoft": "MSFT", "마이크로소프트": "MSFT",
+    "google": "GOOGL", "구글": "GOOGL", "alphabet": "GOOGL", "알파벳": "GOOGL",
+    "amazon": "AMZN", "아마존": "AMZN",
+    "meta": "META", "메타": "META",
+    "netflix": "NFLX", "넷플릭스": "NFLX",
+    "intel": "INTC", "인텔": "INTC",
+    "disney": "DIS", "디즈니": "DIS",
+    "nike": "NKE", "나이키": "NKE",
+    "코카콜라": "KO",
+    "하이닉스": "000660.KS",
+    "naver": "035420.KS", "네이버": "035420.KS",
+    "kakao": "035720.KS", "카카오": "035720.KS",
+    "현대차": "005380.KS", "현대자동차": "005380.KS",
+}
+
+# Bare tickers accepted as-is. One- and two-letter tickers (V, MA, ...) clash with words and are left to the LLM.
+KNOWN_TICKERS = {
+    "aapl", "msft", "googl", "goog", "amzn", "meta", "tsla", "nvda", "nflx", "amd", "intc",
+    "sbux", "ko", "pep", "dis", "nke", "jpm", "avgo", "orcl", "crm", "adbe", "qcom", "pltr",
+    "coin", "uber", "abnb", "spy", "qqq",
+}
+
+# Keyword rules taken from the stock router prompt and the tool descriptions
+STOCK_INTENT_KEYWORDS = {
+    "get_stock_chart": ["차트", "주가", "시세", "주식", "그래프", "chart", "stock", "price", "graph"],
+    "get_stock_news": ["뉴스", "기사", "news", "headlines"],
+    "get_technical_indicators": ["rsi", "macd", "기술적", "지표", "보조지표", "technical", "indicators"],
+    "get_company_fundamentals": ["재무", "재무제표", "실적", "펀더멘털", "fundamentals", "financials"],
+    "get_stock_dividends": ["배당", "배당금", "배당률", "dividend", "dividends"],
+    "get_stock_holders": ["주주", "대주주", "지분", "holders", "shareholders", "ownership"],
+    "get_stock_calendar": ["일정", "캘린더", "실적발표", "calendar", "earnings"],
+    "get_stock_info": ["정보", "기업정보", "회사정보", "개요", "profile", "info"],
+    "compare_stocks": ["비교", "compare", "vs", "versus"],
+    "backtest_strategy": ["백테스트", "백테스팅", "골든크로스", "backtest"],
+}
+
+PLACE_KEYWORDS = {
+    "맛집", "식당", "카페", "술집", "빵집", "병원", "약국", "은행", "편의점", "주유소", "호텔", "헬스장",
+    "restaurant", "restaurants", "cafe", "cafes", "hospital", "hospitals", "pharmacy", "pharmacies",
+}
+
+# Well-known areas accepted as a location on their own ("강남 맛집"). Any other word is only taken
+# as a location with explicit syntax ("in X", "X에서", "X 근처"), so "조용한 카페" goes to the LLM.
+KNOWN_LOCATIONS = {
+    "강남", "강남역", "홍대", "신촌", "이태원", "명동", "종로", "을지로", "성수", "건대", "잠실", "여의도", "압구정",
+    "신사", "합정", "연남", "판교", "분당", "서울", "부산", "해운대", "서면", "대구", "대전", "광주", "인천", "제주",
+    "gangnam", "hongdae", "sinchon", "itaewon", "myeongdong", "jongno", "seongsu", "jamsil", "yeouido",
+    "pangyo", "seoul", "busan", "haeundae", "daegu", "daejeon", "gwangju", "incheon", "jeju",
+}
+# Words marking the next (English) or previous (Korean) word as a location
+LOCATION_BEFORE = {"in", "near", "around"}
+LOCATION_AFTER = {"근처", "주변"}
+
+# Words that carry no routing information
+FILLER_WORDS = {
+    "보여줘", "보여주세요", "알려줘", "알려주세요", "찾아줘", "찾아주세요", "추천", "추천해줘", "추천해주세요",
+    "해줘", "줘", "좀", "어때", "어때요", "근처", "주변", "검색",
+    "show", "me", "the", "for", "of", "a", "an", "please", "get", "what", "is", "are", "how", "check",
+    "find", "in", "near", "around", "s", "and", "및", "그리고",
+}
+
+# Time words: the period they ask for, or None when only the LLM can tell ("최근" may be a week or a year).
+# They are filler for tools without a period (news, places, ...).
+TIME_WORDS = {
+    "오늘": "1d", "today": "1d",
+    "최근": None, "현재": None, "지금": None, "latest": None, "current": None,
+}
+
+# Backtest keywords naming a strategy ("삼성전자 RSI 백테스트" is an RSI backtest, not a backtest plus indicators)
+BACKTEST_STRATEGY_WORDS = {"rsi": "rsi", "골든크로스": "ma_cross"}
+
+# Tools taking a period, with the periods they accept
+PERIOD_TOOLS = {
+    "get_stock_chart": {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"},
+    "compare_stocks": {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"},
+    "backtest_strategy": {"1y", "2y", "5y", "10y", "max"},
+}
+
+# Korean particles allowed right after a known word in the same token ("삼성전자의", "애플주가는")
+PARTICLES = {"의", "는", "은", "이", "가", "을", "를", "도", "랑", "와", "과", "에", "에서"}
+LOCATION_PARTICLES = ("에서", "에", "의")
+# Particles that make the word a location by themselves ("홍대에서"); "의" does not ("조용한의")
+EXPLICIT_LOCATION_PARTICLES = ("에서", "에")
+
+_TOKEN = re.compile(r"\d{6}\.k[sq]|[a-z0-9]+|[가-힣]+", re.IGNORECASE)
+
+_INTENT_BY_WORD = {word: tool for tool, words in STOCK_INTENT_KEYWORDS.items() for word in words}
+_HANGUL_LEXICON = {w for w in list(COMPANY_SYMBOLS) + list(_INTENT_BY_WORD) + list(PLACE_KEYWORDS) + list(FILLER_WORDS)
+                   + list(TIME_WORDS) if not w.isascii()}
+_MAX_WORD = max(len(w) for w in _HANGUL_LEXICON | PARTICLES)
+
+
+def _segment(token: str) -> Optional[List[str]]:
+    """Split a Hangul token into known words by longest match; None if any part is unknown."""
+    words = []
+    i = 0
+    while i < len(token):
+        for size in range(min(_MAX_WORD, len(token) - i), 0, -1):
+            piece = token[i:i + size]
+            if piece in _HANGUL_LEXICON or (words and piece in PARTICLES):
+                words.append(piece)
+                i += size
+                break
+        else:
+            return None
+    return words
+
+
+def _calls_key(calls: List[Dict[str, Any]]) -> frozenset:
+    return frozenset((c["tool_name"], normalize_args(c.get("tool_args", {}))) for c in calls)
+
+
+class FastRouter:
+    """
+    Deterministic router for unambiguous queries ("TSLA chart", "삼성전자 주가",
+    "강남 맛집"). Returns the same structure as LLMWrapper.process_query when every
+    token of the query is accounted for, and None otherwise so the LLM decides.
+
+    mode: "on" answers from the fast path, "shadow" only compares its decision
+    with the LLM's, "off" disables it.
+    """
+
+    def __init__(self, mode: str = "on", max_disagreements: int = 20):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._queries = 0
+        self._routed = 0
+        self._shadow_compared = 0
+        self._shadow_agreed = 0
+        self._disagreements = deque(maxlen=max_disagreements)
+
+    def route(self, text: str) -> Optional[Dict[str, Any]]:
+        calls = self._match(text)
+        with self._lock:
+            self._queries += 1
+            if calls:
+                self._routed += 1
+        if not calls:
+            return None
+        return {"type": "multiple_tool_calls", "calls": calls}
+
+    def record_shadow(self, text: str, fast_result: Optional[Dict[str, Any]], llm_result: Dict[str, Any]):
+        """Compare a fast-path decision with what the LLM chose for the same query."""
+        if fast_result is None:
+            return
+        llm_calls = llm_result.get("calls", []) if llm_result.get("type") == "multiple_tool_calls" else []
+        agreed = _calls_key(fast_result["calls"]) == _calls_key(llm_calls)
+        with self._lock:
+            self._shadow_compared += 1
+            if agreed:
+                self._shadow_agreed += 1
+            else:
+                self._disagreements.append({"query": text, "fast": fast_result["calls"], "llm": llm_calls})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "queries": self._queries,
+                "routed": self._routed,
+                "coverage": round(self._routed / self._queries, 4) if self._queries else 0.0,
+                "shadow_compared": self._shadow_compared,
+                "shadow_agreed": self._shadow_agreed,
+                "agreement": round(self._shadow_agreed / self._shadow_compared, 4) if self._shadow_compared else 0.0,
+                "recent_disagreements": list(self._disagreements),
+            }
+
+    def _match(self, text: str) -> Optional[List[Dict[str, Any]]]:
+        text = unicodedata.normalize("NFKC", text)
+        # Anything outside Latin/digits/Hangul (other scripts) is out of scope
+        if re.search(r"\w", _TOKEN.sub(" ", text).replace("_", " ")):
+            return None
+
+        symbols: List[str] = []
+        intents: List[str] = []
+        places: List[str] = []
+        times: List[str] = []
+        unknown: List[str] = []
+        located: List[str] = []  # Unknown words marked as a location by the syntax around them
+        keywords: List[str] = []  # The intent words, as written
+
+        def add(items, value):
+            if value not in items:
+                items.append(value)
+
+        tokens = _TOKEN.findall(text)
+        for i, original in enumerate(tokens):
+            token = original.casefold()
+            previous = tokens[i - 1].casefold() if i else ""
+            following = tokens[i + 1] if i + 1 < len(tokens) else ""
+            if token.isascii():
+                if re.fullmatch(r"\d{6}\.k[sq]", token):
+                    add(symbols, token.upper())
+                elif token in COMPANY_SYMBOLS:
+                    add(symbols, COMPANY_SYMBOLS[token])
+                elif token in KNOWN_TICKERS:
+                    add(symbols, token.upper())
+                elif token in _INTENT_BY_WORD:
+                    add(intents, _INTENT_BY_WORD[token])
+                    add(keywords, token)
+                elif token in PLACE_KEYWORDS:
+                    add(places, original)
+                elif token in TIME_WORDS:
+                    add(times, token)
+                elif token not in FILLER_WORDS:
+                    unknown.append(original)
+                    if previous in LOCATION_BEFORE:
+                        located.append(original)
+                continue
+
+            words = _segment(token)
+            if words is None:
+                # "강남맛집": unknown location glued to a place keyword
+                place = next((p for p in PLACE_KEYWORDS if token.endswith(p) and len(token) > len(p)), None)
+                if place is None:
+                    unknown.append(original)
+                    if original.endswith(EXPLICIT_LOCATION_PARTICLES) or following.startswith(tuple(LOCATION_AFTER)):
+                        located.append(original)
+                else:
+                    add(places, place)
+                    unknown.append(original[:-len(place)])
+                continue
+            for word in words:
+                if word in COMPANY_SYMBOLS:
+                    add(symbols, COMPANY_SYMBOLS[word])
+                elif word in _INTENT_BY_WORD:
+                    add(intents, _INTENT_BY_WORD[word])
+                    add(keywords, word)
+                elif word in PLACE_KEYWORDS:
+                    add(places, word)
+                elif word in TIME_WORDS:
+                    add(times, word)
+
+        # Arguments beyond the symbol, by tool
+        extra_args: Dict[str, Dict[str, Any]] = {}
+
+        if "backtest_strategy" in intents:
+            strategies = {BACKTEST_STRATEGY_WORDS[word] for word in keywords if word in BACKTEST_STRATEGY_WORDS}
+            indicator_words = [word for word in keywords if _INTENT_BY_WORD[word] == "get_technical_indicators"]
+            # Only RSI is a strategy the router can name; "MACD 백테스트" and the like go to the LLM
+            if len(strategies) > 1 or any(word not in BACKTEST_STRATEGY_WORDS for word in indicator_words):
+                return None
+            if "get_technical_indicators" in intents:
+                intents.remove("get_technical_indicators")
+            if strategies:
+                extra_args["backtest_strategy"] = {"strategy": strategies.pop()}
+
+        # "TSLA 오늘 차트" is a 1d chart, not the default 1y one
+        for tool in intents:
+            if tool in PERIOD_TOOLS and times:
+                period = {TIME_WORDS[word] for word in times}
+                if len(period) != 1 or None in period or not period <= PERIOD_TOOLS[tool]:
+                    return None
+                extra_args.setdefault(tool, {})["period"] = period.pop()
+
+        if "compare_stocks" in intents:
+            # One comparison of every symbol replaces their separate charts; it needs two or more
+            if len(symbols) < 2 or places or unknown:
+                return None
+            others = [tool for tool in intents if tool not in ("compare_stocks", "get_stock_chart")]
+            return [{"tool_name": "compare_stocks", "tool_args": {"symbols": symbols, **extra_args.get("compare_stocks", {})}}] + [
+                {"tool_name": tool, "tool_args": {"symbol": symbol}}
+                for symbol in symbols for tool in others
+            ]
+
+        if symbols and intents and not places and not unknown:
+            return [
+                {"tool_name": tool, "tool_args": {"symbol": symbol, **extra_args.get(tool, {})}}
+                for symbol in symbols for tool in intents
+            ]
+
+        if len(places) == 1 and len(unknown) == 1 and not symbols and not intents:
+            location = unknown[0]
+            for particle in LOCATION_PARTICLES:
+                if location.endswith(particle) and len(location) > len(particle):
+                    location = location[:-len(particle)]
+                    break
+            if unknown[0] not in located and location.casefold() not in KNOWN_LOCATIONS:
+                # "조용한 카페", "cheap restaurants": an adjective, not a place
+                return None
+            return [{"tool_name": "find_places", "tool_args": {"location": location, "keyword": places[0]}}]
+
+        return None
@@ -0,0 +1,187 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from app.services.price_history import LOCK_STRIPES
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1.0)
+
+
+class IndicatorState(NamedTuple):
+    """Running state after one bar. Immutable, so the last bar can be replaced by stepping from the previous state."""
+    time: Any
+    close: float
+    count: int
+    gains: Tuple[float, ...]  # Last RSI_WINDOW gains/losses (the first bar counts as 0)
+    losses: Tuple[float, ...]
+    gain_sum: float
+    loss_sum: float
+    ema_fast: float
+    ema_slow: float
+    signal: float
+
+
+def step(prev: Optional[IndicatorState], time: Any, close: float) -> IndicatorState:
+    """
+    The state after appending one bar: O(1) in the length of the history.
+
+    Mirrors the pandas formulas used by get_technical_indicators: RSI from the
+    14-bar rolling mean of gains and losses of close.diff(), MACD from
+    ewm(adjust=False) EMAs, which start at the first value they see.
+    """
+    if prev is None:
+        return IndicatorState(time, close, 1, (0.0,), (0.0,), 0.0, 0.0, close, close, 0.0)
+    delta = close - prev.close
+    gain, loss = (delta, 0.0) if delta > 0 else (0.0, -delta if delta < 0 else 0.0)
+    gains, losses = (prev.gains + (gain,))[-RSI_WINDOW:], (prev.losses + (loss,))[-RSI_WINDOW:]
+    # Re-summing the fixed-size window is still O(1) and, unlike add/subtract, never drifts
+    gain_sum, loss_sum = math.fsum(gains), math.fsum(losses)
+    ema_fast = prev.ema_fast + _alpha(MACD_FAST) * (close - prev.ema_fast)
+    ema_slow = prev.ema_slow + _alpha(MACD_SLOW) * (close - prev.ema_slow)
+    signal = prev.signal + _alpha(MACD_SIGNAL) * ((ema_fast - ema_slow) - prev.signal)
+    return IndicatorState(time, close, prev.count + 1, gains, losses, gain_sum, loss_sum, ema_fast, ema_slow, signal)
+
+
+def rsi(state: IndicatorState) -> float:
+    if state.count < RSI_WINDOW:
+        return math.nan
+    gain, loss = state.gain_sum, state.loss_sum
+    if loss == 0:
+        return math.nan if gain == 0 else 100.0
+    return 100 - (100 / (1 + gain / loss))
+
+
+def macd(state: IndicatorState) -> Tuple[float, float, float]:
+    """(MACD line, signal line, histogram)."""
+    line = state.ema_fast - state.ema_slow
+    return line, state.signal, line - state.signal
+
+
+class IndicatorEngine:
+    """
+    Streaming RSI(14) / MACD(12, 26, 9) for one series of bars.
+
+    `update` appends a bar, or replaces the last one when it has the same time
+    (the latest bar keeps changing during the session); both are O(1). Values
+    match a full pandas recompute over every bar the engine has seen, from
+    `start`, the bar it was seeded with.
+    """
+
+    def __init__(self):
+        self.start: Any = None
+        self.previous: Optional[IndicatorState] = None  # State before the last bar
+        self.current: Optional[IndicatorState] = None
+
+    def update(self, time: Any, close: float) -> IndicatorState:
+        close = float(close)
+        if self.current is not None and time == self.current.time:
+            self.current = step(self.previous, time, close)
+        else:
+            if self.current is not None and time < self.current.time:
+                raise ValueError(f"Bar at {time} is older than the last bar at {self.current.time}")
+            if self.current is None:
+                self.start = time
+            self.previous = self.current
+            self.current = step(self.previous, time, close)
+        return self.current
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.current
+        line, signal, histogram = macd(state)
+        previous_histogram = macd(self.previous)[2] if self.previous is not None else math.nan
+        return {
+            "time": state.time,
+            "close": state.close,
+            "rsi": rsi(state),
+            "macd": line,
+            "signal": signal,
+            "histogram": histogram,
+            "previous_histogram": previous_histogram,
+        }
+
+
+class IndicatorEngines:
+    """
+    One IndicatorEngine per (symbol, interval), kept in sync with the shared price history.
+
+    An engine is anchored at the first bar it was built from (its `start`) and
+    the values are those of a full recompute from there: the EMAs start at that
+    bar. Later histories may start anywhere, so callers can pass a rolling
+    window: `sync` feeds only the bars after the engine's last one (and the last
+    bar again if it changed), and the window's first bar does not matter. The
+    engine is rebuilt only if the stored bars no longer match what it saw
+    (adjusted prices rewritten after a split or dividend, or a gap). Engines are
+    evicted LRU past `max_engines`.
+    """
+
+    def __init__(self, max_engines: int = 512):
+        self.max_engines = max_engines
+        self._engines: "OrderedDict[tuple, IndicatorEngine]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]  # Striped by key
+        self._rebuilds = 0
+        self._appended = 0
+
+    def sync(self, symbol: str, close: pd.Series, interval: str = "1d") -> Dict[str, Any]:
+        if close.empty:
+            raise ValueError(f"No bars for {symbol}")
+        key = (symbol.strip().upper(), interval)
+        with self._locks[hash(key) % len(self._locks)]:
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    self._engines.move_to_end(key)
+            start = self._resume_from(engine, close)
+            if start is None:
+                engine, start = IndicatorEngine(), 0
+                with self._lock:
+                    self._rebuilds += 1
+            times = close.index[start:]
+            values = close.to_numpy()[start:].tolist()
+            for time, value in zip(times, values):
+                engine.update(time, value)
+            with self._lock:
+                self._appended += len(values)
+                self._engines[key] = engine
+                self._engines.move_to_end(key)
+                while len(self._engines) > self.max_engines:
+                    self._engines.popitem(last=False)
+            return engine.snapshot()
+
+    @staticmethod
+    def _resume_from(engine: Optional[IndicatorEngine], close: pd.Series) -> Optional[int]:
+        """Position of the first bar the engine still has to see, or None if it must be rebuilt."""
+        if engine is None or engine.current is None:
+            return None
+        index = close.index
+        last = engine.current.time
+        position = int(index.searchsorted(last))
+        if position >= len(index) or index[position] != last:
+            return None
+        # The bar before the last one is final; if it changed, history was rewritten
+        previous = engine.previous
+        if previous is not None:
+            if position == 0 or index[position - 1] != previous.time or float(close.iloc[position - 1]) != previous.close:
+                return None
+        # Re-feed the last bar (it may have been partial) and everything after it
+        return position
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._engines.clear()
+            else:
+                for key in [k for k in self._engines if k[0] == symbol.strip().upper()]:
+                    del self._engines[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"engines": len(self._engines), "rebuilds": self._rebuilds, "bars_applied": self._appended}
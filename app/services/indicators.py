@@ -0,0 +1,357 @@
+"""
+Vectorized technical indicators over a panel of symbols.
+
+Every function takes 2-D float arrays shaped (symbols, bars) - 1-D input is
+treated as a single symbol - and computes the indicator for all symbols at
+once, returning arrays of the same shape. Warm-up bars are NaN, like the
+pandas rolling/ewm equivalents. Symbols with a shorter history are padded with
+leading NaN (see panel_from_frames); moving windows containing a NaN are NaN
+and EMAs start at each symbol's first valid bar.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _panel(x: Any) -> np.ndarray:
+    return np.atleast_2d(np.asarray(x, dtype=float))
+
+
+def _windows(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Trailing windows for every bar from window-1 on, plus the NaN array they are written into."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return np.empty(x.shape[:1] + (0, window)), out
+    return sliding_window_view(x, window, axis=1), out
+
+
+def sma(x: Any, window: int) -> np.ndarray:
+    """Simple moving average (rolling(window).mean())."""
+    x = _panel(x)
+    valid = np.isfinite(x)
+    # Prefix sums give every window sum in O(bars); windows with a NaN are masked by the count
+    sums = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        window_sums = sums[:, window - 1:].copy()
+        window_sums[:, 1:] -= sums[:, :-window]
+        window_counts = counts[:, window - 1:].copy()
+        window_counts[:, 1:] -= counts[:, :-window]
+        out[:, window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return out
+
+
+def ema(x: Any, span: Optional[int] = None, alpha: Optional[float] = None) -> np.ndarray:
+    """
+    Exponential moving average, ewm(span=..., adjust=False) or ewm(alpha=...).
+    The recursion runs over bars, each step vectorized across all symbols.
+    """
+    x = _panel(x)
+    alpha = 2.0 / (span + 1.0) if alpha is None else alpha
+    # Bars-major copies so each step reads and writes a contiguous row
+    columns = np.ascontiguousarray(x.T)
+    missing = np.isnan(columns)
+    out = np.empty_like(columns)
+    state = np.full(x.shape[0], np.nan)
+    for t in range(columns.shape[0]):
+        column = columns[t]
+        if missing[t].any() or np.isnan(state).any():
+            # Starts at the first valid value; NaN bars carry the previous average forward
+            state = np.where(np.isnan(state), column, np.where(missing[t], state, state + alpha * (column - state)))
+        else:
+            state = state + alpha * (column - state)
+        out[t] = state
+    return out.T
+
+
+def rolling_std(x: Any, window: int, ddof: int = 0) -> np.ndarray:
+    x = _panel(x)
+    windows, out = _windows(x, window)
+    if windows.shape[1]:
+        out[:, window - 1:] = windows.std(axis=-1, ddof=ddof)
+    return out
+
+
+def rolling_max(x: Any, window: int) -> np.ndarray:
+    x = _panel(x)
+    windows, out = _windows(x, window)
+    if windows.shape[1]:
+        out[:, window - 1:] = windows.max(axis=-1)
+    return out
+
+
+def rolling_min(x: Any, window: int) -> np.ndarray:
+    x = _panel(x)
+    windows, out = _windows(x, window)
+    if windows.shape[1]:
+        out[:, window - 1:] = windows.min(axis=-1)
+    return out
+
+
+def _diff(x: np.ndarray) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, 1:] = np.diff(x, axis=1)
+    return out
+
+
+def rsi(close: Any, window: int = 14, wilder: bool = False) -> np.ndarray:
+    """
+    RSI from the gains and losses of close-to-close changes. By default their
+    simple `window` mean (what get_technical_indicators has always shown);
+    `wilder` uses Wilder's smoothing (an EMA with alpha 1/window) instead.
+    """
+    close = _panel(close)
+    delta = _diff(close)
+    # As pandas' delta.where(delta > 0, 0): the first bar counts as no change
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    missing = np.isnan(close)
+    gain[missing] = np.nan
+    loss[missing] = np.nan
+    if wilder:
+        avg_gain, avg_loss = ema(gain, alpha=1.0 / window), ema(loss, alpha=1.0 / window)
+        warm = np.cumsum(~missing, axis=1) < window
+        avg_gain[warm] = np.nan
+    else:
+        avg_gain, avg_loss = sma(gain, window), sma(loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def macd(close: Any, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(MACD line, signal line, histogram)."""
+    close = _panel(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: Any, window: int = 20, k: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(middle, upper, lower) bands: SMA +- k population standard deviations."""
+    middle = sma(close, window)
+    width = k * rolling_std(close, window)
+    return middle, middle + width, middle - width
+
+
+def true_range(high: Any, low: Any, close: Any) -> np.ndarray:
+    high, low, close = _panel(high), _panel(low), _panel(close)
+    previous = np.full(close.shape, np.nan)
+    previous[:, 1:] = close[:, :-1]
+    # fmax ignores NaN, so the first bar (no previous close) is just high - low
+    return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high: Any, low: Any, close: Any, window: int = 14) -> np.ndarray:
+    """Average True Range with Wilder's smoothing (ewm(alpha=1/window, adjust=False))."""
+    return ema(true_range(high, low, close), alpha=1.0 / window)
+
+
+def stochastic(high: Any, low: Any, close: Any, k_window: int = 14, d_window: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """(%K, %D): close within the k_window high-low range, and its d_window SMA."""
+    highest, lowest = rolling_max(high, k_window), rolling_min(low, k_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (_panel(close) - lowest) / (highest - lowest)
+    return k, sma(k, d_window)
+
+
+def obv(close: Any, volume: Any) -> np.ndarray:
+    """On-Balance Volume: running sum of volume signed by the close-to-close direction."""
+    close, volume = _panel(close), _panel(volume)
+    direction = np.sign(np.nan_to_num(_diff(close)))
+    return np.cumsum(direction * np.nan_to_num(volume), axis=1)
+
+
+def vwap(high: Any, low: Any, close: Any, volume: Any, window: Optional[int] = None) -> np.ndarray:
+    """
+    Volume-weighted average of the typical price (H+L+C)/3: over the last
+    `window` bars, or cumulative from the first bar when `window` is None.
+    """
+    typical = (_panel(high) + _panel(low) + _panel(close)) / 3
+    volume = _panel(volume)
+    if window is None:
+        weighted = np.cumsum(np.nan_to_num(typical * volume), axis=1)
+        total = np.cumsum(np.nan_to_num(volume), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return weighted / total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sma(typical * volume, window) / sma(volume, window)
+
+
+# name -> (function of the OHLCV panel, output names). Each entry is one pass over all symbols.
+INDICATORS: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {
+    "ma": (lambda p: (sma(p["Close"], 20), sma(p["Close"], 60), sma(p["Close"], 120)), ("ma20", "ma60", "ma120")),
+    "rsi": (lambda p: (rsi(p["Close"]),), ("rsi",)),
+    "macd": (lambda p: macd(p["Close"]), ("macd", "signal", "histogram")),
+    "bollinger": (lambda p: bollinger(p["Close"]), ("middle", "upper", "lower")),
+    "atr": (lambda p: (atr(p["High"], p["Low"], p["Close"]),), ("atr",)),
+    "stochastic": (lambda p: stochastic(p["High"], p["Low"], p["Close"]), ("k", "d")),
+    "obv": (lambda p: (obv(p["Close"], p["Volume"]),), ("obv",)),
+    "vwap": (lambda p: (vwap(p["High"], p["Low"], p["Close"], p["Volume"], window=20),), ("vwap",)),
+}
+
+
+def compute(panel: Dict[str, np.ndarray], names: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Indicators for every symbol of an OHLCV panel ({"Close": (symbols, bars), ...}).
+    Returns {indicator: {output: (symbols, bars) array}}.
+    """
+    names = list(INDICATORS) if names is None else list(names)
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators: {', '.join(unknown)}")
+    results = {}
+    for name in names:
+        func, outputs = INDICATORS[name]
+        results[name] = dict(zip(outputs, func(panel)))
+    return results
+
+
+def panel_from_frames(frames: Dict[str, pd.DataFrame], columns: Sequence[str] = OHLCV) -> Tuple[List[str], pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """
+    Stack per-symbol OHLCV frames into (symbols, bars) arrays on the union of their
+    indexes. Bars a symbol does not have are NaN.
+    """
+    symbols = list(frames)
+    # Start from the first frame's index: an empty (tz-naive) start would turn a tz-aware union into object dtype
+    indexes = [frame.index for frame in frames.values()]
+    index = indexes[0] if indexes else pd.DatetimeIndex([])
+    for other in indexes[1:]:
+        index = index.union(other)
+    panel = {}
+    for column in columns:
+        panel[column] = np.vstack([
+            frames[s][column].reindex(index).to_numpy(dtype=float) if column in frames[s] else np.full(len(index), np.nan)
+            for s in symbols
+        ]) if symbols else np.empty((0, len(index)))
+    return symbols, index, panel
+
+
+def forward_fill(x: Any) -> np.ndarray:
+    """Carry each symbol's last valid value over the bars it has none for (ffill along bars)."""
+    x = _panel(x)
+    valid = np.isfinite(x)
+    last = np.where(valid, np.arange(x.shape[1]), 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    out = np.take_along_axis(x, last, axis=1)
+    # Before a symbol's first bar there is nothing to carry
+    out[np.cumsum(valid, axis=1) == 0] = np.nan
+    return out
+
+
+def log_returns(close: Any) -> np.ndarray:
+    """
+    Bar-to-bar log returns. A bar after a gap (another exchange's session, a
+    halt) spans the whole gap; bars a symbol does not have are NaN.
+    """
+    close = _panel(close)
+    filled = forward_fill(close)
+    out = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 1:] = np.log(filled[:, 1:] / filled[:, :-1])
+    out[~np.isfinite(close)] = np.nan
+    return out
+
+
+def normalized_returns(close: Any) -> np.ndarray:
+    """Cumulative return in percent since each symbol's first bar, carried over its gaps."""
+    filled = forward_fill(close)
+    valid = np.isfinite(filled)
+    first = np.take_along_axis(filled, valid.argmax(axis=1)[:, None], axis=1)
+    return (filled / first - 1) * 100
+
+
+def correlation(returns: Any) -> np.ndarray:
+    """
+    Pearson correlation matrix (symbols x symbols) over the bars each pair both
+    has, like DataFrame.corr(); built from a few matrix products instead of a
+    loop over pairs. NaN where a pair shares fewer than 2 bars.
+    """
+    returns = _panel(returns)
+    mask = np.isfinite(returns).astype(float)
+    x = np.where(mask > 0, returns, 0.0)
+    n = mask @ mask.T
+    sums = x @ mask.T              # [i, j]: sum of i's returns on the bars j also has
+    squares = (x * x) @ mask.T
+    products = x @ x.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / n
+        cov = products / n - mean * mean.T
+        var = squares / n - mean * mean
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def volatility(returns: Any, periods_per_year: float = 252) -> np.ndarray:
+    """Annualized volatility in percent: the sample std of each symbol's returns, scaled by sqrt(periods)."""
+    returns = _panel(returns)
+    counts = np.isfinite(returns).sum(axis=1)
+    out = np.full(returns.shape[0], np.nan)
+    enough = counts >= 2
+    if enough.any():
+        out[enough] = np.nanstd(returns[enough], axis=1, ddof=1) * np.sqrt(periods_per_year) * 100
+    return out
+
+
+INDICATOR_TITLES = {
+    "ma": "Moving Averages (20, 60, 120)",
+    "rsi": "RSI (14-day)",
+    "macd": "MACD (12, 26, 9)",
+    "bollinger": "Bollinger Bands (20, 2σ)",
+    "atr": "ATR (14)",
+    "stochastic": "Stochastic (14, 3)",
+    "obv": "On-Balance Volume",
+    "vwap": "VWAP (20)",
+}
+
+
+def _volume(value: float) -> str:
+    for unit, size in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if abs(value) >= size:
+            return f"{value / size:.2f}{unit}"
+    return f"{value:.0f}"
+
+
+def summarize(name: str, outputs: Dict[str, np.ndarray], close: Any, row: int = 0) -> Dict[str, str]:
+    """
+    {"title", "value", "signal"} text for the latest bar of one symbol: `outputs`
+    is compute()'s result for `name`, `row` the symbol's row in the panel.
+    """
+    latest = {key: values[row, -1] for key, values in outputs.items()}
+    price = _panel(close)[row, -1]
+    if name == "ma":
+        value = " | ".join(f"MA{w}: ${latest[f'ma{w}']:.2f}" for w in (20, 60, 120) if np.isfinite(latest[f"ma{w}"]))
+        above = [f"MA{w}" for w in (20, 60, 120) if np.isfinite(latest[f"ma{w}"]) and price > latest[f"ma{w}"]]
+        signal = f"Price above {', '.join(above)}" if above else "Price below all averages"
+    elif name == "rsi":
+        value = f"{latest['rsi']:.1f}"
+        signal = "Overbought" if latest["rsi"] > 70 else ("Oversold" if latest["rsi"] < 30 else "Neutral")
+    elif name == "macd":
+        value = f"MACD: {latest['macd']:.2f} | Signal: {latest['signal']:.2f}"
+        signal = "Bullish Trend" if latest["histogram"] > 0 else "Bearish Trend"
+    elif name == "bollinger":
+        value = f"Upper: ${latest['upper']:.2f} | Middle: ${latest['middle']:.2f} | Lower: ${latest['lower']:.2f}"
+        signal = ("Above upper band" if price > latest["upper"] else
+                  "Below lower band" if price < latest["lower"] else "Inside the bands")
+    elif name == "atr":
+        value = f"${latest['atr']:.2f} ({latest['atr'] / price * 100:.1f}% of price)"
+        signal = "Average daily range"
+    elif name == "stochastic":
+        value = f"%K: {latest['k']:.1f} | %D: {latest['d']:.1f}"
+        signal = "Overbought" if latest["k"] > 80 else ("Oversold" if latest["k"] < 20 else "Neutral")
+    elif name == "obv":
+        series = outputs["obv"][row]
+        value = _volume(latest["obv"])
+        signal = "Rising (20 bars)" if len(series) > 20 and series[-1] > series[-21] else "Falling (20 bars)"
+    elif name == "vwap":
+        value = f"${latest['vwap']:.2f}"
+        signal = "Price above VWAP" if price > latest["vwap"] else "Price below VWAP"
+    else:
+        raise ValueError(f"Unknown indicator: {name}")
+    return {"title": INDICATOR_TITLES[name], "value": value, "signal": signal}
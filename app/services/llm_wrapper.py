@@ -5,6 +5,8 @@ from google import genai
 from google.genai import types
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
+from app.services.route_cache import RouteCache
+from app.services.fast_router import FastRouter
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +16,15 @@ load_dotenv()  # Load from .env file
 # Configure API Key
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 
+# Routing decision cache (set A2UI_ROUTE_CACHE_PATH to keep it across restarts)
+ROUTE_CACHE_SIZE = int(os.environ.get("A2UI_ROUTE_CACHE_SIZE", "1024"))
+ROUTE_CACHE_TTL = float(os.environ.get("A2UI_ROUTE_CACHE_TTL", "3600"))
+ROUTE_CACHE_PATH = os.environ.get("A2UI_ROUTE_CACHE_PATH") or None
+ROUTE_CACHE_FLUSH_SECONDS = float(os.environ.get("A2UI_ROUTE_CACHE_FLUSH_SECONDS", "30"))
+
+# Local keyword router in front of Gemini: "on", "shadow" (compare only) or "off"
+FAST_ROUTER_MODE = os.environ.get("A2UI_FAST_ROUTER_MODE", "on")
+
 class LLMWrapper:
     def __init__(self):
         if not GOOGLE_API_KEY:
@@ -21,6 +32,14 @@ class LLMWrapper:
         
         # Initialize the client
         self.client = genai.Client(api_key=GOOGLE_API_KEY)
+
+        # Repeated queries skip both router calls
+        self.route_cache = RouteCache(max_size=ROUTE_CACHE_SIZE, ttl_seconds=ROUTE_CACHE_TTL, path=ROUTE_CACHE_PATH,
+                                      flush_seconds=ROUTE_CACHE_FLUSH_SECONDS)
+        # Routing results containing these tools are time/side-effect sensitive and never cached
+        self.uncacheable_tools = {"reserve_table"}
+        # Unambiguous queries are routed locally without any Gemini call
+        self.fast_router = FastRouter(mode=FAST_ROUTER_MODE)
         
         # ========== STOCK DOMAIN TOOLS ==========
         self.stock_tools_declarations = [
@@ -33,11 +52,131 @@ class LLMWrapper:
                         "symbol": {
                             "type": "string",
                             "description": "The stock symbol (e.g. AAPL, GOOG, TSLA)."
+                        },
+                        "period": {
+                            "type": "string",
+                            "enum": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"],
+                            "description": "Time range of the chart (e.g. '오늘' -> 1d, '5년' -> 5y). Defaults to 1y."
+                        },
+                        "interval": {
+                            "type": "string",
+                            "enum": ["1m", "5m", "15m", "30m", "1h", "1d", "1wk", "1mo"],
+                            "description": "Bar size. Omit to use the default for the period; minute/hour bars only for 1d and 5d."
+                        }
+                    },
+                    "required": ["symbol"]
+                }
+            },
+            {
+                "name": "compare_stocks",
+                "description": "Compare two or more stocks on one chart: cumulative returns over the period, annualized volatility and the correlation of their returns. Use this (once, with every symbol) instead of a chart per stock when the user compares stocks.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "symbols": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "The stock symbols to compare, 2 to 8 (e.g. [\"AAPL\", \"MSFT\", \"NVDA\"])."
+                        },
+                        "period": {
+                            "type": "string",
+                            "enum": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"],
+                            "description": "Time range of the comparison. Defaults to 1y."
+                        }
+                    },
+                    "required": ["symbols"]
+                }
+            },
+            {
+                "name": "backtest_strategy",
+                "description": "Backtest a simple trading rule on a stock's daily prices against buy-and-hold: equity curve chart, total return, CAGR, max drawdown, Sharpe ratio and trade count. Use for 'what if I had bought on ...' questions (e.g. '골든크로스에 샀다면', 'RSI 30 이하에서 매수했다면').",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "symbol": {
+                            "type": "string",
+                            "description": "The stock symbol (e.g. AAPL, GOOG, TSLA)."
+                        },
+                        "strategy": {
+                            "type": "string",
+                            "enum": ["ma_cross", "rsi", "buy_and_hold"],
+                            "description": "ma_cross: long while the fast moving average is above the slow one (golden cross buy, dead cross sell). rsi: buy when RSI falls below rsi_low, sell when it rises above rsi_high. Defaults to ma_cross."
+                        },
+                        "period": {
+                            "type": "string",
+                            "enum": ["1y", "2y", "5y", "10y", "max"],
+                            "description": "How far back to test. Defaults to 5y."
+                        },
+                        "fast": {
+                            "type": "integer",
+                            "description": "Fast moving average window in days for ma_cross (default 20)."
+                        },
+                        "slow": {
+                            "type": "integer",
+                            "description": "Slow moving average window in days for ma_cross (default 60)."
+                        },
+                        "rsi_low": {
+                            "type": "number",
+                            "description": "RSI buy threshold for rsi (default 30)."
+                        },
+                        "rsi_high": {
+                            "type": "number",
+                            "description": "RSI sell threshold for rsi (default 70)."
                         }
                     },
                     "required": ["symbol"]
                 }
             },
+            {
+                "name": "screen_stocks",
+                "description": "Find stocks in a universe that meet technical conditions (e.g. RSI below 30, price above the 60-day moving average, 20-day MA above the 60-day MA) and show them ranked in a table. Use when the user asks which stocks match conditions rather than about one named stock.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "conditions": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "field": {
+                                        "type": "string",
+                                        "enum": ["price", "change_pct", "return_1m", "return_3m", "ma20", "ma60", "ma120", "ma20_gap", "ma60_gap", "ma120_gap", "rsi", "macd", "macd_signal", "macd_hist", "bb_pct_b", "stoch_k", "atr_pct", "volume_ratio"]
+                                    },
+                                    "op": {"type": "string", "enum": ["<", "<=", ">", ">="]},
+                                    "value": {
+                                        "type": "string",
+                                        "description": "A number (e.g. \"30\") or another field to compare with (e.g. \"ma60\")."
+                                    }
+                                },
+                                "required": ["field", "op", "value"]
+                            },
+                            "description": "Every condition must hold. *_gap and return_*/change_pct are percentages, bb_pct_b is Bollinger %B (0 = lower band, 1 = upper band), volume_ratio is today's volume over the 20-day average."
+                        },
+                        "universe": {
+                            "type": "string",
+                            "description": "Built-in symbol list to scan: dow30, nasdaq_large or kospi_large (Korean stocks). Defaults to dow30."
+                        },
+                        "symbols": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Scan these symbols instead of a universe."
+                        },
+                        "sort_by": {
+                            "type": "string",
+                            "description": "Field to rank matches by. Defaults to the first condition's field."
+                        },
+                        "descending": {
+                            "type": "boolean",
+                            "description": "Rank highest first. Defaults to ascending for '<' conditions, else descending."
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "How many matches to show (default 20, max 50)."
+                        }
+                    },
+                    "required": ["conditions"]
+                }
+            },
             {
                 "name": "get_stock_news",
                 "description": "Provide recent news articles and headlines for a given stock symbol.",
@@ -68,13 +207,21 @@ class LLMWrapper:
             },
             {
                 "name": "get_technical_indicators",
-                "description": "Provide technical indicators (RSI, MACD) for a given stock symbol.",
+                "description": "Provide technical indicators (RSI, MACD, and optionally moving averages, Bollinger Bands, ATR, Stochastic, OBV, VWAP) for a given stock symbol.",
                 "parameters": {
                     "type": "object",
                     "properties": {
                         "symbol": {
                             "type": "string",
                             "description": "The stock symbol (e.g. AAPL, GOOG, TSLA)."
+                        },
+                        "indicators": {
+                            "type": "array",
+                            "items": {
+                                "type": "string",
+                                "enum": ["ma", "bollinger", "atr", "stochastic", "obv", "vwap"]
+                            },
+                            "description": "Extra indicators to show besides RSI and MACD, only when the user asks for them (e.g. '볼린저 밴드' -> bollinger, '변동성' -> atr)."
                         }
                     },
                     "required": ["symbol"]
@@ -230,7 +377,9 @@ IMPORTANT RULES:
 2. Focus ONLY on the stock-related part of the query. Ignore requests about locations, restaurants, or other non-financial topics.
 3. Extract stock symbols from company names (e.g., Apple -> AAPL, Tesla -> TSLA, Starbucks -> SBUX, Samsung -> 005930.KS).
 4. If the user explicitly requests specific information (e.g., "chart only"), provide ONLY that - do not call unnecessary tools.
-5. Select only the tools appropriate for answering the stock-related part of the question."""
+5. Select only the tools appropriate for answering the stock-related part of the question.
+6. When the user compares stocks (비교, vs, compare), call `compare_stocks` once with all the symbols instead of `get_stock_chart` per symbol.
+7. When the user asks which stocks meet conditions (e.g. "RSI 30 이하 종목", "골든크로스 난 코스피 종목") without naming one stock, call `screen_stocks`."""
 
         self.life_system_prompt = """You are a lifestyle assistant helping with everyday tasks.
 
@@ -255,7 +404,7 @@ IMPORTANT RULES:
                     })
         return tool_calls
 
-    def process_query_for_stock(self, text: str) -> List[Dict[str, Any]]:
+    async def process_query_for_stock(self, text: str) -> List[Dict[str, Any]]:
         """
         Process query for stock-related tools only.
         Returns list of tool calls (may be empty if not stock-related).
@@ -268,7 +417,7 @@ IMPORTANT RULES:
                 system_instruction=self.stock_system_prompt
             )
             
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model='gemini-2.0-flash',
                 contents=[user_content],
                 config=config
@@ -283,7 +432,7 @@ IMPORTANT RULES:
             logger.error(f"[STOCK] Error: {e}", exc_info=True)
             return []
 
-    def process_query_for_life(self, text: str) -> List[Dict[str, Any]]:
+    async def process_query_for_life(self, text: str) -> List[Dict[str, Any]]:
         """
         Process query for life-related tools only.
         Returns list of tool calls (may be empty if not life-related).
@@ -296,7 +445,7 @@ IMPORTANT RULES:
                 system_instruction=self.life_system_prompt
             )
             
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model='gemini-2.0-flash',
                 contents=[user_content],
                 config=config
@@ -311,30 +460,52 @@ IMPORTANT RULES:
             logger.error(f"[LIFE] Error: {e}", exc_info=True)
             return []
 
-    def process_query(self, text: str) -> Dict[str, Any]:
+    async def process_query(self, text: str) -> Dict[str, Any]:
+        """
+        Route the user query to tool calls. Unambiguous queries are answered by
+        the local fast router; everything else goes through the LLM routers.
+        """
+        fast_result = None
+        if self.fast_router.mode in ("on", "shadow"):
+            fast_result = self.fast_router.route(text)
+            if fast_result is not None and self.fast_router.mode == "on":
+                logger.info(f"[FAST ROUTER] {[c['tool_name'] for c in fast_result['calls']]}")
+                return fast_result
+
+        result = await self._process_query_with_llm(text)
+        if self.fast_router.mode == "shadow":
+            self.fast_router.record_shadow(text, fast_result, result)
+        return result
+
+    async def _process_query_with_llm(self, text: str) -> Dict[str, Any]:
         """
         Process the user query by calling both domain-specific functions
         and aggregating the results.
         """
-        import concurrent.futures
+        cached = self.route_cache.get(text)
+        if cached is not None:
+            logger.info(f"[ROUTE CACHE] Hit: {[c['tool_name'] for c in cached['calls']]}")
+            return cached
         
-        # Call both functions in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            stock_future = executor.submit(self.process_query_for_stock, text)
-            life_future = executor.submit(self.process_query_for_life, text)
-            
-            stock_calls = stock_future.result()
-            life_calls = life_future.result()
+        # Call both routers concurrently on the event loop
+        stock_calls, life_calls = await asyncio.gather(
+            self.process_query_for_stock(text),
+            self.process_query_for_life(text)
+        )
         
         # Aggregate tool calls
         all_tool_calls = stock_calls + life_calls
         
         if all_tool_calls:
             logger.info(f"[AGGREGATED] Total {len(all_tool_calls)} tool call(s): {[c['tool_name'] for c in all_tool_calls]}")
-            return {
+            result = {
                 "type": "multiple_tool_calls",
                 "calls": all_tool_calls
             }
+            # Only successful tool routings are cached; an empty result may be a transient LLM error
+            if not any(c["tool_name"] in self.uncacheable_tools for c in all_tool_calls):
+                self.route_cache.put(text, result)
+            return result
         else:
             # No tools called - generate text response
             logger.warning(f"No tools called for query: {text[:100]}")
@@ -385,8 +556,8 @@ Guidelines:
 
 Example format: "[Company name]는 [brief description]. 현재 가격은 [price context]."
 """
-            # Use streaming with the new API
-            for chunk in self.client.models.generate_content_stream(
+            # Async streaming: waiting for the next chunk yields to other connections
+            async for chunk in await self.client.aio.models.generate_content_stream(
                 model='gemini-3-flash-preview',
                 contents=prompt
             ):
@@ -413,7 +584,7 @@ Data Collected from Tools:
 Please provide a helpful, detailed answer to the user's question based on the data above.
 Respond in Korean.
 """
-            for chunk in self.client.models.generate_content_stream(
+            async for chunk in await self.client.aio.models.generate_content_stream(
                 model='gemini-3-flash-preview',
                 contents=prompt
             ):
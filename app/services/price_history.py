@@ -0,0 +1,457 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# yfinance period strings -> how far back they reach
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+    "max": None,
+}
+PERIOD_ORDER = list(PERIOD_OFFSETS)
+# Short periods count trading sessions (like yfinance's own "1d"/"5d"), not calendar days
+SESSION_PERIODS = {"1d": 1, "5d": 5}
+
+INTRADAY_INTERVALS = ["1m", "5m", "15m", "30m", "1h"]
+# Intervals built by aggregating a finer one instead of being fetched: interval -> (source, bucket).
+# Intraday buckets start at the session open; "W"/"M" group calendar weeks/months.
+ROLLUPS = {
+    "5m": ("1m", pd.Timedelta(minutes=5)),
+    "15m": ("5m", pd.Timedelta(minutes=15)),
+    "30m": ("15m", pd.Timedelta(minutes=30)),
+    "1h": ("30m", pd.Timedelta(hours=1)),
+    "1wk": ("1d", "W"),
+    "1mo": ("1d", "M"),
+}
+# Upstream minute bars only reach back a few days
+BASE_MAX_PERIOD = {"1m": "5d"}
+
+# Per-symbol locks are taken from a fixed array by hash, so their number does not grow with the symbols seen
+LOCK_STRIPES = 64
+
+# Chart ranges -> default bar interval. Intraday intervals are only offered for 1d/5d.
+CHART_INTERVALS = {
+    "1d": "5m", "5d": "30m", "1mo": "1d", "3mo": "1d", "6mo": "1d",
+    "1y": "1d", "2y": "1wk", "5y": "1wk", "10y": "1mo", "max": "1mo",
+}
+
+
+def wider_period(a: str, b: str) -> str:
+    return a if PERIOD_ORDER.index(a) >= PERIOD_ORDER.index(b) else b
+
+
+def period_start(period: str, now: pd.Timestamp, index: Optional[pd.DatetimeIndex] = None) -> Optional[pd.Timestamp]:
+    """Start of `period` before `now`; session periods count back sessions in `index` when given."""
+    if period in SESSION_PERIODS and index is not None and len(index):
+        sessions = index.normalize().unique()
+        return sessions[max(len(sessions) - SESSION_PERIODS[period], 0)]
+    offset = PERIOD_OFFSETS[period]
+    return None if offset is None else (now - offset).normalize()
+
+
+def rollup_base(interval: str) -> str:
+    """The fetched interval `interval` is aggregated from (itself if it is fetched directly)."""
+    while interval in ROLLUPS:
+        interval = ROLLUPS[interval][0]
+    return interval
+
+
+def chart_range(period: Optional[str] = None, interval: Optional[str] = None):
+    """
+    Normalize a chart request to a supported (period, interval): unknown periods
+    become 1y, and intervals that do not fit the period become its default.
+    """
+    period = period if period in CHART_INTERVALS else "1y"
+    allowed = INTRADAY_INTERVALS if period in SESSION_PERIODS else []
+    if period != "1d":
+        allowed = allowed + ["1d", "1wk", "1mo"]
+    if interval not in allowed:
+        interval = CHART_INTERVALS[period]
+    return period, interval
+
+
+def resample_ohlcv(frame: pd.DataFrame, bucket) -> pd.DataFrame:
+    """
+    Aggregate bars into `bucket`s (a Timedelta from each session's open, or "W"/"M"),
+    labelled with the first bar of each bucket: first Open, max High, min Low,
+    last Close, summed Volume and other columns.
+    """
+    if frame.empty:
+        return frame.copy()
+    index = frame.index
+    if isinstance(bucket, str):
+        local = index.tz_localize(None) if index.tz is not None else index
+        keys = local.to_period(bucket).asi8
+    else:
+        times = index.as_unit("ns").asi8
+        session = index.normalize().as_unit("ns").asi8
+        # Open of each bar's session, then whole buckets since that open
+        session_starts = np.flatnonzero(np.r_[True, session[1:] != session[:-1]])
+        opens = times[session_starts][np.cumsum(np.r_[True, session[1:] != session[:-1]]) - 1]
+        step = bucket.value
+        keys = opens + (times - opens) // step * step
+    # Bars are sorted, so buckets are contiguous runs of equal keys
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    columns = {}
+    for name in frame.columns:
+        values = frame[name].to_numpy(dtype=float)
+        if name == "Open":
+            columns[name] = values[starts]
+        elif name == "Close":
+            columns[name] = values[ends]
+        elif name == "High":
+            columns[name] = np.maximum.reduceat(values, starts)
+        elif name == "Low":
+            columns[name] = np.minimum.reduceat(values, starts)
+        else:
+            columns[name] = np.add.reduceat(values, starts)
+    return pd.DataFrame(columns, index=index[starts])
+
+
+def _yfinance_fetch(symbol: str, **kwargs) -> pd.DataFrame:
+    import yfinance as yf
+    return yf.Ticker(symbol).history(**kwargs)
+
+
+def split_bulk_frame(frame: pd.DataFrame, symbols: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Per-symbol frames from a yf.download(group_by="ticker") result, whose columns
+    are (symbol, field). Rows where a symbol has no bar (dates it did not trade,
+    before its listing) are dropped; symbols missing from the result get an empty frame.
+    """
+    frames = {}
+    present = set(frame.columns.get_level_values(0)) if isinstance(frame.columns, pd.MultiIndex) else set()
+    for symbol in symbols:
+        if symbol not in present:
+            frames[symbol] = pd.DataFrame()
+            continue
+        part = frame[symbol]
+        part = part[part["Close"].notna()] if "Close" in part else part.dropna(how="all")
+        part.columns.name = None
+        frames[symbol] = part
+    return frames
+
+
+def _yfinance_bulk_fetch(symbols: Sequence[str], **kwargs) -> Dict[str, pd.DataFrame]:
+    """Histories for many symbols in one yf.download request, adjusted like Ticker.history."""
+    import yfinance as yf
+    frame = yf.download(list(symbols), group_by="ticker", auto_adjust=True, actions=True, threads=True,
+                        ignore_tz=False, progress=False, **kwargs)
+    frames = split_bulk_frame(frame, symbols)
+    # Symbols from several exchanges come back on a shared UTC index; give each its exchange's clock
+    # like Ticker.history (yfinance caches the timezones, download already looked them up)
+    for symbol, part in frames.items():
+        if not part.empty and part.index.tz is not None:
+            try:
+                frames[symbol] = part.tz_convert(yf.Ticker(symbol).fast_info["timezone"])
+            except Exception as e:
+                print(f"Timezone lookup failed for {symbol}: {e}")
+    return frames
+
+
+class _Entry:
+    def __init__(self, frame: pd.DataFrame, period: str):
+        self.frame = frame
+        self.period = period
+        self.fetched_at = time.time()
+        self.full_fetched_at = self.fetched_at
+        self.nbytes = int(frame.memory_usage(deep=True).sum())
+        # Coarser intervals aggregated from this frame; built once per fetched version
+        self.rollups: Dict[str, pd.DataFrame] = {}
+
+    def rollup(self, interval: str) -> pd.DataFrame:
+        if interval not in ROLLUPS:
+            return self.frame
+        if interval not in self.rollups:
+            self._build_rollups(rollup_base(interval))
+        return self.rollups[interval]
+
+    def _build_rollups(self, base: str):
+        # The whole pyramid at once, each level from the previous one (1m -> 5m -> 15m -> ...)
+        levels = {base: self.frame}
+        for interval, (source, bucket) in ROLLUPS.items():
+            if rollup_base(interval) == base:
+                levels[interval] = resample_ohlcv(levels[source], bucket)
+                self.rollups[interval] = levels[interval]
+                self.nbytes += int(levels[interval].memory_usage(deep=True).sum())
+
+
+class PriceHistoryCache:
+    """
+    One OHLCV history per (symbol, interval), shared by every StockService tool.
+
+    Only base intervals are fetched (1m and 1d). Coarser ones are a rollup pyramid
+    (1m -> 5m -> 15m -> 30m -> 1h, 1d -> 1wk / 1mo) aggregated once per fetched
+    version of the base entry, so e.g. a 5y chart reads stored weekly bars.
+
+    The first request fetches at least `min_period` so chart (1y) and indicator (6mo)
+    requests for the same symbol are served by a single download; a wider request
+    replaces the entry with the wider window. Once an entry is older than
+    `stale_after` seconds only the bars since the last stored one are fetched.
+    A full re-fetch happens every `full_refresh_after` seconds because adjusted
+    prices are rewritten after splits and dividends. Entries are evicted LRU
+    once their total size exceeds `max_bytes`.
+
+    `get_many` serves several symbols at once: every symbol that needs a full fetch
+    goes into one `bulk_fetcher` request, and every stale one into one delta request.
+
+    With a `store` (PriceStore) the cache fetches through it, so a restarted process
+    reads history from disk and only asks upstream for the bars it is missing.
+    The store fetches per symbol, so `get_many` then reads symbol by symbol.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        stale_after: float = 300.0,
+        full_refresh_after: float = 86400.0,
+        min_period: str = "1y",
+        fetcher: Callable[..., pd.DataFrame] = _yfinance_fetch,
+        store: Optional[Any] = None,
+        bulk_fetcher: Optional[Callable[..., Dict[str, pd.DataFrame]]] = _yfinance_bulk_fetch,
+    ):
+        self.max_bytes = max_bytes
+        self.stale_after = stale_after
+        self.full_refresh_after = full_refresh_after
+        self.min_period = min_period
+        self.store = store
+        self.fetcher = store.fetch if store is not None else fetcher
+        self.bulk_fetcher = bulk_fetcher if store is None else None
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Striped: a fixed number of locks however many symbols come and go
+        self._symbol_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._hits = 0
+        self._full_fetches = 0
+        self._delta_fetches = 0
+        self._evictions = 0
+        self._bulk_fetches = 0
+
+    def get(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Return a copy of the history for `period`, sliced from the shared entry."""
+        base, min_period = self._base(period, interval)
+        key = (symbol.strip().upper(), base)
+
+        # One fetch per symbol at a time; other tools for the same symbol wait and reuse it
+        with self._symbol_lock(key):
+            entry = self._entry(key)
+            action = self._refresh_action(entry, period)
+            if action == "full":
+                entry = self._full_fetch(key, wider_period(period, entry.period if entry else min_period))
+            elif action == "refresh":
+                entry = self._full_fetch(key, entry.period)
+            elif action == "delta":
+                entry = self._delta_fetch(key, entry)
+            else:
+                with self._lock:
+                    self._hits += 1
+            frame = entry.rollup(interval)
+        return self._slice(frame, period)
+
+    def get_many(self, symbols: Sequence[str], period: str = "1y", interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        """
+        `get` for several symbols, keyed by the upper-cased symbol in request order.
+
+        Symbols that need a full fetch are downloaded in one bulk request (for the
+        widest period any of them needs), stale ones in one bulk delta request from
+        the earliest last stored bar; cached ones are not fetched at all.
+        """
+        keys = []
+        for symbol in symbols:
+            key = (symbol.strip().upper(), None)
+            if key not in keys:
+                keys.append(key)
+        if self.bulk_fetcher is None:
+            return {symbol: self.get(symbol, period=period, interval=interval) for symbol, _ in keys}
+
+        base, min_period = self._base(period, interval)
+        keys = [(symbol, base) for symbol, _ in keys]
+        # Each stripe once, always in the same (sorted) order, so two bulk requests cannot deadlock
+        locks = [self._symbol_locks[stripe] for stripe in sorted({self._stripe(key) for key in keys})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            entries = {key: self._entry(key) for key in keys}
+            full, delta = [], []
+            fetch_period = min_period
+            for key, entry in entries.items():
+                action = self._refresh_action(entry, period)
+                if action in ("full", "refresh"):
+                    full.append(key)
+                    fetch_period = wider_period(fetch_period, wider_period(period, entry.period if entry else min_period))
+                elif action == "delta" and not entry.frame.empty:
+                    delta.append(key)
+                elif action == "delta":
+                    full.append(key)
+                    fetch_period = wider_period(fetch_period, entry.period)
+                else:
+                    with self._lock:
+                        self._hits += 1
+
+            if full:
+                fetched = self.bulk_fetcher([symbol for symbol, _ in full], period=fetch_period, interval=base)
+                with self._lock:
+                    self._bulk_fetches += 1
+                    self._full_fetches += len(full)
+                    for key in full:
+                        entries[key] = _Entry(fetched.get(key[0], pd.DataFrame()), fetch_period)
+                        self._store(key, entries[key])
+
+            if delta:
+                # Re-fetch from the earliest last stored bar: it may have been a partial (intraday) bar
+                start = min(entries[key].frame.index[-1] for key in delta)
+                fetched = self.bulk_fetcher([symbol for symbol, _ in delta], start=start.strftime("%Y-%m-%d"), interval=base)
+                with self._lock:
+                    self._bulk_fetches += 1
+                for key in delta:
+                    entries[key] = self._apply_delta(key, entries[key], fetched.get(key[0], pd.DataFrame()))
+
+            return {symbol: self._slice(entries[(symbol, base)].rollup(interval), period) for symbol, _ in keys}
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _base(self, period: str, interval: str):
+        """(base interval to fetch, minimum period of a new entry) for a request."""
+        if period not in PERIOD_OFFSETS:
+            raise ValueError(f"Unsupported period: {period}")
+        base = rollup_base(interval)
+        max_period = BASE_MAX_PERIOD.get(base)
+        if max_period is not None and PERIOD_ORDER.index(period) > PERIOD_ORDER.index(max_period):
+            raise ValueError(f"Period {period} is too long for {interval} bars")
+        return base, self.min_period if max_period is None else max_period
+
+    def _stripe(self, key: tuple) -> int:
+        return hash(key) % len(self._symbol_locks)
+
+    def _symbol_lock(self, key: tuple) -> threading.Lock:
+        return self._symbol_locks[self._stripe(key)]
+
+    def _entry(self, key: tuple) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _refresh_action(self, entry: Optional[_Entry], period: str) -> Optional[str]:
+        """"full" (missing or too narrow), "refresh" (full re-fetch due), "delta" (stale) or None (fresh)."""
+        now = time.time()
+        if entry is None or PERIOD_ORDER.index(period) > PERIOD_ORDER.index(entry.period):
+            return "full"
+        if now - entry.full_fetched_at > self.full_refresh_after:
+            return "refresh"
+        if now - entry.fetched_at > self.stale_after:
+            return "delta"
+        return None
+
+    @staticmethod
+    def _slice(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        if frame.empty:
+            return frame.copy()
+        start = period_start(period, pd.Timestamp.now(tz=frame.index.tz), frame.index)
+        if start is not None:
+            frame = frame[frame.index >= start]
+        return frame.copy()
+
+    def _full_fetch(self, key: tuple, period: str) -> _Entry:
+        symbol, interval = key
+        frame = self.fetcher(symbol, period=period, interval=interval)
+        entry = _Entry(frame, period)
+        with self._lock:
+            self._full_fetches += 1
+            self._store(key, entry)
+        return entry
+
+    def _delta_fetch(self, key: tuple, entry: _Entry) -> _Entry:
+        symbol, interval = key
+        frame = entry.frame
+        if frame.empty:
+            return self._full_fetch(key, entry.period)
+        # Re-fetch from the last stored bar: it may have been a partial (intraday) bar
+        delta = self.fetcher(symbol, start=frame.index[-1].strftime("%Y-%m-%d"), interval=interval)
+        return self._apply_delta(key, entry, delta)
+
+    def _apply_delta(self, key: tuple, entry: _Entry, delta: pd.DataFrame) -> _Entry:
+        """Store `entry` with the bars of `delta` from its last stored bar on replacing what it had."""
+        frame = entry.frame
+        last = frame.index[-1]
+        if not delta.empty and frame.index.tz is not None and delta.index.tz is not None:
+            delta = delta.tz_convert(frame.index.tz)
+        delta = delta[delta.index >= last] if not delta.empty else delta
+        if not delta.empty:
+            frame = pd.concat([frame[frame.index < delta.index[0]], delta])
+            start = period_start(entry.period, pd.Timestamp.now(tz=frame.index.tz), frame.index)
+            if start is not None:
+                frame = frame[frame.index >= start]
+        updated = _Entry(frame, entry.period)
+        updated.full_fetched_at = entry.full_fetched_at
+        with self._lock:
+            self._delta_fetches += 1
+            self._store(key, updated)
+        return updated
+
+    def _store(self, key: tuple, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        total = sum(e.nbytes for e in self._entries.values())
+        # Always keep the entry just stored, even if it alone exceeds the budget
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+            self._evictions += 1
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol.strip().upper()]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "full_fetches": self._full_fetches,
+                "delta_fetches": self._delta_fetches,
+                "evictions": self._evictions,
+                "bulk_fetches": self._bulk_fetches,
+            }
+        if self.store is not None:
+            stats["store"] = self.store.stats()
+        return stats
+
+
+def default_price_history() -> PriceHistoryCache:
+    stale_after = float(os.environ.get("A2UI_PRICE_CACHE_STALE_SECONDS", "300"))
+    store = None
+    store_dir = os.environ.get("A2UI_PRICE_STORE_DIR")
+    if store_dir:
+        from app.services.price_store import PriceStore
+        store = PriceStore(
+            store_dir,
+            max_bytes=int(float(os.environ.get("A2UI_PRICE_STORE_MB", "512")) * 1024 * 1024),
+            stale_after=stale_after,
+        )
+    return PriceHistoryCache(
+        max_bytes=int(float(os.environ.get("A2UI_PRICE_CACHE_MB", "64")) * 1024 * 1024),
+        stale_after=stale_after,
+        store=store,
+    )
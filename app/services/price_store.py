@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from app.services.price_history import (
+    BASE_MAX_PERIOD, LOCK_STRIPES, PERIOD_ORDER, period_start, wider_period, _yfinance_fetch
+)
+
+
+class PriceStore:
+    """
+    On-disk columnar store of OHLCV bars, one directory per (interval, symbol).
+
+    Layout under `root`:
+
+        <interval>/<quoted symbol>/meta.json      rows, columns, tz, period, timestamps
+        <interval>/<quoted symbol>/g<N>.time.i8   UTC epoch nanoseconds
+        <interval>/<quoted symbol>/g<N>.c<i>.f8   one float64 file per column
+
+    Column files are raw little-endian arrays read back with np.memmap, so a read
+    maps the bars instead of parsing them into Python objects. Files are never
+    modified once meta.json points at them: a delta refresh copies the stored bars
+    before the last one into a new generation and appends the fetched bars (the
+    last bar is rewritten, it may have been partial), and a full re-fetch writes a
+    new generation. meta.json is then replaced atomically and the old files are
+    unlinked, so a DataFrame still mapping them keeps its values.
+
+    The bytes stored per symbol are tracked in memory, in least recently read
+    order, so enforcing `max_bytes` after a write evicts without walking the tree.
+    They are scanned from disk at startup and by `compact()`, which also trims
+    bars outside the stored period and drops stale generations and temp files.
+
+    `fetch()` has the same signature as the upstream fetcher so the store can sit
+    behind PriceHistoryCache.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        stale_after: float = 300.0,
+        full_refresh_after: float = 86400.0,
+        min_period: str = "1y",
+        fetcher: Callable[..., pd.DataFrame] = _yfinance_fetch,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stale_after = stale_after
+        self.full_refresh_after = full_refresh_after
+        self.min_period = min_period
+        self.fetcher = fetcher
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._usage: "OrderedDict[tuple, int]" = OrderedDict()  # Bytes per key, least recently read first
+        self._bytes = 0
+        self._hits = 0
+        self._full_fetches = 0
+        self._delta_fetches = 0
+        self._evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    # ---- public API ----
+
+    def fetch(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
+        key = (symbol.strip().upper(), interval)
+        if period is not None:
+            period = self._capped(interval, period)
+        with self._key_lock(key):
+            meta = self._load_meta(key)
+            if meta is None and period is None:
+                # Nothing stored to extend; pass the range request through
+                return self.fetcher(key[0], start=start, interval=interval)
+
+            now = time.time()
+            wrote = True
+            if meta is None or (period is not None and PERIOD_ORDER.index(period) > PERIOD_ORDER.index(meta["period"])):
+                floor = meta["period"] if meta else self._capped(interval, self.min_period)
+                meta = self._full_fetch(key, wider_period(period, floor), meta)
+            elif now - meta["full_fetched_at"] > self.full_refresh_after:
+                meta = self._full_fetch(key, meta["period"], meta)
+            elif now - meta["fetched_at"] > self.stale_after:
+                meta = self._delta_fetch(key, meta)
+            else:
+                wrote = False
+                with self._lock:
+                    self._hits += 1
+
+            meta["last_access"] = now
+            self._save_meta(key, meta)
+            frame = self._read(key, meta)
+            self._account(key, self._disk_usage(key) if wrote else None)
+
+        if wrote:
+            self._enforce_cap(keep=key)
+        if frame.empty:
+            return frame
+        # Positional slices keep the columns as views of the maps
+        if start is not None:
+            begin = pd.Timestamp(start)
+            if frame.index.tz is not None and begin.tz is None:
+                begin = begin.tz_localize(frame.index.tz)
+            return frame.iloc[frame.index.searchsorted(begin):]
+        begin = period_start(period, pd.Timestamp.now(tz=frame.index.tz), frame.index)
+        return frame if begin is None else frame.iloc[frame.index.searchsorted(begin):]
+
+    def read(self, symbol: str, interval: str = "1d") -> Optional[pd.DataFrame]:
+        """Stored bars without touching upstream, or None."""
+        key = (symbol.strip().upper(), interval)
+        with self._key_lock(key):
+            meta = self._load_meta(key)
+            return None if meta is None else self._read(key, meta)
+
+    def compact(self) -> Dict[str, Any]:
+        before = self._disk_usage()
+        trimmed = 0
+        removed_files = 0
+        for key in self._keys():
+            with self._key_lock(key):
+                directory = self._dir(key)
+                meta = self._load_meta(key)
+                if meta is None:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    continue
+                frame = self._read(key, meta)
+                begin = None if frame.empty else period_start(meta["period"], pd.Timestamp.now(tz=frame.index.tz), frame.index)
+                keep_from = 0 if begin is None else int(frame.index.searchsorted(begin))
+                overhang = os.path.getsize(self._time_path(key, meta)) // 8 - meta["rows"] if meta["rows"] else 0
+                if keep_from or overhang:
+                    # Rewrite into a new generation; anything still mapping the old one keeps working
+                    meta = self._write_generation(key, frame.iloc[keep_from:], meta["period"], meta, refreshed=False)
+                    trimmed += keep_from + overhang
+                live = set(self._generation_files(meta)) | {"meta.json"}
+                for name in os.listdir(directory):
+                    if name not in live:
+                        os.remove(os.path.join(directory, name))
+                        removed_files += 1
+        self._scan()
+        evicted = self._enforce_cap()
+        return {
+            "bytes_before": before,
+            "bytes_after": self._disk_usage(),
+            "trimmed_rows": trimmed,
+            "removed_files": removed_files,
+            "evicted": evicted,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "hits": self._hits,
+                "full_fetches": self._full_fetches,
+                "delta_fetches": self._delta_fetches,
+                "evictions": self._evictions,
+            }
+            counters.update(symbols=len(self._usage), bytes=self._bytes)
+        return {"max_bytes": self.max_bytes, **counters}
+
+    # ---- upstream ----
+
+    @staticmethod
+    def _capped(interval: str, period: str) -> str:
+        """`period`, or the longest period upstream serves `interval` bars for (e.g. 5d of 1m bars)."""
+        max_period = BASE_MAX_PERIOD.get(interval)
+        if max_period is not None and PERIOD_ORDER.index(period) > PERIOD_ORDER.index(max_period):
+            return max_period
+        return period
+
+    def _full_fetch(self, key: tuple, period: str, meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        symbol, interval = key
+        period = self._capped(interval, period)
+        frame = self.fetcher(symbol, period=period, interval=interval)
+        with self._lock:
+            self._full_fetches += 1
+        return self._write_generation(key, frame, period, meta)
+
+    def _delta_fetch(self, key: tuple, meta: Dict[str, Any]) -> Dict[str, Any]:
+        symbol, interval = key
+        if meta["rows"] == 0:
+            return self._full_fetch(key, meta["period"], meta)
+        stored = self._read(key, meta)
+        last = stored.index[-1]
+        delta = self.fetcher(symbol, start=last.strftime("%Y-%m-%d"), interval=interval)
+        with self._lock:
+            self._delta_fetches += 1
+        if not delta.empty:
+            delta = delta[delta.index >= last]
+        if not delta.empty:
+            if list(delta.columns) != meta["columns"]:
+                return self._full_fetch(key, meta["period"], meta)
+            position = int(stored.index.searchsorted(delta.index[0]))
+            meta = self._append_generation(key, meta, delta, position)
+        meta["fetched_at"] = time.time()
+        return meta
+
+    # ---- files ----
+
+    def _write_generation(self, key: tuple, frame: pd.DataFrame, period: str, meta: Optional[Dict[str, Any]], refreshed: bool = True) -> Dict[str, Any]:
+        now = time.time()
+        new_meta = {
+            "symbol": key[0],
+            "interval": key[1],
+            "generation": (meta["generation"] + 1) if meta else 1,
+            "columns": [str(c) for c in frame.columns],
+            "tz": str(frame.index.tz) if isinstance(frame.index, pd.DatetimeIndex) and frame.index.tz is not None else None,
+            "rows": 0,
+            "period": period,
+            "fetched_at": now if refreshed else meta["fetched_at"],
+            "full_fetched_at": now if refreshed else meta["full_fetched_at"],
+            "last_access": meta["last_access"] if meta else now,
+        }
+        os.makedirs(self._dir(key), exist_ok=True)
+        self._write_rows(key, new_meta, frame, 0)
+        new_meta["rows"] = len(frame)
+        self._swap(key, meta, new_meta)
+        return new_meta
+
+    def _append_generation(self, key: tuple, meta: Dict[str, Any], frame: pd.DataFrame, position: int) -> Dict[str, Any]:
+        """A new generation holding the first `position` stored bars followed by `frame`."""
+        new_meta = {**meta, "generation": meta["generation"] + 1, "rows": position + len(frame)}
+        directory = self._dir(key)
+        for old, new in zip(self._generation_files(meta), self._generation_files(new_meta)):
+            with open(os.path.join(directory, old), "rb") as src, open(os.path.join(directory, new), "wb") as dst:
+                dst.write(src.read(position * 8))
+        self._write_rows(key, new_meta, frame, position)
+        self._swap(key, meta, new_meta)
+        return new_meta
+
+    def _swap(self, key: tuple, meta: Optional[Dict[str, Any]], new_meta: Dict[str, Any]):
+        """Point meta.json at the new generation, then unlink the old one (open maps of it stay valid)."""
+        self._save_meta(key, new_meta)
+        if meta:
+            for name in self._generation_files(meta):
+                try:
+                    os.remove(os.path.join(self._dir(key), name))
+                except FileNotFoundError:
+                    pass
+
+    def _write_rows(self, key: tuple, meta: Dict[str, Any], frame: pd.DataFrame, position: int):
+        if frame.empty:
+            return
+        index = frame.index.as_unit("ns")
+        arrays = [index.asi8.astype("<i8")]
+        arrays += [frame[c].to_numpy(dtype="<f8", na_value=np.nan) for c in frame.columns]
+        for name, array in zip(self._generation_files(meta)[:len(arrays)], arrays):
+            path = os.path.join(self._dir(key), name)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(position * 8)
+                f.write(np.ascontiguousarray(array).tobytes())
+
+    def _read(self, key: tuple, meta: Dict[str, Any]) -> pd.DataFrame:
+        rows = meta["rows"]
+        if rows == 0:
+            return pd.DataFrame(columns=meta["columns"], dtype=float)
+        directory = self._dir(key)
+        names = self._generation_files(meta)
+        times = np.memmap(os.path.join(directory, names[0]), dtype="<i8", mode="r", shape=(rows,))
+        index = pd.DatetimeIndex(times.view("M8[ns]"), copy=False)
+        if meta["tz"]:
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        columns = {
+            column: np.memmap(os.path.join(directory, name), dtype="<f8", mode="r", shape=(rows,))
+            for column, name in zip(meta["columns"], names[1:])
+        }
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def _generation_files(self, meta: Dict[str, Any]) -> List[str]:
+        gen = meta["generation"]
+        return [f"g{gen}.time.i8"] + [f"g{gen}.c{i}.f8" for i in range(len(meta["columns"]))]
+
+    def _time_path(self, key: tuple, meta: Dict[str, Any]) -> str:
+        return os.path.join(self._dir(key), self._generation_files(meta)[0])
+
+    def _dir(self, key: tuple) -> str:
+        symbol, interval = key
+        name = quote(symbol, safe="")
+        if name.startswith("."):
+            name = "%2E" + name[1:]
+        return os.path.join(self.root, quote(interval, safe=""), name)
+
+    def _keys(self) -> List[tuple]:
+        keys = []
+        for interval in os.listdir(self.root):
+            interval_dir = os.path.join(self.root, interval)
+            if os.path.isdir(interval_dir):
+                keys += [(unquote(name), unquote(interval)) for name in os.listdir(interval_dir)]
+        return keys
+
+    def _load_meta(self, key: tuple) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._dir(key), "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_meta(self, key: tuple, meta: Dict[str, Any]):
+        path = os.path.join(self._dir(key), "meta.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        # Striped: a fixed number of locks however many symbols are stored
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def _disk_usage(self, key: Optional[tuple] = None) -> int:
+        directories = [self._dir(key)] if key else [self._dir(k) for k in self._keys()]
+        total = 0
+        for directory in directories:
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                total += os.path.getsize(os.path.join(directory, name))
+        return total
+
+    def _scan(self):
+        """Rebuild the per-key byte counts from disk, least recently read first."""
+        keys = self._keys()
+        last_access = {key: (self._load_meta(key) or {}).get("last_access", 0) for key in keys}
+        usage = OrderedDict((key, self._disk_usage(key)) for key in sorted(keys, key=lambda k: last_access[k]))
+        with self._lock:
+            self._usage = usage
+            self._bytes = sum(usage.values())
+
+    def _account(self, key: tuple, size: Optional[int] = None):
+        """Mark `key` as just read, and record its new size after a write."""
+        with self._lock:
+            if size is not None:
+                self._bytes += size - self._usage.get(key, 0)
+                self._usage[key] = size
+            if key in self._usage:
+                self._usage.move_to_end(key)
+
+    def _enforce_cap(self, keep: Optional[tuple] = None) -> int:
+        with self._lock:
+            total = self._bytes
+            victims = []
+            for key, size in self._usage.items():
+                if total <= self.max_bytes:
+                    break
+                if key != keep:
+                    victims.append(key)
+                    total -= size
+        for key in victims:
+            with self._key_lock(key):
+                shutil.rmtree(self._dir(key), ignore_errors=True)
+                with self._lock:
+                    self._bytes -= self._usage.pop(key, 0)
+                    self._evictions += 1
+        return len(victims)
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the on-disk price store")
+    parser.add_argument("command", choices=["compact", "stats"])
+    parser.add_argument("--dir", default=os.environ.get("A2UI_PRICE_STORE_DIR", "price_store"))
+    parser.add_argument("--max-mb", type=float, default=float(os.environ.get("A2UI_PRICE_STORE_MB", "512")))
+    args = parser.parse_args(argv)
+
+    store = PriceStore(args.dir, max_bytes=int(args.max_mb * 1024 * 1024))
+    result = store.compact() if args.command == "compact" else store.stats()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,143 @@
+import os
+import re
+import copy
+import json
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_HANGUL = r"가-힣ᄀ-ᇿ㄰-㆏"
+_SPACE_NEAR_HANGUL = re.compile(rf"(?<=[{_HANGUL}])\s+|\s+(?=[{_HANGUL}])")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Fold a user query into a cache key.
+    - NFKC: full-width Latin/digits and compatibility jamo become their plain forms
+    - casefold, and punctuation/symbols dropped ("AAPL 차트 보여줘!" == "aapl 차트 보여줘")
+    - whitespace collapsed, and removed next to Hangul since Korean spacing is
+      inconsistent ("삼성전자 주가" == "삼성전자주가") while Latin words stay separated
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(" " if unicodedata.category(ch)[0] in ("P", "S") else ch for ch in text)
+    text = " ".join(text.split())
+    return _SPACE_NEAR_HANGUL.sub("", text)
+
+
+class RouteCache:
+    """
+    Bounded LRU + TTL cache of routing decisions keyed on the normalized query.
+    If `path` is set the cache is loaded from a JSON file, so a restart does not
+    start cold. `put` only marks the cache dirty: the app calls `flush` every
+    `flush_seconds` off the event loop and once more on shutdown.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0, path: Optional[str] = None,
+                 flush_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # One writer of the file at a time
+        self._dirty = False
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        if path:
+            self.load()
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        key = normalize_query(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if time.time() - entry["stored_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return copy.deepcopy(entry["value"])
+
+    def put(self, text: str, value: Dict[str, Any]):
+        key = normalize_query(text)
+        with self._lock:
+            self._entries[key] = {"stored_at": time.time(), "value": copy.deepcopy(value)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            self._dirty = bool(self.path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "expired": self._expired,
+            "evictions": self._evictions,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception as e:
+            print(f"Route cache load error ({self.path}): {e}")
+            return
+        now = time.time()
+        with self._lock:
+            # Stored oldest-first, so replaying keeps the LRU order
+            for key, entry in stored.items():
+                if now - entry.get("stored_at", 0) <= self.ttl_seconds:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def flush(self) -> bool:
+        """Write the cache to disk if it changed since the last write. Returns whether it was written."""
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+        return self.save()
+
+    def save(self) -> bool:
+        if not self.path:
+            return False
+        with self._write_lock:
+            with self._lock:
+                # Stored entries are never mutated, so a shallow copy is a consistent snapshot
+                snapshot = dict(self._entries)
+                self._dirty = False
+            # Serialize outside the cache lock so get/put are not held up by the write
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                return True
+            except Exception as e:
+                print(f"Route cache save error ({self.path}): {e}")
+                with self._lock:
+                    self._dirty = True
+                return False
@@ -0,0 +1,68 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Worker threads for blocking library calls (yfinance) that have no async API
+BLOCKING_WORKERS = int(os.environ.get("A2UI_BLOCKING_WORKERS", "8"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient. Normally created by the app lifespan;
+    created lazily here so scripts and tests can use the async services too.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client()
+    return _http_client
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="a2ui-blocking")
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call on the bounded worker pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def startup():
+    get_http_client()
+    get_executor()
+    print(f"Runtime started: http2={HTTP2_AVAILABLE}, blocking_workers={BLOCKING_WORKERS}")
+
+
+async def shutdown():
+    global _http_client, _executor
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
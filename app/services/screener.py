@@ -0,0 +1,279 @@
+"""
+Stock screener: conditions on price, moving averages and indicators evaluated
+across a whole universe of symbols.
+
+Histories come from the shared PriceHistoryCache in bulk batches fetched
+concurrently. Features (latest price, MAs, RSI, MACD, ...) are computed on one
+(symbols, bars) panel in the calling thread: a few vectorized passes, ~50 ms
+for 500 symbols, which is less than shipping the panel to worker processes. The scan runs against a deadline: symbols
+whose batch was not fetched in time are skipped and reported instead of delaying
+the answer. Downloads still running at
+the deadline finish in the background and fill the cache for the next scan.
+"""
+import os
+import re
+import json
+import time
+import operator
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services import indicators as ind
+
+# Seconds a whole scan may take, fetching included
+SCREEN_BUDGET_SECONDS = float(os.environ.get("A2UI_SCREEN_BUDGET", "10"))
+# Symbols per bulk download, and downloads running at once
+FETCH_BATCH = 100
+FETCH_CONCURRENCY = 4
+# Bars per symbol: ~6 months covers MA120 and the indicator warm-ups
+SCREEN_PERIOD = "6mo"
+SCREEN_BARS = 130
+MIN_BARS = 30
+
+# Built-in universes. Large caps only; full index memberships change every few
+# months, so add them as JSON ({"name": [symbols]}) via A2UI_SCREEN_UNIVERSES.
+UNIVERSES: Dict[str, List[str]] = {
+    "dow30": [
+        "AAPL", "AMGN", "AMZN", "AXP", "BA", "CAT", "CRM", "CSCO", "CVX", "DIS",
+        "GS", "HD", "HON", "IBM", "JNJ", "JPM", "KO", "MCD", "MMM", "MRK",
+        "MSFT", "NKE", "NVDA", "PG", "SHW", "TRV", "UNH", "V", "VZ", "WMT",
+    ],
+    "nasdaq_large": [
+        "AAPL", "MSFT", "NVDA", "AMZN", "META", "GOOGL", "AVGO", "TSLA", "COST", "NFLX",
+        "AMD", "PEP", "ADBE", "CSCO", "TMUS", "INTC", "QCOM", "TXN", "AMGN", "INTU",
+        "ISRG", "CMCSA", "HON", "AMAT", "BKNG", "VRTX", "ADP", "SBUX", "GILD", "MDLZ",
+        "ADI", "REGN", "LRCX", "PANW", "MU", "KLAC", "SNPS", "CDNS", "MELI", "PYPL",
+    ],
+    "kospi_large": [
+        "005930.KS", "000660.KS", "373220.KS", "207940.KS", "005380.KS", "000270.KS", "068270.KS", "005490.KS",
+        "035420.KS", "051910.KS", "006400.KS", "105560.KS", "055550.KS", "012330.KS", "028260.KS", "035720.KS",
+        "066570.KS", "003550.KS", "017670.KS", "030200.KS", "015760.KS", "034730.KS", "096770.KS", "032830.KS",
+        "018260.KS", "009150.KS", "086790.KS", "316140.KS", "010130.KS", "011200.KS", "033780.KS", "010950.KS",
+        "259960.KS", "012450.KS", "034020.KS", "329180.KS", "042660.KS", "267250.KS", "352820.KS", "000810.KS",
+    ],
+}
+UNIVERSE_LABELS = {"dow30": "Dow 30", "nasdaq_large": "NASDAQ large caps", "kospi_large": "KOSPI large caps"}
+
+
+def load_universes(path: Optional[str]) -> Dict[str, List[str]]:
+    """Extra universes from a JSON file of {"name": [symbols]}; names are matched case-insensitively."""
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {str(name).lower(): [str(s).upper() for s in symbols] for name, symbols in json.load(f).items()}
+    except (OSError, ValueError) as e:
+        print(f"Screen universes not loaded from {path}: {e}")
+        return {}
+
+
+UNIVERSES.update(load_universes(os.environ.get("A2UI_SCREEN_UNIVERSES")))
+
+# Screenable fields -> column label
+FIELDS = {
+    "price": "Price",
+    "change_pct": "1D %",
+    "return_1m": "1M %",
+    "return_3m": "3M %",
+    "ma20": "MA20",
+    "ma60": "MA60",
+    "ma120": "MA120",
+    "ma20_gap": "vs MA20 %",
+    "ma60_gap": "vs MA60 %",
+    "ma120_gap": "vs MA120 %",
+    "rsi": "RSI",
+    "macd": "MACD",
+    "macd_signal": "Signal",
+    "macd_hist": "MACD Hist",
+    "bb_pct_b": "%B",
+    "stoch_k": "%K",
+    "atr_pct": "ATR %",
+    "volume_ratio": "Vol/20D",
+}
+
+# Fields shown as signed percentages; the rest as plain numbers
+PERCENT_FIELDS = {"change_pct", "return_1m", "return_3m", "ma20_gap", "ma60_gap", "ma120_gap", "atr_pct"}
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+_CONDITION = re.compile(r"^\s*([a-z0-9_]+)\s*(<=|>=|<|>)\s*([a-z0-9_.+-]+)\s*$", re.IGNORECASE)
+
+Condition = Tuple[str, str, Any]  # (field, operator, number or another field)
+
+
+def format_value(field: str, value: float) -> str:
+    if not np.isfinite(value):
+        return "N/A"
+    if field in PERCENT_FIELDS:
+        return f"{value:+.1f}%" if field != "atr_pct" else f"{value:.1f}%"
+    if field in ("rsi", "stoch_k"):
+        return f"{value:.1f}"
+    if field == "volume_ratio":
+        return f"{value:.2f}x"
+    return f"{value:,.2f}"
+
+
+def parse_conditions(conditions: Sequence[Any]) -> List[Condition]:
+    """
+    Conditions as {"field", "op", "value"} dicts or "rsi < 30" strings. The value
+    is a number or another field ("ma20 > ma60"). Raises ValueError when invalid.
+    """
+    parsed = []
+    for condition in conditions or []:
+        if isinstance(condition, str):
+            match = _CONDITION.match(condition)
+            if not match:
+                raise ValueError(f"Cannot read condition: {condition}")
+            field, op, value = match.groups()
+        else:
+            field, op, value = condition.get("field"), condition.get("op"), condition.get("value")
+        field = str(field).strip().lower()
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        if isinstance(value, str) and value.strip().lower() in FIELDS:
+            value = value.strip().lower()
+        else:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Condition value must be a number or a field: {value}")
+        parsed.append((field, op, value))
+    return parsed
+
+
+def tail_panel(frames: Dict[str, pd.DataFrame], bars: int = SCREEN_BARS) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    The last `bars` bars of every symbol, right-aligned into (symbols, bars) arrays:
+    only the latest values are screened, so symbols from exchanges with different
+    holidays need no common dates. Shorter histories are padded with leading NaN.
+    """
+    symbols = list(frames)
+    panel = {column: np.full((len(symbols), bars), np.nan) for column in ("Close", "High", "Low", "Volume")}
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol].iloc[-bars:]
+        for column, values in panel.items():
+            source = column if column in frame else "Close"
+            if source in frame:
+                values[row, bars - len(frame):] = frame[source].to_numpy(dtype=float)
+    return symbols, panel
+
+
+def features(panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Latest value of every screenable field for each row of the panel."""
+    close, high, low, volume = (ind._panel(panel[c]) for c in ("Close", "High", "Low", "Volume"))
+    last = close[:, -1]
+
+    def ago(bars: int) -> np.ndarray:
+        return close[:, -1 - bars] if close.shape[1] > bars else np.full(len(close), np.nan)
+
+    ma = {w: ind.sma(close, w)[:, -1] for w in (20, 60, 120)}
+    line, signal, histogram = ind.macd(close)
+    _, upper, lower = ind.bollinger(close)
+    k, _ = ind.stochastic(high, low, close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "price": last,
+            "change_pct": (last / ago(1) - 1) * 100,
+            "return_1m": (last / ago(21) - 1) * 100,
+            "return_3m": (last / ago(63) - 1) * 100,
+            "ma20": ma[20],
+            "ma60": ma[60],
+            "ma120": ma[120],
+            "ma20_gap": (last / ma[20] - 1) * 100,
+            "ma60_gap": (last / ma[60] - 1) * 100,
+            "ma120_gap": (last / ma[120] - 1) * 100,
+            "rsi": ind.rsi(close)[:, -1],
+            "macd": line[:, -1],
+            "macd_signal": signal[:, -1],
+            "macd_hist": histogram[:, -1],
+            "bb_pct_b": ((last - lower[:, -1]) / (upper[:, -1] - lower[:, -1])),
+            "stoch_k": k[:, -1],
+            "atr_pct": ind.atr(high, low, close)[:, -1] / last * 100,
+            "volume_ratio": volume[:, -1] / ind.sma(volume, 20)[:, -1],
+        }
+
+
+def evaluate(values: Dict[str, np.ndarray], conditions: Sequence[Condition]) -> np.ndarray:
+    """Rows meeting every condition; a NaN on either side fails it."""
+    size = len(values["price"])
+    mask = np.ones(size, dtype=bool)
+    for field, op, value in conditions:
+        right = values[value] if isinstance(value, str) else np.full(size, value)
+        with np.errstate(invalid="ignore"):
+            mask &= OPERATORS[op](values[field], right)
+    return mask
+
+
+def _fetch(history: Any, symbols: List[str], deadline: float, skipped: Dict[str, List[str]]) -> Dict[str, pd.DataFrame]:
+    batches = [symbols[i:i + FETCH_BATCH] for i in range(0, len(symbols), FETCH_BATCH)]
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_CONCURRENCY, len(batches)), thread_name_prefix="a2ui-screen")
+    try:
+        futures = {executor.submit(history.get_many, batch, period=SCREEN_PERIOD): batch for batch in batches}
+        done, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    finally:
+        # Don't wait for late downloads; they still land in the shared cache
+        executor.shutdown(wait=False, cancel_futures=True)
+    frames = {}
+    for future in done:
+        try:
+            frames.update(future.result())
+        except Exception as e:
+            print(f"Screen fetch error: {e}")
+            skipped["error"].extend(futures[future])
+    for future in pending:
+        skipped["time budget"].extend(futures[future])
+    for symbol in [s for s, frame in frames.items() if len(frame) < MIN_BARS]:
+        del frames[symbol]
+        skipped["no data"].append(symbol)
+    return frames
+
+
+def screen(history: Any, symbols: Sequence[str], conditions: Sequence[Condition], sort_by: Optional[str] = None,
+           descending: Optional[bool] = None, limit: int = 20, budget: float = SCREEN_BUDGET_SECONDS) -> Dict[str, Any]:
+    """
+    Scan `symbols` for rows meeting every condition, ranked by `sort_by` (default
+    the first condition's field: ascending for "<" conditions, else descending).
+
+    Returns {"matches": [{"symbol", field: value}], "matched", "scanned",
+    "requested", "skipped": {reason: [symbols]}, "elapsed", "fields"}, where
+    "fields" are the columns worth showing (condition fields plus the sort field).
+    """
+    start = time.monotonic()
+    deadline = start + budget
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    skipped: Dict[str, List[str]] = {"no data": [], "time budget": [], "error": []}
+
+    frames = _fetch(history, symbols, deadline, skipped)
+    # Request order, so ranking ties are stable
+    frames = {s: frames[s] for s in symbols if s in frames}
+    names, panel = tail_panel(frames)
+    values = features(panel) if names else {field: np.empty(0) for field in FIELDS}
+
+    if sort_by is None:
+        sort_by = conditions[0][0] if conditions else "return_1m"
+        if descending is None:
+            descending = not (conditions and conditions[0][1] in ("<", "<="))
+    descending = True if descending is None else descending
+    fields = list(dict.fromkeys(
+        ["price", "change_pct"] + [f for f, _, _ in conditions] + [v for _, _, v in conditions if isinstance(v, str)] + [sort_by]
+    ))
+
+    matched = np.flatnonzero(evaluate(values, conditions)) if names else np.empty(0, dtype=int)
+    key = values[sort_by][matched] if names else np.empty(0)
+    # NaN ranks last either way
+    order = np.argsort(np.where(np.isnan(key), np.inf, -key if descending else key), kind="stable")
+    matches = [{"symbol": names[i], **{f: float(values[f][i]) for f in fields}} for i in matched[order][:limit]]
+    return {
+        "matches": matches,
+        "matched": int(len(matched)),
+        "scanned": len(names),
+        "requested": len(symbols),
+        "skipped": {reason: found for reason, found in skipped.items() if found},
+        "elapsed": time.monotonic() - start,
+        "fields": fields,
+        "sort_by": sort_by,
+    }
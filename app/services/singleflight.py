@@ -0,0 +1,75 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def normalize_args(args: Dict[str, Any]) -> Tuple:
+    """
+    Turn tool args into a hashable key that ignores cosmetic differences:
+    key order, surrounding whitespace, letter case and int/float spelling.
+    Lists (and dicts or lists inside them) become tuples, at any depth.
+    """
+    return tuple((key, _normalize_value(args[key])) for key in sorted(args) if args[key] is not None)
+
+
+def _normalize_value(value: Any) -> Hashable:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return normalize_args(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_value(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_normalize_value(v) for v in value)
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key starts the
+    work, later callers for the same key await that same result instead of
+    issuing their own upstream fetch. Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._calls = 0
+        self._executions = 0
+        self._merged = 0
+        self._errors = 0
+        self._merged_by_tool = Counter()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self._merged += 1
+            self._merged_by_tool[key[0] if isinstance(key, tuple) else key] += 1
+        else:
+            self._executions += 1
+            # Run as its own task so one caller disconnecting doesn't cancel it for the rest
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            self._errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self._calls,
+            "executions": self._executions,
+            "merged": self._merged,
+            "errors": self._errors,
+            "in_flight": len(self._inflight),
+            "merge_rate": round(self._merged / self._calls, 4) if self._calls else 0.0,
+            "merged_by_tool": dict(self._merged_by_tool),
+        }
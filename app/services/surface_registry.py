@@ -0,0 +1,170 @@
+"""
+The A2UI surfaces sent to each client session, by root component id, so that
+refreshing a surface sends a component-level diff instead of the whole tree.
+Roots are `<uid>_...` ids, so two widgets with the same surface id (two stock
+charts, say) are kept apart.
+
+Surfaces are rebuilt with fresh `<uid>_` component ids on every request. Before
+diffing, the uids of the new surface are mapped onto the stored ones in order
+of first appearance (a dashboard has one uid per tool surface); a surface with
+a different number of uids cannot be matched and is sent in full.
+
+A diff is an A2UIData without beginRendering:
+
+- `surfaceUpdate.components`: the added and changed components (a bound Text
+  whose literalString alone changed is not sent: its value is in the data model)
+- `surfaceUpdate.removed`: ids of the components that are gone
+- `dataModelUpdate.contents`: the data model keys whose values changed
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _surface_id(data: Dict[str, Any]) -> Optional[str]:
+    for part in ("beginRendering", "surfaceUpdate", "dataModelUpdate"):
+        if data.get(part):
+            return data[part]["surfaceId"]
+    return None
+
+
+def _uids(components: List[Dict[str, Any]]) -> List[str]:
+    """The `<uid>_` prefixes of the component ids, in order of first appearance."""
+    uids: Dict[str, None] = {}
+    for entry in components:
+        uid, sep, _ = entry["id"].partition("_")
+        if sep:
+            uids.setdefault(uid, None)
+    return list(uids)
+
+
+def _rename(value: Any, names: Dict[str, str]) -> Any:
+    # Only whole strings are renamed: component ids and the bare uids (e.g. an action's uid context)
+    if isinstance(value, str):
+        return names.get(value, value)
+    if isinstance(value, dict):
+        return {k: _rename(v, names) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rename(v, names) for v in value]
+    return value
+
+
+def _same(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> bool:
+    """Equal components, ignoring the literalString of a data-bound Text (only a fallback for the bound value)."""
+    if old is None:
+        return False
+    texts = [(entry["component"].get("Text") or {}).get("text") or {} for entry in (old, new)]
+    if texts[0].get("path") and texts[0].get("path") == texts[1].get("path"):
+        strip = lambda entry: {**entry, "component": {**entry["component"], "Text": {
+            **entry["component"]["Text"], "text": {**entry["component"]["Text"]["text"], "literalString": None}}}}
+        return strip(old) == strip(new)
+    return old == new
+
+
+def rebase(data: Dict[str, Any], old_uids: List[str]) -> Optional[Dict[str, Any]]:
+    """`data` with its uids replaced by `old_uids` (a new dict), or None if they do not pair up."""
+    components = data["surfaceUpdate"]["components"]
+    new_uids = _uids(components)
+    if len(new_uids) != len(old_uids):
+        return None
+    if new_uids == old_uids:
+        return data
+    names = dict(zip(new_uids, old_uids))
+    for entry in components:
+        uid, sep, name = entry["id"].partition("_")
+        if sep and uid in names:
+            names[entry["id"]] = f"{names[uid]}_{name}"
+    return _rename(data, names)
+
+
+class SurfaceEntry:
+    """One surface as the client holds it: its root and components / data model values by id and key."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.root = data["beginRendering"]["root"]
+        self.components = OrderedDict((c["id"], c) for c in data["surfaceUpdate"]["components"])
+        self.data = {c["key"]: c for c in (data["dataModelUpdate"] or {}).get("contents", [])}
+
+    def merge(self, data: Dict[str, Any]):
+        """Apply an update without beginRendering, the way the client does."""
+        update = data.get("surfaceUpdate") or {}
+        for component_id in update.get("removed") or []:
+            self.components.pop(component_id, None)
+        for entry in update.get("components") or []:
+            self.components[entry["id"]] = entry
+        for content in (data.get("dataModelUpdate") or {}).get("contents", []):
+            self.data[content["key"]] = content
+
+
+class SurfaceRegistry:
+    """SurfaceEntries by (session, root id), evicted LRU beyond `max_entries`."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], SurfaceEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"full": 0, "diffs": 0, "evictions": 0, "components_sent": 0, "components_skipped": 0}
+
+    def update(self, session: str, data: Dict[str, Any], root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Record surface data (a wire A2UIData dict) sent to `session`. `root` is the root id of
+        the widget the data is meant for: a partial update (no beginRendering) is merged into
+        that surface, and a full surface refreshing it is answered with the diff to send.
+        None means send `data` itself. `data` is never modified.
+        """
+        surface_id = _surface_id(data)
+        if surface_id is None:
+            return None
+        with self._lock:
+            entry = self._entries.get((session, root)) if root is not None else None
+            if not data.get("beginRendering"):
+                # A partial update (e.g. a loan recalculation) of the surface the client holds
+                if entry is not None:
+                    entry.merge(data)
+                    self._entries.move_to_end((session, root))
+                return None
+            new = None
+            if entry is not None:
+                rebased = rebase(data, _uids(list(entry.components.values())))
+                if rebased is not None and rebased["beginRendering"]["root"] == entry.root:
+                    new = SurfaceEntry(rebased)
+            if new is None:
+                # Not matched: the client draws the full surface, under its own root
+                if root is not None:
+                    self._entries.pop((session, root), None)
+                self._store((session, data["beginRendering"]["root"]), SurfaceEntry(data))
+                self._counts["full"] += 1
+                self._counts["components_sent"] += len(data["surfaceUpdate"]["components"])
+                return None
+            changed = [c for cid, c in new.components.items() if not _same(entry.components.get(cid), c)]
+            removed = [cid for cid in entry.components if cid not in new.components]
+            contents = [c for k, c in new.data.items() if entry.data.get(k) != c]
+            self._store((session, root), new)
+            self._counts["diffs"] += 1
+            self._counts["components_sent"] += len(changed)
+            self._counts["components_skipped"] += len(new.components) - len(changed)
+        return {
+            "surfaceUpdate": {"surfaceId": surface_id, "components": changed, "removed": removed} if changed or removed else None,
+            "dataModelUpdate": {"surfaceId": surface_id, "contents": contents} if contents else None,
+            "beginRendering": None,
+        }
+
+    def _store(self, key: Tuple[str, str], entry: SurfaceEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, **self._counts}
+
+
+def default_registry() -> SurfaceRegistry:
+    return SurfaceRegistry(max_entries=int(os.environ.get("A2UI_SURFACE_REGISTRY_SIZE", "1024")))
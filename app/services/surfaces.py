@@ -0,0 +1,403 @@
+"""
+A2UI surfaces for every tool, built with SurfaceBuilder.
+
+Each function takes the values the tool computed and returns an A2UIResponse.
+Text is passed through as-is (no JSON escaping needed) and component ids are
+namespaced with `uid` like the former Jinja templates.
+"""
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from app.schemas.builder import SurfaceBuilder
+from app.schemas.models import A2UIResponse, TextResponse
+
+MAP_EMBED_URL = "https://www.google.com/maps/embed/v1/place?key={key}&q={lat},{lng}&zoom=16"
+
+
+def render(build: Callable[..., A2UIResponse], **context) -> Union[A2UIResponse, TextResponse]:
+    """Build a surface, falling back to a TextResponse if the data does not fit the schema."""
+    try:
+        result = build(**context)
+        print(f"Surface built successfully for {build.__name__}")
+        return result
+    except Exception as e:
+        print(f"Surface Build Error for {build.__name__}: {e}")
+        return TextResponse(text=f"Error rendering UI: {e}")
+
+
+def loan_values(principal, rate, years, monthly: float, total: float, interest: float) -> Dict[str, str]:
+    """The loan surface's result texts, bound to /loan/<key> so a recalculation only sends these."""
+    return {
+        "principal": f"• Principal: ${principal}",
+        "rate": f"• Rate: {rate}%",
+        "years": f"• Duration: {years} Years",
+        "monthly": f"💳 Monthly Payment: ${monthly:,.2f}",
+        "total": f"💰 Total Payment: ${total:,.2f}",
+        "interest": f"📈 Total Interest: ${interest:,.2f}",
+        "breakdown": f"(Principal: ${principal} + Interest: ${interest:,.2f})",
+    }
+
+
+def loan_result(principal, rate, years, monthly: float, total: float, interest: float, uid: Optional[str] = None,
+                schedule: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None, columns: bool = False) -> A2UIResponse:
+    """
+    `schedule` (chart series, or columnar data when `columns` is set) adds an amortization chart.
+    The button sends the inputs and `uid` back, so the answer can be a loan_update of this surface.
+    """
+    ui = SurfaceBuilder("loan_calculator", uid)
+    values = loan_values(principal, rate, years, monthly, total, interest)
+    ui.column("root", [
+        "header", "calc_icon", "divider1",
+        "input_section", "input_principal", "input_rate", "input_years",
+        "divider2", "results_section",
+        "result_monthly", "result_total", "result_interest", "result_breakdown",
+    ] + (["schedule_title", "schedule_chart"] if schedule is not None else []) + [
+        "divider3", "comparison_title", "comparison_info",
+        "divider4", "recalc_section",
+        "new_principal", "new_rate", "new_years",
+        "calc_button_text", "calc_button",
+    ])
+    ui.text("header", "🏦 Loan Payment Calculator", "h1")
+    ui.text("calc_icon", "Start planning your financial future today.", "subtitle")
+    ui.text("divider1", "---", "caption")
+    ui.text("input_section", "Input Details", "h2")
+    ui.text("input_principal", values["principal"], "body", path="/loan/principal")
+    ui.text("input_rate", values["rate"], "body", path="/loan/rate")
+    ui.text("input_years", values["years"], "body", path="/loan/years")
+    ui.text("divider2", "---", "caption")
+    ui.text("results_section", "Your Estimated Payments", "h2")
+    ui.text("result_monthly", values["monthly"], "h2", path="/loan/monthly")
+    ui.text("result_total", values["total"], "body", path="/loan/total")
+    ui.text("result_interest", values["interest"], "body", path="/loan/interest")
+    ui.text("result_breakdown", values["breakdown"], "caption", path="/loan/breakdown")
+    if schedule is not None:
+        ui.text("schedule_title", "Amortization Schedule", "h3")
+        if columns:
+            ui.chart("schedule_chart", columns=schedule)
+        else:
+            ui.chart("schedule_chart", series=schedule)
+    ui.text("divider3", "---", "caption")
+    ui.text("comparison_title", "Did you know?", "h3")
+    ui.text("comparison_info", "Paying slightly more each month can significantly reduce your total interest and shorten the loan term.", "body")
+    ui.text("divider4", "---", "caption")
+    ui.text("recalc_section", "Recalculate", "h3")
+    ui.text_field("new_principal", "Loan Amount ($)", "/calculator/principal")
+    ui.text_field("new_rate", "APR (%)", "/calculator/rate")
+    ui.text_field("new_years", "Years", "/calculator/years")
+    ui.text("calc_button_text", "Calculate Re-Payment", "button_label")
+    ui.button("calc_button", "calc_button_text", "calculateLoan", {
+        "principal": "/calculator/principal",
+        "annualRate": "/calculator/rate",
+        "years": "/calculator/years",
+    }, literals={"uid": ui.uid})
+    ui.data_model("calculator", {"principal": principal, "rate": rate, "years": years})
+    ui.data_model("loan", values)
+    return ui.build()
+
+
+def loan_update(surface_id: str, uid: str, principal, rate, years, monthly: float, total: float, interest: float,
+                schedule: Optional[Union[List[Dict[str, Any]], Dict[str, Any]]] = None, columns: bool = False) -> A2UIResponse:
+    """
+    A recalculation of a loan_result the client shows (`surface_id`, component ids under `uid`):
+    the bound result values and, when given, the replaced schedule chart. Charts cannot be
+    bound to the data model, so the chart is the only component sent.
+    """
+    ui = SurfaceBuilder(surface_id, uid)
+    if schedule is not None:
+        if columns:
+            ui.chart("schedule_chart", columns=schedule)
+        else:
+            ui.chart("schedule_chart", series=schedule)
+    ui.data_model("loan", loan_values(principal, rate, years, monthly, total, interest))
+    return ui.update()
+
+
+def _map_rows(ui: SurfaceBuilder, places: List[Dict[str, Any]], row_name: str, detail_key: str, maps_api_key: str):
+    for i, r in enumerate(places, 1):
+        ui.column(f"{row_name}_{i}", [f"map_{i}", f"info_col_{i}"])
+        ui.iframe(f"map_{i}", MAP_EMBED_URL.format(key=maps_api_key, lat=r["lat"], lng=r["lng"]), height=250)
+        ui.column(f"info_col_{i}", [f"name_{i}", f"{detail_key}_{i}", f"address_{i}"])
+        ui.text(f"name_{i}", f"{r['name']}", "h3")
+        ui.text(f"{detail_key}_{i}", f"{r[detail_key]}", "body")
+        ui.text(f"address_{i}", f"📍 {r['location']}", "caption")
+
+
+def place_list(places: List[Dict[str, Any]], location: str, keyword: Optional[str] = None, maps_api_key: str = "",
+               uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("place_list", uid)
+    ui.column("root", ["title", "result_count"] + [f"place_row_{i}" for i in range(1, len(places) + 1)])
+    ui.text("title", f"📍 {keyword or 'Places'} in {location}", "h2")
+    ui.text("result_count", f"Found {len(places)} places matching your search.", "caption")
+    _map_rows(ui, places, "place_row", "category", maps_api_key)
+    return ui.build()
+
+
+def restaurant_list(restaurants: List[Dict[str, Any]], location: str, maps_api_key: str = "",
+                    uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("restaurant_list", uid)
+    ui.column("root", ["title", "result_count"] + [f"rest_row_{i}" for i in range(1, len(restaurants) + 1)])
+    ui.text("title", f"🍽️ Restaurants in {location}", "h2")
+    ui.text("result_count", f"Found {len(restaurants)} places matching your criteria.", "caption")
+    _map_rows(ui, restaurants, "rest_row", "cuisine", maps_api_key)
+    return ui.build()
+
+
+def reservation_confirmed(restaurant_name: str, date: str, guests, uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("reservation_confirmed", uid)
+    ui.column("root", ["icon", "title", "details_card", "divider", "msg"])
+    ui.text("icon", "✅", "h1")
+    ui.text("title", "Reservation Confirmed!", "h2")
+    ui.column("details_card", ["rest_name", "date", "guests"])
+    ui.text("rest_name", f"📍 {restaurant_name}", "h3")
+    ui.text("date", f"📅 {date}", "body")
+    ui.text("guests", f"👤 {guests} Guests", "body")
+    ui.text("divider", "---", "caption")
+    ui.text("msg", "A confirmation email has been sent to you.", "body")
+    return ui.build()
+
+
+def product_list(query: str, items: List[Dict[str, Any]], uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("product_list", uid)
+    rows = [items[i:i + 2] for i in range(0, len(items), 2)]
+    ui.column("root", ["title", "result_count"] + [f"row_{r}" for r in range(1, len(rows) + 1)])
+    ui.text("title", f"🛒 Products for '{query}'", "h2")
+    ui.text("result_count", f"Found {len(items)} products.", "caption")
+    for r, batch in enumerate(rows, 1):
+        ui.row(f"row_{r}", [f"item_col_{r}_{c}" for c in range(1, len(batch) + 1)], style="product-row")
+        for c, item in enumerate(batch, 1):
+            ui.column(f"item_col_{r}_{c}", [f"image_{r}_{c}", f"name_{r}_{c}", f"price_{r}_{c}", f"mall_{r}_{c}"], style="product-card")
+            ui.image(f"image_{r}_{c}", f"{item['image']}", alt_text=f"{item['title']}")
+            ui.text(f"name_{r}_{c}", f"{item['title']}", "link", url=f"{item['link']}")
+            ui.text(f"price_{r}_{c}", f"₩{item['lprice']}", "h3")
+            ui.text(f"mall_{r}_{c}", f"at {item['mallName']}", "caption")
+    return ui.build()
+
+
+CHART_RANGE_LABELS = {
+    "1d": "1 Day", "5d": "5 Days", "1mo": "1 Month", "3mo": "3 Months", "6mo": "6 Months",
+    "1y": "1 Year", "2y": "2 Years", "5y": "5 Years", "10y": "10 Years", "max": "Max",
+}
+
+
+def stock_chart(symbol: str, series: Union[List[Dict[str, Any]], Dict[str, Any]], current_price: str, uid: Optional[str] = None,
+                columns: bool = False, period: str = "1y") -> A2UIResponse:
+    """`series` is the columnar chart data (see chart_series.build_chart_columns) when `columns` is set."""
+    ui = SurfaceBuilder("stock_chart", uid)
+    ui.column("root", ["title", "chart_viz", "current_price", "legend"])
+    ui.text("title", f"📈 {symbol} Stock Price ({CHART_RANGE_LABELS.get(period, period)})", "h2")
+    ui.text("current_price", f"Current: {current_price}", "h3")
+    lines = series["series"] if columns else series
+    legend = [f"legend_{s['name'].lower()}" for s in lines]
+    ui.row("legend", legend, style={"gap": "16px", "justifyContent": "center", "marginTop": "8px", "flexWrap": "wrap"})
+    for name, s in zip(legend, lines):
+        ui.text(name, f"● {s['name']}", "caption", style={"color": s["color"], "fontWeight": "bold"})
+    if columns:
+        ui.chart("chart_viz", columns=series)
+    else:
+        ui.chart("chart_viz", series=series)
+    return ui.build()
+
+
+def stock_compare(symbols: List[str], series: Union[List[Dict[str, Any]], Dict[str, Any]], stats: List[Dict[str, str]],
+                  correlation: List[List[str]], uid: Optional[str] = None, columns: bool = False, period: str = "1y") -> A2UIResponse:
+    """
+    One chart of every symbol's cumulative return (%), a stats row per symbol
+    ({"symbol", "color", "price", "return", "volatility"}) and the return
+    correlation matrix (formatted cells, symbols x symbols). `series` as in stock_chart.
+    """
+    ui = SurfaceBuilder("stock_compare", uid)
+    n = len(symbols)
+    ui.column("root", ["title", "chart_viz", "stats_title", "stats", "corr_title", "corr_table"])
+    ui.text("title", f"📊 {' vs '.join(symbols)} ({CHART_RANGE_LABELS.get(period, period)} Return)", "h2")
+    if columns:
+        ui.chart("chart_viz", columns=series)
+    else:
+        ui.chart("chart_viz", series=series)
+    ui.text("stats_title", "Return & Volatility", "h3")
+    ui.column("stats", [f"stat_{i}" for i in range(1, n + 1)], style={"gap": "4px"})
+    for i, s in enumerate(stats, 1):
+        ui.text(f"stat_{i}", f"● {s['symbol']}: {s['return']} | Volatility {s['volatility']} | {s['price']}", "body",
+                style={"color": s["color"]})
+    ui.text("corr_title", "Return Correlation", "h3")
+    # One monospace line per symbol rather than a component per cell, so the matrix stays small
+    width = max(len(symbol) for symbol in symbols) + 2
+    cell = max(width, 7)
+    lines = [" " * width + "".join(symbol.rjust(cell) for symbol in symbols)]
+    lines += [symbol.ljust(width) + "".join(value.rjust(cell) for value in row) for symbol, row in zip(symbols, correlation)]
+    ui.column("corr_table", [f"corr_row_{i}" for i in range(len(lines))], style={"gap": "0"})
+    for i, line in enumerate(lines):
+        ui.text(f"corr_row_{i}", line, "caption", style={"fontFamily": "monospace", "whiteSpace": "pre"})
+    return ui.build()
+
+
+def stock_backtest(symbol: str, strategy: str, series: Union[List[Dict[str, Any]], Dict[str, Any]], runs: List[str],
+                   final: List[str], table: List[Any], uid: Optional[str] = None, columns: bool = False,
+                   period: str = "5y") -> A2UIResponse:
+    """
+    Equity curves of `runs` (strategy, then the buy-and-hold baseline) and a stats
+    table: `table` is [(metric, [value per run])], `final` each run's ending value.
+    """
+    ui = SurfaceBuilder("stock_backtest", uid)
+    ui.column("root", ["title", "subtitle", "chart_viz", "stats_table", "note"])
+    ui.text("title", f"🧪 Backtest: {strategy} on {symbol}", "h2")
+    ui.text("subtitle", f"$10,000 invested over {CHART_RANGE_LABELS.get(period, period)}", "caption")
+    if columns:
+        ui.chart("chart_viz", columns=series)
+    else:
+        ui.chart("chart_viz", series=series)
+    rows = [("", runs), ("Final Value", final)] + [(metric, values) for metric, values in table]
+    ui.column("stats_table", [f"stat_row_{i}" for i in range(len(rows))], style={"gap": "4px"})
+    for i, (metric, values) in enumerate(rows):
+        cells = [f"stat_{i}_{j}" for j in range(len(values) + 1)]
+        ui.row(f"stat_row_{i}", cells, style={"gap": "16px"})
+        usage = "h4" if i == 0 else "body"
+        ui.text(cells[0], metric or " ", usage, style={"minWidth": "140px"})
+        for cell, value in zip(cells[1:], values):
+            ui.text(cell, value, usage, style={"minWidth": "120px", "textAlign": "right"})
+    ui.text("note", "Signals trade at the next close; no fees, taxes or slippage. Past performance does not predict future returns.", "caption")
+    return ui.build()
+
+
+def stock_screen(universe: str, conditions: str, headers: List[str], rows: List[List[str]], summary: str,
+                 uid: Optional[str] = None) -> A2UIResponse:
+    """Ranked screener matches: `rows` of formatted cells under `headers`, plus a scan summary line."""
+    ui = SurfaceBuilder("stock_screen", uid)
+    ui.column("root", ["title", "subtitle", "result_table", "summary"])
+    ui.text("title", f"🔎 Stock Screener: {universe}", "h2")
+    ui.text("subtitle", conditions, "caption")
+    table = [headers] + rows if rows else [["No stocks matched the conditions."]]
+    ui.column("result_table", [f"screen_row_{i}" for i in range(len(table))], style={"gap": "4px"})
+    for i, values in enumerate(table):
+        cells = [f"screen_{i}_{j}" for j in range(len(values))]
+        ui.row(f"screen_row_{i}", cells, style={"gap": "16px"})
+        usage = "h4" if i == 0 and rows else "body"
+        ui.text(cells[0], values[0], usage, style={"minWidth": "100px"})
+        for cell, value in zip(cells[1:], values[1:]):
+            ui.text(cell, value, usage, style={"minWidth": "90px", "textAlign": "right"})
+    ui.text("summary", summary, "caption")
+    return ui.build()
+
+
+def stock_dividends(symbol: str, dividends: Union[List[Dict[str, Any]], Dict[str, Any]], dividend_yield: str, uid: Optional[str] = None,
+                    columns: bool = False) -> A2UIResponse:
+    """`dividends` is the columnar chart data when `columns` is set, else [{"time", "value"}] points."""
+    ui = SurfaceBuilder("stock_dividends", uid)
+    ui.column("root", ["header", "yield_card", "chart_section"], style={"gap": "16px"})
+    ui.text("header", f"💰 Dividend History ({symbol})", "h2")
+    ui.column("yield_card", ["yield_text"], style={"padding": "16px", "backgroundColor": "#f8f9fa", "borderRadius": "8px"})
+    ui.text("yield_text", f"Current Dividend Yield: {dividend_yield}", "h3")
+    if columns:
+        ui.chart("chart_section", columns=dividends)
+    else:
+        ui.chart("chart_section", series=[{"name": "Dividends", "color": "#4285F4", "data": dividends}])
+    return ui.build()
+
+
+def stock_holders(symbol: str, insider_pct: str, inst_pct: str, top_holders: List[Dict[str, Any]],
+                  uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("stock_holders", uid)
+    ui.column("root", ["header", "bd_title", "bd_row", "top_title", "top_list"], style={"gap": "12px"})
+    ui.text("header", f"🏢 Ownership ({symbol})", "h2")
+    ui.text("bd_title", "Ownership Breakdown", "h3")
+    ui.column("bd_row", ["insider", "inst"],
+              style={"padding": "16px", "backgroundColor": "#f0f0f0", "borderRadius": "8px", "marginBottom": "20px"})
+    ui.text("insider", f"• Insiders: {insider_pct}", "body")
+    ui.text("inst", f"• Institutions: {inst_pct}", "body")
+    ui.text("top_title", "Top Institutional Holders", "h3")
+    ui.column("top_list", [f"holder_{i}" for i in range(1, len(top_holders) + 1)], style={"gap": "8px"})
+    for i, h in enumerate(top_holders, 1):
+        ui.column(f"holder_{i}", [f"hname_{i}", f"hdetail_{i}"],
+                  style={"padding": "12px", "border": "1px solid #eee", "borderRadius": "8px"})
+        ui.text(f"hname_{i}", f"{h['name']}", "h4")
+        ui.text(f"hdetail_{i}", f"Shares: {h['shares']} | Value: {h['value']} ({h['pct']})", "caption")
+    return ui.build()
+
+
+def stock_calendar(symbol: str, events: List[Dict[str, Any]], uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("stock_calendar", uid)
+    ui.column("root", ["header", "table_container"], style={"gap": "10px"})
+    ui.text("header", f"📅 Stock Calendar ({symbol})", "h2")
+    ui.column("table_container", [f"event_{i}" for i in range(1, len(events) + 1)])
+    for i, e in enumerate(events, 1):
+        ui.column(f"event_{i}", [f"ename_{i}", f"evalue_{i}"],
+                  style={"padding": "12px", "borderBottom": "1px solid #eee", "marginBottom": "4px"})
+        ui.text(f"ename_{i}", f"{e['name']}", "body")
+        ui.text(f"evalue_{i}", f"{e['value']}", "h4")
+    return ui.build()
+
+
+def stock_news(symbol: str, news_list: List[Dict[str, Any]], uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("stock_news", uid)
+    ui.column("root", ["header"] + [f"news_{i}" for i in range(1, len(news_list) + 1)])
+    ui.column("header", ["title", "subtitle"], style="news-header")
+    ui.text("title", f"📰 {symbol} 관련 뉴스", "news-header-title")
+    ui.text("subtitle", f"최신 기사 {len(news_list)}건", "news-header-subtitle")
+    for i, news in enumerate(news_list, 1):
+        ui.column(f"news_{i}", [f"news_title_{i}", f"news_meta_{i}"], style="news-card")
+        ui.text(f"news_title_{i}", f"{news['title']}", "news-title", url=f"{news['link']}")
+        ui.row(f"news_meta_{i}", [f"news_publisher_{i}", f"news_date_{i}"], style="news-meta")
+        ui.text(f"news_publisher_{i}", f"{news['publisher']}", "news-publisher")
+        ui.text(f"news_date_{i}", f"{news['date']}", "news-date")
+    return ui.build()
+
+
+def stock_info(symbol: str, profile: Dict[str, Any], financials: Dict[str, Any], uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("stock_info", uid)
+    ui.column("root", ["header", "profile_section", "stats_title", "stats_grid", "analysis_title", "analysis_row"])
+    ui.text("header", f"🏢 {profile['name']} ({symbol})", "h1")
+    ui.column("profile_section", ["sector_industry", "summary"])
+    ui.text("sector_industry", f"{profile['sector']} | {profile['industry']}", "caption")
+    ui.text("summary", f"{profile['summary']}", "body")
+    ui.text("separator_1", " ", "body")
+    ui.text("stats_title", "📊 Key Financials", "h3")
+    ui.column("stats_grid", ["stat_mktcap", "stat_pe", "stat_yield", "stat_range"])
+    ui.text("stat_mktcap", f"• Market Cap: {financials['marketCap']}", "body")
+    ui.text("stat_pe", f"• P/E Ratio: {financials['trailingPE']}", "body")
+    ui.text("stat_yield", f"• Div Yield: {financials['dividendYield']}", "body")
+    ui.text("stat_range", f"• 52W Range: {financials['fiftyTwoWeekLow']} - {financials['fiftyTwoWeekHigh']}", "body")
+    ui.text("analysis_title", "📈 Analyst Analysis", "h3")
+    ui.column("analysis_row", ["stat_consensus", "stat_target"])
+    ui.text("stat_consensus", f"• Consensus: {financials['recommendationKey']}", "body")
+    ui.text("stat_target", f"• Target Price: {financials['targetMeanPrice']}", "body")
+    return ui.build()
+
+
+def stock_indicators(symbol: str, rsi: Dict[str, Any], macd: Dict[str, Any], price: str, date: str,
+                     uid: Optional[str] = None, extras: Optional[List[Dict[str, str]]] = None) -> A2UIResponse:
+    """`extras`: more indicator boxes as {"title", "value", "signal"} (see indicators.summarize)."""
+    extras = extras or []
+    ui = SurfaceBuilder("stock_indicators", uid)
+    ui.column("root", ["header", "price_info", "rsi_box", "macd_box"] + [f"extra_{i}" for i in range(1, len(extras) + 1)])
+    ui.text("header", f"📉 Technical Analysis: {symbol}", "h2")
+    ui.text("price_info", f"Based on close price {price} at {date}", "caption")
+    ui.column("rsi_box", ["rsi_title", "rsi_val", "rsi_sig"])
+    ui.text("rsi_title", "RSI (14-day)", "h3")
+    ui.text("rsi_val", f"Value: {rsi['value']}", "h1")
+    ui.text("rsi_sig", f"Signal: {rsi['signal']}", "body")
+    ui.column("macd_box", ["macd_title", "macd_vals", "macd_sig"])
+    ui.text("macd_title", "MACD (12, 26, 9)", "h3")
+    ui.text("macd_vals", f"MACD: {macd['line']} | Signal: {macd['signal_line']}", "body")
+    ui.text("macd_sig", f"Trend: {macd['signal']}", "h2")
+    for i, extra in enumerate(extras, 1):
+        ui.column(f"extra_{i}", [f"extra_title_{i}", f"extra_val_{i}", f"extra_sig_{i}"])
+        ui.text(f"extra_title_{i}", extra["title"], "h3")
+        ui.text(f"extra_val_{i}", extra["value"], "body")
+        ui.text(f"extra_sig_{i}", f"Signal: {extra['signal']}", "body")
+    return ui.build()
+
+
+def stock_fundamentals(symbol: str, financials: List[Dict[str, Any]], holders: Dict[str, Any],
+                       recommendations: List[Dict[str, Any]], uid: Optional[str] = None) -> A2UIResponse:
+    ui = SurfaceBuilder("stock_fundamentals", uid)
+    ui.column("root", ["header", "fin_title", "fin_table", "hold_title", "hold_row", "rec_title", "rec_chart"])
+    ui.text("header", f"📊 Fundamentals: {symbol}", "h2")
+    ui.text("fin_title", "💰 Financial Performance (Last 4 Years)", "h3")
+    ui.column("fin_table", [f"fin_row_{i}" for i in range(1, len(financials) + 1)])
+    for i, item in enumerate(financials, 1):
+        ui.text(f"fin_row_{i}", f"{item['year']}: Revenue {item['revenue']} | Net Income {item['net_income']}", "body")
+    ui.text("hold_title", "👥 Shareholder Structure", "h3")
+    ui.text("hold_row", f"• Insiders: {holders['insiders']}\n• Institutions: {holders['institutions']}", "body")
+    ui.text("rec_title", "⭐ Analyst Ratings (Current Month)", "h3")
+    ui.column("rec_chart", [f"rec_item_{i}" for i in range(1, len(recommendations) + 1)])
+    for i, rec in enumerate(recommendations, 1):
+        ui.text(f"rec_item_{i}", f"{rec['label']}: {rec['count']}", "body")
+    return ui.build()
@@ -0,0 +1,197 @@
+"""
+Per-symbol snapshots of the yfinance data behind the info, fundamentals,
+holders, calendar, dividends and news tools.
+
+Every tool used to build its own yf.Ticker, so a "tell me everything about
+AAPL" dashboard downloaded `.info` three times. A snapshot fetches each data
+family at most once and keeps it for as long as that family stays current:
+
+- `.info` is one download but mixes price-driven fields (market cap, P/E,
+  yield: a minute) with profile fields (name, sector, summary: a day). Callers
+  name the field groups they read and `.info` is downloaded again only when one
+  of those groups is older than its TTL.
+- Quarterly data (financial statements, holders) is kept until the day after
+  the next earnings date in the cached `.calendar`, else until the next
+  calendar quarter starts.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+# Family -> TTL in seconds, or QUARTERLY
+QUARTERLY = "quarterly"
+FAMILY_TTLS: Dict[str, Any] = {
+    "news": 300.0,
+    "dividends": 86400.0,
+    "calendar": 86400.0,
+    "recommendations_summary": 86400.0,
+    "financials": QUARTERLY,
+    "major_holders": QUARTERLY,
+    "institutional_holders": QUARTERLY,
+}
+
+# `.info` field groups -> TTL in seconds
+INFO_TTLS: Dict[str, float] = {
+    "price": 60.0,        # currentPrice, marketCap, trailingPE, dividendYield, 52-week range
+    "analyst": 3600.0,    # targetMeanPrice, recommendationKey
+    "ownership": 86400.0, # heldPercentInsiders, heldPercentInstitutions
+    "profile": 86400.0,   # longName, sector, industry, longBusinessSummary, website
+}
+
+
+def _yfinance_ticker(symbol: str) -> Any:
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
+
+def next_quarter_start(now: pd.Timestamp) -> pd.Timestamp:
+    month = (now.month - 1) // 3 * 3 + 4
+    return pd.Timestamp(year=now.year + (month > 12), month=(month - 1) % 12 + 1, day=1, tz=now.tz)
+
+
+def next_earnings_date(calendar: Any, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """The first "Earnings Date" of a `.calendar` dict that is still ahead of `now`."""
+    if not isinstance(calendar, dict):
+        return None
+    dates = calendar.get("Earnings Date") or []
+    if not isinstance(dates, list):
+        dates = [dates]
+    ahead = []
+    for value in dates:
+        try:
+            date = pd.Timestamp(value)
+        except (TypeError, ValueError):
+            continue
+        date = date.tz_localize(now.tz) if date.tz is None else date.tz_convert(now.tz)
+        if date > now:
+            ahead.append(date)
+    return min(ahead) if ahead else None
+
+
+class TickerSnapshot:
+    """
+    The cached data families of one symbol. Families are fetched independently
+    (each under its own lock), so concurrent tools for one symbol wait only for
+    the family they share. Returned values are shared: treat them as read-only.
+    """
+
+    def __init__(self, symbol: str, cache: "SnapshotCache"):
+        self.symbol = symbol
+        self._cache = cache
+        self._ticker = None
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._info_fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._family_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, family: str) -> Any:
+        """A data family (a yf.Ticker attribute listed in FAMILY_TTLS), fetched if missing or expired."""
+        if family not in self._cache.ttls:
+            raise KeyError(f"Unknown data family: {family}")
+        with self._family_lock(family):
+            if family in self._values and self._cache.clock() < self._expires[family]:
+                self._cache._count("hits")
+                return self._values[family]
+            value = self._fetch(family)
+            self._values[family] = value
+            self._expires[family] = self._expiry(family)
+            return value
+
+    def info(self, *groups: str) -> Dict[str, Any]:
+        """`.info`, downloaded again if any of the named INFO_TTLS groups is older than its TTL."""
+        unknown = [g for g in groups if g not in self._cache.info_ttls]
+        if unknown:
+            raise KeyError(f"Unknown info groups: {', '.join(unknown)}")
+        ttl = min((self._cache.info_ttls[g] for g in groups), default=max(self._cache.info_ttls.values()))
+        with self._family_lock("info"):
+            if self._info_fetched_at is not None and self._cache.clock() - self._info_fetched_at < ttl:
+                self._cache._count("hits")
+                return self._values["info"]
+            self._values["info"] = self._fetch("info") or {}
+            self._info_fetched_at = self._cache.clock()
+            return self._values["info"]
+
+    def _family_lock(self, family: str) -> threading.Lock:
+        with self._lock:
+            return self._family_locks.setdefault(family, threading.Lock())
+
+    def _fetch(self, family: str) -> Any:
+        with self._lock:
+            # yf.Ticker memoizes what it has downloaded, so a refresh needs a new one
+            if self._ticker is None or family in self._values:
+                self._ticker = self._cache.ticker_factory(self.symbol)
+            ticker = self._ticker
+        print(f"Snapshot fetch: {self.symbol} {family}")
+        self._cache._count("fetches")
+        return getattr(ticker, family)
+
+    def _expiry(self, family: str) -> float:
+        ttl = self._cache.ttls[family]
+        now = self._cache.clock()
+        if ttl != QUARTERLY:
+            return now + ttl
+        today = pd.Timestamp(now, unit="s", tz="UTC")
+        # Only a calendar that is already cached; expiry is no reason to download one
+        earnings = next_earnings_date(self._values.get("calendar"), today)
+        until = earnings + pd.Timedelta(days=1) if earnings is not None else next_quarter_start(today)
+        return until.timestamp()
+
+
+class SnapshotCache:
+    """TickerSnapshots by symbol, shared by every StockService tool, evicted LRU beyond `max_symbols`."""
+
+    def __init__(
+        self,
+        max_symbols: int = 256,
+        ticker_factory: Callable[[str], Any] = _yfinance_ticker,
+        ttls: Optional[Dict[str, Any]] = None,
+        info_ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_symbols = max_symbols
+        self.ticker_factory = ticker_factory
+        self.ttls = {**FAMILY_TTLS, **(ttls or {})}
+        self.info_ttls = {**INFO_TTLS, **(info_ttls or {})}
+        self.clock = clock
+        self._snapshots: "OrderedDict[str, TickerSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "fetches": 0, "evictions": 0}
+
+    def get(self, symbol: str) -> TickerSnapshot:
+        symbol = symbol.strip().upper()
+        with self._lock:
+            snapshot = self._snapshots.get(symbol)
+            if snapshot is None:
+                snapshot = self._snapshots[symbol] = TickerSnapshot(symbol, self)
+                while len(self._snapshots) > self.max_symbols:
+                    self._snapshots.popitem(last=False)
+                    self._counts["evictions"] += 1
+            self._snapshots.move_to_end(symbol)
+            return snapshot
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(symbol.strip().upper(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"symbols": len(self._snapshots), "max_symbols": self.max_symbols, **self._counts}
+
+
+def default_snapshots() -> SnapshotCache:
+    return SnapshotCache(
+        max_symbols=int(os.environ.get("A2UI_SNAPSHOT_MAX_SYMBOLS", "256")),
+        info_ttls={"price": float(os.environ.get("A2UI_SNAPSHOT_PRICE_TTL", "60"))},
+    )
@@ -0,0 +1,67 @@
+"""
+Payload size of the chart surfaces in the plain and columnar (chart-columns) formats.
+
+- plain:    every series repeats {"time": "YYYY-MM-DD", "value": ...} per point
+- columnar: one shared time axis, a value array per series, values rounded to
+            A2UI_CHART_PRECISION decimals (4 for dividends)
+- @N:       downsampled to an N point budget (LTTB)
+
+    python bench/bench_chart_payload.py
+"""
+import sys
+import os
+import gzip
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.schemas.encoding import encode_response
+from app.services.chart_series import build_chart_series, build_chart_columns
+from app.services.agent import StockService
+from app.services import surfaces
+
+
+def history(bars: int) -> pd.DataFrame:
+    index = pd.bdate_range(end="2026-06-30", periods=bars, tz="America/New_York")
+    # Like yfinance's adjusted closes: full float precision
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, bars))
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def chart_surfaces(bars: int, max_points=None):
+    hist = history(bars)
+    close = hist["Close"]
+    specs = [("Price", "Close", "#0F9D58")]
+    specs += [(name, close.rolling(window=w).mean(), color) for name, w, color in StockService.CHART_OVERLAYS]
+    plain = surfaces.stock_chart(symbol="AAPL", series=build_chart_series(hist, specs, max_points=max_points), current_price="$1.00", uid="u1")
+    packed = surfaces.stock_chart(symbol="AAPL", series=build_chart_columns(hist, specs, max_points=max_points), current_price="$1.00",
+                                  uid="u1", columns=True)
+    return plain, packed
+
+
+def dividend_surfaces():
+    index = pd.date_range(end="2026-06-30", periods=20, freq="QS-FEB", tz="America/New_York")
+    divs = pd.Series(np.linspace(0.2, 0.26, 20), index=index, name="Dividends")
+    points = [{"time": d.strftime("%Y-%m-%d"), "value": float(v)} for d, v in divs.items()]
+    plain = surfaces.stock_dividends(symbol="AAPL", dividends=points, dividend_yield="0.45%", uid="u1")
+    packed = surfaces.stock_dividends(symbol="AAPL", dividend_yield="0.45%", uid="u1", columns=True,
+                                      dividends=build_chart_columns(divs.to_frame(), [("Dividends", "Dividends", "#4285F4")], precision=4))
+    return plain, packed
+
+
+def report(label: str, plain, packed):
+    plain, packed = encode_response(plain), encode_response(packed)
+    print(f"{label:<22} plain {len(plain):>8,} B (gzip {len(gzip.compress(plain)):>7,})"
+          f"  columnar {len(packed):>7,} B (gzip {len(gzip.compress(packed)):>6,})"
+          f"  {len(plain) / len(packed):.1f}x")
+
+
+def main():
+    os.environ.setdefault("A2UI_STRICT_SURFACES", "0")
+    report("stock_chart 1y", *chart_surfaces(252))
+    report("stock_chart 5y", *chart_surfaces(5 * 252))
+    report("stock_chart 5y @400", *chart_surfaces(5 * 252, max_points=400))
+    report("stock_dividends (20)", *dividend_surfaces())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for stock chart series construction.
+
+Compares the previous `hist.iterrows()` loop (strftime + pd.isna per row per series)
+with the column-wise `build_chart_series` on synthetic daily histories the size of
+yfinance's 1y, 5y and max periods (price + MA20/60/120).
+
+    python bench/bench_chart_series.py
+"""
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.chart_series import build_chart_series
+
+SIZES = {"1y": 252, "5y": 1260, "max": 252 * 45}
+OVERLAYS = [("MA20", 20, "#FF6B6B"), ("MA60", 60, "#4ECDC4"), ("MA120", 120, "#FFE66D")]
+REPEAT = 5
+
+
+def make_history(bars: int) -> pd.DataFrame:
+    index = pd.bdate_range(end="2026-06-30", periods=bars, tz="America/New_York")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, bars))
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def iterrows_series(hist: pd.DataFrame):
+    hist = hist.copy()
+    for name, window, _ in OVERLAYS:
+        hist[name] = hist['Close'].rolling(window=window).mean()
+    series = {"Price": []}
+    series.update({name: [] for name, _, _ in OVERLAYS})
+    for index, row in hist.iterrows():
+        time_str = index.strftime("%Y-%m-%d")
+        series["Price"].append({"time": time_str, "value": float(row['Close'])})
+        for name, _, _ in OVERLAYS:
+            if not pd.isna(row[name]):
+                series[name].append({"time": time_str, "value": float(row[name])})
+    return series
+
+
+def vectorized_series(hist: pd.DataFrame):
+    close = hist['Close']
+    specs = [("Price", "Close", "#0F9D58")]
+    specs += [(name, close.rolling(window=window).mean(), color) for name, window, color in OVERLAYS]
+    return build_chart_series(hist, specs)
+
+
+def best_of(func, hist) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(hist)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'period':<8}{'bars':>7}{'iterrows ms':>14}{'vectorized ms':>16}{'speedup':>10}")
+    for period, bars in SIZES.items():
+        hist = make_history(bars)
+        assert [s["data"] for s in vectorized_series(hist)] == list(iterrows_series(hist).values())
+        slow = best_of(iterrows_series, hist)
+        fast = best_of(vectorized_series, hist)
+        print(f"{period:<8}{bars:>7}{slow * 1000:>14.1f}{fast * 1000:>16.2f}{slow / fast:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Comparing N stocks: N stacked get_stock_chart surfaces versus one compare_stocks surface.
+
+- bytes:    encoded surfaces, columnar chart format (what renderer.js asks for) and gzip
+- requests: upstream history downloads on a cold cache
+- ms:       server time with the downloads stubbed out
+
+    python bench/bench_compare.py
+"""
+import sys
+import os
+import gzip
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("A2UI_STRICT_SURFACES", "0")
+from app.schemas.encoding import encode_response
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "GOOGL", "META", "NFLX"]
+
+
+def history(seed: int) -> pd.DataFrame:
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=300, tz="America/New_York")
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, len(index))))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=index)
+
+
+HISTORY = {symbol: history(i) for i, symbol in enumerate(SYMBOLS)}
+
+
+def service():
+    calls = []
+
+    def fetch(symbol, **kwargs):
+        calls.append(symbol)
+        return HISTORY[symbol]
+
+    def bulk_fetch(symbols, **kwargs):
+        calls.append(tuple(symbols))
+        return {symbol: HISTORY[symbol] for symbol in symbols}
+
+    stock = StockService()
+    stock.price_history = PriceHistoryCache(fetcher=fetch, bulk_fetcher=bulk_fetch)
+    return stock, calls
+
+
+def measure(run):
+    stock, calls = service()
+    start = time.perf_counter()
+    responses = run(stock)
+    elapsed = (time.perf_counter() - start) * 1000
+    body = b"".join(encode_response(res) for res, _ in responses)
+    return len(body), len(gzip.compress(body)), len(calls), elapsed
+
+
+def main():
+    print(f"{'symbols':>7}  {'stacked charts':>36}  {'compare_stocks':>36}")
+    for n in (2, 4, 8):
+        symbols = SYMBOLS[:n]
+        stacked = measure(lambda s: [s.get_stock_chart(symbol, columns=True) for symbol in symbols])
+        compared = measure(lambda s: [s.compare_stocks(symbols, columns=True)])
+        row = [f"{b:>7,} B (gz {g:>6,}) {c:>2} req {ms:5.1f} ms" for b, g, c, ms in (stacked, compared)]
+        print(f"{n:>7}  {row[0]}  {row[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Batch indicator evaluation: one vectorized pass over a (symbols x bars) panel
+versus the per-symbol pandas loop it replaces.
+
+    python bench/bench_indicators.py [symbols] [bars]
+"""
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services import indicators as ind
+
+
+def panel(symbols: int, bars: int):
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, (symbols, bars)), axis=1)
+    spread = rng.uniform(0.1, 2, (symbols, bars))
+    return {
+        "Open": close + rng.normal(0, 0.5, (symbols, bars)),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, (symbols, bars)).astype(float),
+    }
+
+
+def pandas_indicators(f: pd.DataFrame):
+    c, h, l, v = f["Close"], f["High"], f["Low"], f["Volume"]
+    out = [c.rolling(w).mean() for w in (20, 60, 120)]
+    delta = c.diff()
+    out.append(100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean()))
+    line = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    out.append(line - line.ewm(span=9, adjust=False).mean())
+    middle, std = c.rolling(20).mean(), c.rolling(20).std(ddof=0)
+    out += [middle + 2 * std, middle - 2 * std]
+    tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+    out.append(tr.ewm(alpha=1 / 14, adjust=False).mean())
+    k = 100 * (c - l.rolling(14).min()) / (h.rolling(14).max() - l.rolling(14).min())
+    out += [k, k.rolling(3).mean()]
+    out.append((np.sign(c.diff()).fillna(0) * v).cumsum())
+    out.append(((h + l + c) / 3 * v).rolling(20).sum() / v.rolling(20).sum())
+    return out
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 1260  # ~5y of daily bars
+    data = panel(symbols, bars)
+
+    start = time.perf_counter()
+    ind.compute(data)
+    batch = time.perf_counter() - start
+
+    # The per-symbol loop is slow; time a subset and scale
+    subset = min(symbols, 50)
+    index = pd.bdate_range(end="2026-06-30", periods=bars)
+    frames = [pd.DataFrame({col: values[row] for col, values in data.items()}, index=index) for row in range(subset)]
+    start = time.perf_counter()
+    for frame in frames:
+        pandas_indicators(frame)
+    loop = (time.perf_counter() - start) * symbols / subset
+
+    total = symbols * bars
+    print(f"{symbols} symbols x {bars} bars, {len(ind.INDICATORS)} indicators")
+    print(f"vectorized panel   {batch * 1000:8.1f} ms  {total / batch / 1e6:6.1f} M symbol-bars/s")
+    print(f"pandas per symbol  {loop * 1000:8.1f} ms  {total / loop / 1e6:6.1f} M symbol-bars/s  (scaled from {subset})")
+    print(f"speedup            {loop / batch:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Screening a large universe: the old per-symbol route (one download and one pandas
+indicator pass per stock, as get_technical_indicators does) versus screen().
+
+- downloads are stubbed with a fixed latency per request (LATENCY seconds)
+- per-symbol: sequential requests, pandas rolling/ewm per symbol
+- screen():  bulk requests of FETCH_BATCH symbols, FETCH_CONCURRENCY at once,
+             features on one (symbols, bars) panel
+
+    python bench/bench_screener.py [symbols] [latency]
+"""
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services import screener
+from app.services.price_history import PriceHistoryCache
+
+SYMBOLS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+LATENCY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+
+
+def histories(count: int, days: int = 130):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=days, tz="America/New_York")
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        frames[f"S{i:04d}"] = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                                            "Volume": rng.uniform(1e6, 2e6, days)}, index=index)
+    return frames
+
+
+HISTORY = histories(SYMBOLS)
+
+
+def fetch(symbol, **kwargs):
+    time.sleep(LATENCY)
+    return HISTORY[symbol]
+
+
+def bulk_fetch(symbols, **kwargs):
+    time.sleep(LATENCY)
+    return {symbol: HISTORY[symbol] for symbol in symbols}
+
+
+def per_symbol(symbols):
+    """RSI < 40 and MA20 > MA60, one symbol at a time with pandas."""
+    cache = PriceHistoryCache(fetcher=fetch)
+    matches = []
+    for symbol in symbols:
+        close = cache.get(symbol, period=screener.SCREEN_PERIOD)["Close"]
+        delta = close.diff()
+        rsi = 100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean())
+        exp1, exp2 = close.ewm(span=12, adjust=False).mean(), close.ewm(span=26, adjust=False).mean()
+        (exp1 - exp2).ewm(span=9, adjust=False).mean()
+        if rsi.iloc[-1] < 40 and close.rolling(20).mean().iloc[-1] > close.rolling(60).mean().iloc[-1]:
+            matches.append(symbol)
+    return len(matches)
+
+
+def screened(symbols):
+    cache = PriceHistoryCache(fetcher=fetch, bulk_fetcher=bulk_fetch)
+    result = screener.screen(cache, symbols, screener.parse_conditions(["rsi < 40", "ma20 > ma60"]), budget=600)
+    return result["matched"]
+
+
+def timed(label, run):
+    start = time.perf_counter()
+    matched = run()
+    print(f"{label:<28} {time.perf_counter() - start:7.2f} s  ({matched} matched)")
+
+
+def main():
+    symbols = list(HISTORY)
+    print(f"{SYMBOLS} symbols, {LATENCY * 1000:.0f} ms per upstream request")
+    if SYMBOLS <= 200 or LATENCY == 0:
+        timed("per symbol (sequential)", lambda: per_symbol(symbols))
+    else:
+        print(f"{'per symbol (sequential)':<28} ~{SYMBOLS * LATENCY:6.0f} s  (downloads alone, not run)")
+    timed("screen()", lambda: screened(symbols))
+    # Compute alone, no latency
+    names, panel = screener.tail_panel(HISTORY)
+    start = time.perf_counter()
+    screener.features(panel)
+    print(f"{'features() on the panel':<28} {(time.perf_counter() - start) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
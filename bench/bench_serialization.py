@@ -0,0 +1,68 @@
+"""
+Serialization benchmark for a one-year stock chart surface (price + MA20/60/120).
+
+- strict:  the previous path - validated Pydantic tree, then model_dump + json.dumps
+           for SSE and a second validation through FastAPI's response_model for /chat
+- trusted: surface built as plain dicts and encoded once to bytes (cached)
+
+    python bench/bench_serialization.py
+"""
+import sys
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.schemas.models import A2UIResponse
+from app.schemas.encoding import encode_response, JSON_ENCODER
+from app.services.chart_series import build_chart_series
+from app.services import surfaces
+
+REPEAT = 20
+
+
+def chart_series(bars: int = 252):
+    index = pd.bdate_range(end="2026-06-30", periods=bars)
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(0, 1, bars)), index=index)
+    hist = pd.DataFrame({"Close": close})
+    specs = [("Price", "Close", "#0F9D58")]
+    specs += [(f"MA{w}", close.rolling(w).mean(), "#FF6B6B") for w in (20, 60, 120)]
+    return build_chart_series(hist, specs)
+
+
+def strict_path(series):
+    os.environ["A2UI_STRICT_SURFACES"] = "1"
+    res = surfaces.stock_chart(symbol="AAPL", series=series, current_price="$1.00")
+    sse = json.dumps(res.model_dump())
+    body = A2UIResponse.model_validate(res.model_dump()).model_dump_json()
+    return sse, body
+
+
+def trusted_path(series):
+    os.environ["A2UI_STRICT_SURFACES"] = "0"
+    res = surfaces.stock_chart(symbol="AAPL", series=series, current_price="$1.00")
+    return encode_response(res), encode_response(res)
+
+
+def best_of(func, series) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(series)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    series = chart_series()
+    points = sum(len(s["data"]) for s in series)
+    strict = best_of(strict_path, series)
+    trusted = best_of(trusted_path, series)
+    print(f"1y chart, {points} points, encoder={JSON_ENCODER}")
+    print(f"strict  (build + validate + dump x2): {strict * 1000:.2f} ms")
+    print(f"trusted (build + encode once):        {trusted * 1000:.2f} ms  ({strict / trusted:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,341 @@ const userInput = document.getElementById('user-input');
 const sendBtn = document.getElementById('send-btn');
 // const uiModeToggle = document.getElementById('ui-mode-toggle');
 
-// State for data bindings (very simple global store)
-let dataStore = {};
+// Each rendered surface keeps its data bindings and its nodes and chart handles by component id
+// ({id, store, bindings, components, elements, charts, render}), so an update patches the widget
+// it belongs to and only touches the components that changed
+function bindPath(surface, path, id, apply) {
+    if (!surface.bindings.has(path)) surface.bindings.set(path, new Map());
+    surface.bindings.get(path).set(id, apply);
+}
+
+function applyDataModel(surface, update) {
+    if (!update || !update.contents) return;
+    update.contents.forEach(content => {
+        if (content && content.valueMap) {
+            content.valueMap.forEach(kv => {
+                const path = `/${content.key}/${kv.key}`;
+                surface.store[path] = kv.valueString;
+                (surface.bindings.get(path) || new Map()).forEach(apply => apply(kv.valueString));
+            });
+        }
+    });
+}
+
+// An update without beginRendering patches its surface in place: bound values change,
+// components sent again replace the elements with the same ids and removed ones are dropped
+function applyA2UIUpdate(surface, a2uiData) {
+    applyDataModel(surface, a2uiData.dataModelUpdate);
+    const update = a2uiData.surfaceUpdate || {};
+    (update.removed || []).forEach(id => {
+        const el = surface.elements.get(id);
+        if (el) el.remove();
+        if (surface.charts.has(id)) disposeChart(surface.charts.get(id));
+        surface.charts.delete(id);
+        surface.elements.delete(id);
+        surface.components.delete(id);
+        surface.bindings.forEach(byId => byId.delete(id));
+    });
+    const compList = update.components || [];
+    compList.forEach(c => surface.components.set(c.id, c.component));
+    // Added components appear through their (changed) parent. A rebuilt parent reuses the
+    // nodes of its unchanged children, so only changed components are built again.
+    surface.dirty = new Set(compList.map(c => c.id));
+    surface.fresh = new Set();
+    compList.forEach(c => {
+        const old = surface.elements.get(c.id);
+        if (!old || !surface.render || surface.fresh.has(c.id)) return;
+        const el = surface.render(c.id);
+        if (el && el !== old) old.replaceWith(el);
+    });
+    surface.dirty = null;
+    surface.fresh = null;
+}
+
+// Re-run the tool call behind the widget; the server answers with a diff against what it shows
+async function refreshSurface(surface, btn) {
+    btn.disabled = true;
+    try {
+        const response = await fetch('/surface/refresh', {
+            method: 'POST',
+            headers: a2uiHeaders(true),
+            body: JSON.stringify({ tool_name: surface.tool.name, tool_args: surface.tool.args, surface_root: surface.root })
+        });
+        const data = await response.json();
+        if (data.kind === 'a2ui' && !data.data.beginRendering) {
+            applyA2UIUpdate(surface, data.data);
+        } else if (data.kind === 'a2ui') {
+            renderSurface(surface, data.data);
+        } else {
+            addMessage(data.text || 'Error', false);
+        }
+    } catch (e) {
+        console.error(e);
+        addMessage('Error connecting to server', false);
+    } finally {
+        btn.disabled = false;
+    }
+}
+
+// Optional A2UI features this renderer decodes; servers fall back to the plain format without them
+const A2UI_CAPABILITIES = 'chart-columns';
+
+// Identifies this page to the server, which keeps the last surface it sent us to diff refreshes against
+const A2UI_SESSION = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Math.random()).slice(2);
+
+function a2uiHeaders(isUiMode) {
+    return {
+        'Content-Type': 'application/json',
+        'X-Client-A2UI': isUiMode ? 'true' : 'false',
+        'X-A2UI-Capabilities': A2UI_CAPABILITIES,
+        'X-A2UI-Chart-Points': chartPointBudget(),
+        'X-A2UI-Session': A2UI_SESSION
+    };
+}
+
+// About one chart point per pixel of the message area; the server clamps and rounds it
+function chartPointBudget() {
+    return String(Math.round(messagesDiv.clientWidth || 600));
+}
+
+// Expand a columnar Chart ({time | start+step, series: [{name, color, values}]}) into per-point series
+function decodeChartColumns(columns) {
+    let times = columns.time;
+    const series = columns.series || [];
+    if (!times) {
+        const length = Math.max(0, ...series.map(s => s.values.length));
+        const start = Date.parse(columns.start + 'T00:00:00Z');
+        const stepMs = (columns.step || 1) * 86400000;
+        times = Array.from({ length }, (_, i) => new Date(start + i * stepMs).toISOString().slice(0, 10));
+    }
+    return series.map(s => {
+        const data = [];
+        s.values.forEach((value, i) => {
+            if (value !== null) data.push({ time: times[i], value: value });
+        });
+        return { name: s.name, color: s.color, data: data };
+    });
+}
+
+// Scandinavian color palette for charts
+const scandinavianColors = {
+    primary: '#4A5D4A',    // Sage green
+    secondary: '#8B7355',  // Warm taupe
+    tertiary: '#5D6B7A',   // Slate blue-gray
+    accent: '#8B5A5A',     // Muted terracotta
+};
+
+// A Chart component's lines ({color, data}); the first is drawn as an area
+function chartLines(chartComp) {
+    // Support both single data and multiple series (plain or columnar)
+    const seriesData = chartComp.columns ? decodeChartColumns(chartComp.columns) : (chartComp.series || []);
+    if (seriesData.length > 0) {
+        const colors = [scandinavianColors.secondary, scandinavianColors.tertiary, scandinavianColors.accent];
+        return seriesData.map((series, index) => ({
+            color: series.color || (index === 0 ? scandinavianColors.primary : colors[(index - 1) % colors.length]),
+            data: series.data || []
+        }));
+    }
+    // Legacy: single data array
+    return [{ color: chartComp.color || scandinavianColors.primary, data: chartComp.data || [] }];
+}
+
+function addChartSeries(chart, line, index) {
+    if (index === 0) {
+        // First series (Price) as Area chart
+        return chart.addSeries(LightweightCharts.AreaSeries, {
+            lineColor: line.color,
+            topColor: line.color + '40',
+            bottomColor: line.color + '08',
+            lineWidth: 2,
+        });
+    }
+    // Moving averages as Line charts
+    return chart.addSeries(LightweightCharts.LineSeries, { color: line.color, lineWidth: 1 });
+}
+
+function samePoint(a, b) {
+    return a.time === b.time && a.value === b.value;
+}
+
+// Load a line into its series: setData, or update() for the last bar and bars appended after it
+function setLineData(series, oldData, data) {
+    const tail = oldData.length - 1;
+    const appended = tail >= 0 && data.length >= oldData.length && oldData.slice(0, tail).every((p, i) => samePoint(p, data[i]));
+    if (!appended || data[tail].time !== oldData[tail].time) {
+        series.setData(data);
+        return;
+    }
+    for (let i = tail; i < data.length; i++) {
+        if (i > tail || !samePoint(oldData[i], data[i])) series.update(data[i]);
+    }
+}
+
+// A chart handle ({chart, series, lines, observer, comp}); the chart is created once the container is laid out
+function createChart(container, chartComp) {
+    const handle = { chart: null, series: [], lines: [], observer: null, comp: chartComp, disposed: false };
+    setTimeout(() => {
+        if (handle.disposed) return;
+        try {
+            if (typeof LightweightCharts === 'undefined') {
+                console.error("LightweightCharts is not loaded.");
+                return;
+            }
+            const lines = chartLines(handle.comp);
+            // Check if we have enough data
+            if (!lines.some(line => line.data.length >= 2)) return;
+            // Intraday bars carry UNIX seconds instead of dates
+            const firstPoint = (lines.find(line => line.data.length) || { data: [] }).data[0];
+            const intraday = firstPoint !== undefined && typeof firstPoint.time === 'number';
+            // Use fallback width if clientWidth is 0 (DOM not yet laid out)
+            handle.chart = LightweightCharts.createChart(container, {
+                width: container.clientWidth || 500,
+                height: 300,
+                timeScale: { timeVisible: intraday, secondsVisible: false },
+                layout: {
+                    background: { type: 'solid', color: 'transparent' },
+                    textColor: '#4A4A4A',
+                    fontFamily: "'Inter', -apple-system, BlinkMacSystemFont, sans-serif",
+                },
+                grid: {
+                    vertLines: { color: '#E8E6E3' },
+                    horzLines: { color: '#E8E6E3' },
+                },
+            });
+            handle.lines = [];
+            lines.forEach((line, index) => {
+                const series = addChartSeries(handle.chart, line, index);
+                series.setData(line.data);
+                handle.series.push(series);
+                handle.lines.push(line);
+            });
+            handle.chart.timeScale().fitContent();
+
+            // Handle resize
+            handle.observer = new ResizeObserver(entries => {
+                if (entries.length === 0 || !entries[0].contentRect) return;
+                const newRect = entries[0].contentRect;
+                if (newRect.width > 0) {
+                    handle.chart.applyOptions({ width: newRect.width });
+                }
+            });
+            handle.observer.observe(container);
+        } catch (e) { console.error("Chart Error", e); }
+    }, 100);
+    return handle;
+}
+
+// Give an existing chart a changed Chart component's data, series by series
+function updateChart(handle, chartComp) {
+    handle.comp = chartComp;
+    if (!handle.chart) return; // Not created yet: it will draw handle.comp
+    const lines = chartLines(chartComp);
+    lines.forEach((line, index) => {
+        if (index >= handle.series.length) {
+            handle.series.push(addChartSeries(handle.chart, line, index));
+            handle.lines.push({ color: line.color, data: [] });
+        }
+        if (line.color !== handle.lines[index].color) {
+            handle.series[index].applyOptions(index === 0 ? { lineColor: line.color, topColor: line.color + '40', bottomColor: line.color + '08' } : { color: line.color });
+        }
+        setLineData(handle.series[index], handle.lines[index].data, line.data);
+    });
+    handle.series.splice(lines.length).forEach(series => handle.chart.removeSeries(series));
+    handle.lines = lines;
+    handle.chart.timeScale().fitContent();
+}
+
+function disposeChart(handle) {
+    handle.disposed = true;
+    if (handle.observer) handle.observer.disconnect();
+    if (handle.chart) handle.chart.remove();
+}
+
+// Markdown of a streamed answer, rendered as it arrives. Blocks that ended (a blank line outside a
+// code fence, followed by a line that cannot continue the block) are parsed once and frozen; only the
+// trailing open block is parsed again, at most once per animation frame, so total work grows linearly
+// with the answer. Link reference definitions apply to the whole text, so an answer with one is parsed
+// again as a whole when it finishes.
+function createMarkdownStream(container) {
+    const frozen = document.createElement('div');
+    const tail = document.createElement('div');
+    container.appendChild(frozen);
+    container.appendChild(tail);
+    let done = '';         // Frozen text
+    let pending = '';      // Text after the last frozen block
+    let scanned = 0;       // pending[0:scanned] is split into lines already
+    let boundary = 0;      // pending[0:boundary] is whole blocks, ready to freeze
+    let blank = -1;        // End of the last blank line, while the next line may still continue the block
+    let inFence = false;
+    let references = false;
+    let frame = null;
+
+    // After a blank line, an indented line or a list item (loose lists, a numbered list going on) continues
+    const continues = line => /^\s/.test(line) || /^([-*+]|\d{1,9}[.)])(\s|$)/.test(line);
+
+    const scan = () => {
+        let end;
+        while ((end = pending.indexOf('\n', scanned)) !== -1) {
+            const line = pending.slice(scanned, end);
+            scanned = end + 1;
+            if (!inFence && line.trim() === '') {
+                blank = scanned;
+                continue;
+            }
+            if (blank !== -1) {
+                if (!continues(line)) boundary = blank;
+                blank = -1;
+            }
+            if (/^ {0,3}(```|~~~)/.test(line)) {
+                inFence = !inFence;
+            } else if (!inFence && /^ {0,3}\[[^\]]+\]:/.test(line)) {
+                references = true;
+            }
+        }
+    };
+
+    const render = () => {
+        frame = null;
+        if (typeof marked === 'undefined') {
+            tail.textContent = pending;
+            return;
+        }
+        if (boundary > 0) {
+            frozen.insertAdjacentHTML('beforeend', marked.parse(pending.slice(0, boundary)));
+            done += pending.slice(0, boundary);
+            pending = pending.slice(boundary);
+            scanned -= boundary;
+            if (blank !== -1) blank -= boundary;
+            boundary = 0;
+        }
+        tail.innerHTML = pending ? marked.parse(pending) : '';
+        messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    };
+
+    return {
+        append(text) {
+            pending += text;
+            if (typeof marked !== 'undefined') scan();
+            if (frame === null) frame = requestAnimationFrame(render);
+        },
+        // Render whatever is still waiting for a frame
+        finish() {
+            if (frame !== null) {
+                cancelAnimationFrame(frame);
+                render();
+            }
+            if (references && typeof marked !== 'undefined') {
+                // Reference links may be used in blocks frozen before their definition arrived
+                done += pending;
+                pending = '';
+                scanned = 0;
+                references = false;
+                frozen.innerHTML = marked.parse(done);
+                tail.innerHTML = '';
+            }
+        }
+    };
+}
 
 function addMessage(text, isUser) {
     const div = document.createElement('div');
@@ -14,7 +347,8 @@ function addMessage(text, isUser) {
     messagesDiv.scrollTop = messagesDiv.scrollHeight;
 }
 
-function addA2UIWidget(a2uiData) {
+// `tool` ({name, args}) is the tool call that produced the surface; widgets with one get a refresh button
+function addA2UIWidget(a2uiData, tool) {
     console.log('addA2UIWidget called with:', a2uiData);
     try {
         const div = document.createElement('div');
@@ -33,17 +367,42 @@ function addA2UIWidget(a2uiData) {
         surfaceDiv.style.boxShadow = '0 2px 8px rgba(0, 0, 0, 0.06)';
         surfaceDiv.style.minHeight = '60px';
 
-        // Process Data Model Updates
-        if (a2uiData.dataModelUpdate && a2uiData.dataModelUpdate.contents) {
-            a2uiData.dataModelUpdate.contents.forEach(content => {
-                if (content && content.valueMap) {
-                    content.valueMap.forEach(kv => {
-                        const path = `/${content.key}/${kv.key}`;
-                        dataStore[path] = kv.valueString;
-                    });
-                }
-            });
+        const surface = { container: surfaceDiv, tool: tool };
+        renderSurface(surface, a2uiData);
+
+        if (tool) {
+            const refreshBtn = document.createElement('button');
+            refreshBtn.className = 'a2ui-refresh';
+            refreshBtn.title = 'Refresh';
+            refreshBtn.innerText = '↻';
+            refreshBtn.onclick = () => refreshSurface(surface, refreshBtn);
+            div.appendChild(refreshBtn);
         }
+        div.appendChild(surfaceDiv);
+        messagesDiv.appendChild(div);
+        console.log('Widget added to messages');
+        messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    } catch (e) {
+        console.error("UI Render Error:", e);
+        addMessage(`[System Error: Failed to render UI components. ${e.message}]`, false);
+    }
+}
+
+// (Re)draw a surface from a complete A2UI response into its container
+function renderSurface(surface, a2uiData) {
+    try {
+        const surfaceDiv = surface.container;
+        if (surface.charts) surface.charts.forEach(disposeChart);
+        surfaceDiv.innerHTML = '';
+        Object.assign(surface, {
+            id: (a2uiData.beginRendering || a2uiData.surfaceUpdate || a2uiData.dataModelUpdate || {}).surfaceId,
+            root: a2uiData.beginRendering ? a2uiData.beginRendering.root : null,
+            store: {}, bindings: new Map(), components: new Map(), elements: new Map(), charts: new Map(),
+            render: null, dirty: null, fresh: null
+        });
+
+        // Process Data Model Updates
+        applyDataModel(surface, a2uiData.dataModelUpdate);
 
         // Render Components
         console.log('Checking surfaceUpdate:', a2uiData.surfaceUpdate);
@@ -56,9 +415,10 @@ function addA2UIWidget(a2uiData) {
             // Safety check for components array
             const compList = a2uiData.surfaceUpdate.components || [];
             console.log('Component list:', compList);
-            const components = new Map(compList.map(c => [c.id, c.component]));
+            compList.forEach(c => surface.components.set(c.id, c.component));
+            const components = surface.components;
 
-            const renderComponent = (id) => {
+            const buildComponent = (id) => {
                 const comp = components.get(id);
                 console.log('Rendering component:', id, comp);
                 if (!comp) {
@@ -70,7 +430,8 @@ function addA2UIWidget(a2uiData) {
                     const hint = comp.Text.usageHint || 'body';
                     // Safe access to literalString
                     const textObj = comp.Text.text || {};
-                    const text = textObj.literalString || '';
+                    const bound = textObj.path && surface.store[textObj.path] !== undefined;
+                    const text = bound ? surface.store[textObj.path] : (textObj.literalString || '');
                     const url = comp.Text.url ? comp.Text.url.literalString : null;
 
                     let el;
@@ -134,6 +495,11 @@ function addA2UIWidget(a2uiData) {
                         el.innerText = text;
                     }
 
+                    if (textObj.path) {
+                        bindPath(surface, textObj.path, id, value => {
+                            el.innerText = hint === 'news-date' ? '• ' + value : value;
+                        });
+                    }
 
                     // Check for custom style override
                     if (comp.Text.style && typeof comp.Text.style === 'object') {
@@ -152,10 +518,11 @@ function addA2UIWidget(a2uiData) {
                     const input = document.createElement('input');
                     input.type = 'text';
                     const path = comp.TextField.text ? comp.TextField.text.path : '';
-                    input.value = dataStore[path] || '';
+                    input.value = surface.store[path] || '';
                     input.oninput = (e) => {
-                        dataStore[path] = e.target.value;
+                        surface.store[path] = e.target.value;
                     };
+                    bindPath(surface, path, id, value => { input.value = value; });
                     el.appendChild(input);
                     return el;
                 } else if (comp.Button) {
@@ -172,7 +539,7 @@ function addA2UIWidget(a2uiData) {
                     }
 
                     btn.onclick = () => {
-                        handleAction(comp.Button.action);
+                        handleAction(comp.Button.action, surface, btn);
                     };
                     return btn;
                 } else if (comp.Column) {
@@ -259,105 +626,37 @@ function addA2UIWidget(a2uiData) {
                     iframe.setAttribute('referrerpolicy', 'no-referrer-when-downgrade');
                     return iframe;
                 } else if (comp.Chart) {
+                    // An existing chart keeps its instance and only gets the new data
+                    const handle = surface.charts.get(id);
+                    if (handle && surface.elements.has(id)) {
+                        updateChart(handle, comp.Chart);
+                        return surface.elements.get(id);
+                    }
+
                     const chartContainer = document.createElement('div');
                     chartContainer.className = 'a2ui-chart';
                     chartContainer.style.width = '100%';
                     chartContainer.style.height = '300px';
                     chartContainer.style.padding = '12px 0';
-
-                    // Support both single data and multiple series
-                    const singleData = comp.Chart.data || [];
-                    const seriesData = comp.Chart.series || [];
-
-                    // Check if we have enough data
-                    const hasValidData = singleData.length >= 2 || seriesData.some(s => s.data && s.data.length >= 2);
-                    if (!hasValidData) return chartContainer;
-
-                    setTimeout(() => {
-                        try {
-                            if (typeof LightweightCharts === 'undefined') {
-                                console.error("LightweightCharts is not loaded.");
-                                return;
-                            }
-                            // Use fallback width if clientWidth is 0 (DOM not yet laid out)
-                            const chartWidth = chartContainer.clientWidth || 500;
-                            const chart = LightweightCharts.createChart(chartContainer, {
-                                width: chartWidth,
-                                height: 300,
-                                layout: {
-                                    background: { type: 'solid', color: 'transparent' },
-                                    textColor: '#4A4A4A',
-                                    fontFamily: "'Inter', -apple-system, BlinkMacSystemFont, sans-serif",
-                                },
-                                grid: {
-                                    vertLines: { color: '#E8E6E3' },
-                                    horzLines: { color: '#E8E6E3' },
-                                },
-                            });
-
-                            // Scandinavian color palette for charts
-                            const scandinavianColors = {
-                                primary: '#4A5D4A',    // Sage green
-                                secondary: '#8B7355',  // Warm taupe
-                                tertiary: '#5D6B7A',   // Slate blue-gray
-                                accent: '#8B5A5A',     // Muted terracotta
-                            };
-
-                            // If we have series array, render multiple lines
-                            if (seriesData.length > 0) {
-                                seriesData.forEach((series, index) => {
-                                    if (!series.data || series.data.length < 2) return;
-
-                                    if (index === 0) {
-                                        // First series (Price) as Area chart
-                                        const color = series.color || scandinavianColors.primary;
-                                        const areaSeries = chart.addSeries(LightweightCharts.AreaSeries, {
-                                            lineColor: color,
-                                            topColor: color + '40',
-                                            bottomColor: color + '08',
-                                            lineWidth: 2,
-                                        });
-                                        areaSeries.setData(series.data);
-                                    } else {
-                                        // Moving averages as Line charts
-                                        const colors = [scandinavianColors.secondary, scandinavianColors.tertiary, scandinavianColors.accent];
-                                        const lineSeries = chart.addSeries(LightweightCharts.LineSeries, {
-                                            color: series.color || colors[(index - 1) % colors.length],
-                                            lineWidth: 1,
-                                        });
-                                        lineSeries.setData(series.data);
-                                    }
-                                });
-                            } else {
-                                // Legacy: single data array
-                                const color = comp.Chart.color || scandinavianColors.primary;
-                                const areaSeries = chart.addSeries(LightweightCharts.AreaSeries, {
-                                    lineColor: color,
-                                    topColor: color + '40',
-                                    bottomColor: color + '08',
-                                });
-                                areaSeries.setData(singleData);
-                            }
-
-                            chart.timeScale().fitContent();
-
-                            // Handle resize
-                            const resizeObserver = new ResizeObserver(entries => {
-                                if (entries.length === 0 || !entries[0].contentRect) return;
-                                const newRect = entries[0].contentRect;
-                                if (newRect.width > 0) {
-                                    chart.applyOptions({ width: newRect.width });
-                                }
-                            });
-                            resizeObserver.observe(chartContainer);
-                        } catch (e) { console.error("Chart Error", e); }
-                    }, 100);
-
+                    surface.charts.set(id, createChart(chartContainer, comp.Chart));
                     return chartContainer;
                 }
                 return null;
             };
 
+            // Remember each element by id so a later update can replace it
+            const renderComponent = (id) => {
+                // While patching, unchanged components keep their nodes (moved into a rebuilt parent)
+                if (surface.dirty && !surface.dirty.has(id) && surface.elements.has(id)) {
+                    return surface.elements.get(id);
+                }
+                const el = buildComponent(id);
+                if (el) surface.elements.set(id, el);
+                if (surface.fresh) surface.fresh.add(id);
+                return el;
+            };
+            surface.render = renderComponent;
+
             const rootEl = renderComponent(rootId);
             console.log('Root element created:', rootEl);
             if (rootEl) {
@@ -370,43 +669,39 @@ function addA2UIWidget(a2uiData) {
             console.warn('Missing surfaceUpdate or beginRendering, adding raw data display');
             surfaceDiv.innerText = JSON.stringify(a2uiData, null, 2);
         }
-
-        div.appendChild(surfaceDiv);
-        messagesDiv.appendChild(div);
-        console.log('Widget added to messages');
-        messagesDiv.scrollTop = messagesDiv.scrollHeight;
     } catch (e) {
         console.error("UI Render Error:", e);
         addMessage(`[System Error: Failed to render UI components. ${e.message}]`, false);
     }
 }
 
-async function handleAction(action) {
+async function handleAction(action, surface, btn) {
     if (action.name === 'calculateLoan') {
-        // Collect context values from store
+        // Collect context values from the surface's store (or sent as-is)
         const context = {};
         action.context.forEach(ctx => {
             if (ctx.value.path) {
-                context[ctx.key] = dataStore[ctx.value.path];
+                context[ctx.key] = surface.store[ctx.value.path];
+            } else if (ctx.value.literalString !== undefined) {
+                context[ctx.key] = ctx.value.literalString;
             }
         });
 
-        addMessage(`Recalculating...`, true);
-
+        if (btn) btn.disabled = true;
         try {
             const response = await fetch('/chat', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-Client-A2UI': 'true' // Always true for button clicks in UI
-                },
+                headers: a2uiHeaders(true), // Always UI mode for button clicks
                 body: JSON.stringify({
                     text: 'recalculate', // Dummy text
-                    client_context: context
+                    client_context: context,
+                    surface_id: surface.id
                 })
             });
             const data = await response.json();
-            if (data.kind === 'a2ui') {
+            if (data.kind === 'a2ui' && !data.data.beginRendering) {
+                applyA2UIUpdate(surface, data.data);
+            } else if (data.kind === 'a2ui') {
                 addA2UIWidget(data.data);
             } else {
                 addMessage(data.text || 'Error', false);
@@ -414,6 +709,8 @@ async function handleAction(action) {
         } catch (e) {
             console.error(e);
             addMessage('Error connecting to server', false);
+        } finally {
+            if (btn) btn.disabled = false;
         }
     }
 }
@@ -431,18 +728,14 @@ async function sendMessage() {
         // Use streaming endpoint
         const response = await fetch('/chat/stream', {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-Client-A2UI': isUiMode ? 'true' : 'false'
-            },
+            headers: a2uiHeaders(isUiMode),
             body: JSON.stringify({ text: text })
         });
 
         const reader = response.body.getReader();
         const decoder = new TextDecoder();
 
-        let streamingTextDiv = null; // For accumulating streaming text
-        let accumulatedText = '';
+        let markdownStream = null; // Streaming text, rendered incrementally
 
         let buffer = '';
         let currentEvent = null;
@@ -477,24 +770,18 @@ async function sendMessage() {
                         const data = JSON.parse(dataStr);
 
                         if (currentEvent === 'a2ui') {
-                            addA2UIWidget(data.data);
+                            addA2UIWidget(data.data, data.tool);
                         } else if (currentEvent === 'text') {
                             // Streaming text with Markdown rendering
-                            accumulatedText += data.text;
-                            if (!streamingTextDiv) {
-                                streamingTextDiv = document.createElement('div');
+                            if (!markdownStream) {
+                                const streamingTextDiv = document.createElement('div');
                                 streamingTextDiv.className = 'message agent-msg markdown-body';
                                 messagesDiv.appendChild(streamingTextDiv);
+                                markdownStream = createMarkdownStream(streamingTextDiv);
                             }
-                            // Use marked to render Markdown
-                            if (typeof marked !== 'undefined') {
-                                streamingTextDiv.innerHTML = marked.parse(accumulatedText);
-                            } else {
-                                streamingTextDiv.textContent = accumulatedText;
-                            }
-                            messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                            markdownStream.append(data.text);
                         } else if (currentEvent === 'done') {
-                            // Done
+                            if (markdownStream) markdownStream.finish();
                         }
                     } catch (err) {
                         console.error('Error parsing SSE data:', err);
@@ -505,6 +792,8 @@ async function sendMessage() {
                 }
             }
         }
+        // The stream may end without a done event
+        if (markdownStream) markdownStream.finish();
     } catch (e) {
         console.error(e);
         addMessage('Error connecting to server', false);
@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+import numpy as np
+from fastapi.testclient import TestClient
+from app.services import amortization
+from app.services.agent import LoanCalculatorService
+from app.api.main import app
+
+client = TestClient(app)
+
+def loop_schedule(principal, annual_rate, years):
+    """Month-by-month reference: interest on the opening balance, the rest of the payment repays principal."""
+    r, months = annual_rate / 100 / 12, years * 12
+    payment = principal * (r * (1 + r) ** months) / ((1 + r) ** months - 1) if r > 0 else principal / months
+    balance, rows = principal, []
+    for _ in range(months):
+        interest = balance * r
+        balance -= payment - interest
+        rows.append((interest, payment - interest, max(balance, 0.0)))
+    return payment, np.array(rows)
+
+def test_schedule_matches_a_monthly_loop():
+    for principal, rate, years in [(300_000, 6.5, 30), (25_000, 0.0, 5), (1_000_000, 12.0, 10)]:
+        payment, rows = loop_schedule(principal, rate, years)
+        schedule = amortization.schedule(principal, rate, years)
+        assert np.isclose(amortization.monthly_payment(principal, rate, years), payment)
+        assert np.allclose(schedule["interest"][0], rows[:, 0])
+        assert np.allclose(schedule["principal"][0], rows[:, 1])
+        assert np.allclose(schedule["balance"][0], rows[:, 2], atol=1e-6)
+        assert np.allclose(schedule["payment"][0], payment)
+        assert np.isclose(schedule["principal"][0].sum(), principal)
+    # Mixed terms: shorter loans are zero after their last payment
+    mixed = amortization.schedule([100_000, 100_000], [5, 5], [10, 30])
+    assert mixed["balance"].shape == (2, 360) and (mixed["payment"][0, 120:] == 0).all()
+    print("Schedule parity test passed")
+
+def test_grid_of_10000_scenarios_in_milliseconds():
+    principals = np.linspace(100_000, 1_000_000, 25)
+    rates = np.linspace(2, 8, 20)
+    years = np.arange(5, 41, 1.8)
+    amortization.grid(principals, rates, years)  # warm up
+    start = time.perf_counter()
+    result = amortization.grid(principals, rates, years)
+    elapsed = time.perf_counter() - start
+    print(f"10,000 scenarios: {elapsed * 1000:.2f} ms")
+    assert len(result["monthly"]) == 10_000 and elapsed < 0.05
+    i = 20 * 20 * 3 + 7 * 20 + 11  # principal 3, rate 7, years 11
+    expected = amortization.monthly_payment(principals[3], rates[7], years[11])
+    assert result["principal"][i] == principals[3] and result["rate"][i] == rates[7] and result["years"][i] == years[11]
+    assert np.isclose(result["monthly"][i], expected)
+    try:
+        amortization.grid(np.arange(1, 101), np.arange(1, 101), np.arange(1, 12))
+    except ValueError as e:
+        assert "max 100000" in str(e)
+    else:
+        raise AssertionError("oversized grid accepted")
+    print("Grid test passed")
+
+def test_batch_endpoint():
+    response = client.post("/loan/batch", json={"principal": [100000, 200000], "rate": [4, 5], "years": 30})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 4 and body["scenarios"]["rate"] == [4, 5, 4, 5]
+    assert body["scenarios"]["monthly"][1] == round(float(amortization.monthly_payment(100000, 5, 30)), 2)
+    assert "schedules" not in body
+
+    response = client.post("/loan/batch", json={"principal": 12000, "rate": 0, "years": [1, 2], "schedule": True})
+    schedules = response.json()["schedules"]
+    assert [len(s["balance"]) for s in schedules] == [12, 24] and schedules[0]["balance"][-1] == 0
+
+    # Invalid inputs are rejected before any array is allocated
+    assert client.post("/loan/batch", json={"principal": 0, "rate": 5, "years": 30}).status_code == 422
+    huge = {"principal": list(range(1000, 101000, 1000)), "rate": 5, "years": 1e6, "schedule": True}
+    assert client.post("/loan/batch", json=huge).status_code == 422
+    not_finite = '{"principal": 1000, "rate": Infinity, "years": 30}'
+    assert client.post("/loan/batch", content=not_finite, headers={"Content-Type": "application/json"}).status_code == 422
+    too_many = {"principal": list(range(1000, 12000, 1000)), "rate": list(range(1, 11)), "years": 30, "schedule": True}
+    assert client.post("/loan/batch", json=too_many).status_code == 400
+    print("Batch endpoint test passed")
+
+def test_loan_result_charts_the_schedule():
+    result, _ = LoanCalculatorService().calculate_loan(300000, 6.5, 30, is_ui_mode=True, columns=True)
+    chart = next(c.component.Chart for c in result.data.surfaceUpdate.components if c.component.Chart)
+    assert [s.name for s in chart.columns.series] == ["Balance", "Principal Paid", "Interest Paid"]
+    # One point per year, from the full principal before the first payment
+    balance = chart.columns.series[0].values
+    assert len(balance) == 31 and balance[0] == 300000 and balance[-1] == 0
+    assert abs(chart.columns.series[1].values[-1] - 300000) < 0.01
+    text, _ = LoanCalculatorService().calculate_loan(300000, 6.5, 0)
+    assert "Cannot calculate" in text.text
+    # A term that would need a huge schedule is refused, in the UI (chart) path too
+    for years, rate in ((1e6, 6.5), (30, float("nan")), (30, 1e9)):
+        text, _ = LoanCalculatorService().calculate_loan(300000, rate, years, is_ui_mode=True, columns=True)
+        assert "Cannot calculate" in text.text, (years, rate)
+    try:
+        amortization.schedule(1000, 5, [10, 1e6])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("oversized schedule accepted")
+    print("Loan schedule chart test passed")
+
+if __name__ == "__main__":
+    test_schedule_matches_a_monthly_loop()
+    test_grid_of_10000_scenarios_in_milliseconds()
+    test_batch_endpoint()
+    test_loan_result_charts_the_schedule()
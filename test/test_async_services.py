@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import httpx
+from app.services import runtime
+from app.services.agent import RestaurantService, ShoppingService
+from app.schemas.models import A2UIResponse
+
+LOCAL_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<rss><channel>
+  <item>
+    <title>&lt;b&gt;강남&lt;/b&gt; 파스타</title><category>음식점&gt;양식</category>
+    <address>서울 강남구 역삼동 1</address><roadAddress>서울 강남구 테헤란로 1</roadAddress>
+    <mapx>1270276000</mapx><mapy>374979000</mapy>
+  </item>
+</channel></rss>"""
+
+SHOP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<rss><channel>
+  <item>
+    <title>나이키 운동화</title><link>https://example.com/1</link><image>https://example.com/1.jpg</image>
+    <mallName>테스트몰</mallName><lprice>89000</lprice>
+  </item>
+</channel></rss>"""
+
+def install_mock_client(requests_seen):
+    def handler(request):
+        requests_seen.append(request.url.path)
+        body = LOCAL_XML if request.url.path.endswith("local.xml") else SHOP_XML
+        return httpx.Response(200, text=body)
+    runtime._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+def test_async_services_share_client():
+    async def run():
+        requests_seen = []
+        install_mock_client(requests_seen)
+        client = runtime.get_http_client()
+        try:
+            res, context = await RestaurantService().find_places_async("강남", "파스타")
+            assert isinstance(res, A2UIResponse)
+            assert "강남 파스타" in context
+
+            res, context = await ShoppingService().search_products_async("운동화")
+            assert isinstance(res, A2UIResponse)
+            assert "나이키 운동화" in context
+
+            # Both services went through the one shared client
+            assert runtime.get_http_client() is client
+            assert requests_seen == ["/v1/search/local.xml", "/v1/search/shop.xml"]
+        finally:
+            await runtime.shutdown()
+
+    asyncio.run(run())
+    print("Async services test passed")
+
+def test_run_blocking_uses_worker_pool():
+    async def run():
+        loop_thread = threading.current_thread().name
+        worker_thread = await runtime.run_blocking(lambda: threading.current_thread().name)
+        await runtime.shutdown()
+        return loop_thread, worker_thread
+
+    loop_thread, worker_thread = asyncio.run(run())
+    assert worker_thread != loop_thread
+    assert worker_thread.startswith("a2ui-blocking")
+    print("Worker pool test passed")
+
+if __name__ == "__main__":
+    test_async_services_share_client()
+    test_run_blocking_uses_worker_pool()
@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+import numpy as np
+import pandas as pd
+from app.services import backtest as bt
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+from app.services.fast_router import FastRouter
+
+def daily_history(years=20, seed=11):
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=252 * years, tz="America/New_York")
+    close = 50 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0.0003, 0.015, len(index))))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=index)
+
+def loop_backtest(close, positions, initial=10_000.0):
+    """Bar-by-bar reference: yesterday's position earns today's return."""
+    equity, value, held = [], initial, 0.0
+    for t in range(len(close)):
+        if t > 0:
+            value *= 1 + held * (close[t] / close[t - 1] - 1)
+        equity.append(value)
+        held = positions[t]
+    return np.array(equity)
+
+def test_strategies_match_a_bar_by_bar_loop():
+    close = daily_history(5)["Close"]
+    series = close.reset_index(drop=True)
+    fast, slow = series.rolling(20).mean(), series.rolling(60).mean()
+    ma_positions = (fast > slow).astype(float).to_numpy()
+    delta = series.diff()
+    rsi = 100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean())
+    rsi_positions, holding = [], 0.0
+    for value in rsi:
+        if value < 30:
+            holding = 1.0
+        elif value > 70:
+            holding = 0.0
+        rsi_positions.append(holding)
+
+    for strategy, params, positions in [
+        ("ma_cross", {"fast": 20, "slow": 60}, ma_positions),
+        ("rsi", {"low": 30, "high": 70}, np.array(rsi_positions)),
+    ]:
+        result = bt.backtest(close.to_numpy(), strategy, 5, params)
+        assert np.allclose(result["equity"][0], loop_backtest(close.to_numpy(), positions)), strategy
+        assert np.allclose(result["equity"][1], 10_000 * close.to_numpy() / close.iloc[0]), strategy
+    print("Loop parity test passed")
+
+def test_summary_statistics():
+    close = daily_history(10)["Close"].to_numpy()
+    result = bt.backtest(close, "buy_and_hold", 10)
+    stats = result["stats"]
+    returns = pd.Series(close).pct_change().fillna(0)
+    assert np.isclose(stats["total_return"][1], close[-1] / close[0] - 1)
+    assert np.isclose(stats["cagr"][1], (close[-1] / close[0]) ** (1 / 10) - 1)
+    assert np.isclose(stats["max_drawdown"][1], (pd.Series(close) / pd.Series(close).cummax() - 1).min())
+    assert np.isclose(stats["sharpe"][1], returns.mean() / returns.std() * np.sqrt(252))
+    assert stats["trades"][1] == 1 and stats["exposure"][1] == (len(close) - 1) / len(close)
+    # A signal on the last bar has nothing left to trade on
+    flat = bt.run(close, np.r_[np.zeros(len(close) - 1), 1.0])
+    assert (flat["equity"] == 10_000).all()
+    print("Summary statistics test passed")
+
+def test_backtest_tool_twenty_years_under_100ms():
+    frame = daily_history(20)
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=lambda symbol, **kwargs: frame)
+    try:
+        service = StockService()
+        service.backtest_strategy("AAPL", period="max")  # warm the cache
+        start = time.perf_counter()
+        result, context = service.backtest_strategy("AAPL", "ma_cross", period="max", fast=50, slow=200, columns=True)
+        elapsed = time.perf_counter() - start
+        invalid, _ = service.backtest_strategy("AAPL", "ma_cross", fast=60, slow=20)
+    finally:
+        StockService.price_history = original
+    print(f"20y backtest tool: {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.1
+    chart = next(c.component.Chart for c in result.data.surfaceUpdate.components if c.component.Chart)
+    assert [s.name for s in chart.columns.series] == ["MA50/MA200 Crossover", "Buy & Hold"]
+    texts = [c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text]
+    assert "Max Drawdown" in texts and "Sharpe" in texts
+    assert "MA50/MA200 Crossover: $10,000 -> $" in context
+    assert "fast < slow" in invalid.text
+    print("Backtest tool test passed")
+
+def test_fast_router_golden_cross():
+    route = FastRouter().route("테슬라 골든크로스 백테스트")
+    assert [(c["tool_name"], c["tool_args"]) for c in route["calls"]] == [("backtest_strategy", {"symbol": "TSLA", "strategy": "ma_cross"})]
+    print("Fast router backtest test passed")
+
+if __name__ == "__main__":
+    test_strategies_match_a_bar_by_bar_loop()
+    test_summary_statistics()
+    test_backtest_tool_twenty_years_under_100ms()
+    test_fast_router_golden_cross()
@@ -0,0 +1,192 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+import numpy as np
+import pandas as pd
+from app.services.chart_series import (
+    build_chart_series, build_chart_columns, columns_to_series, series_points, format_times, lttb_indices, point_budget,
+    DEFAULT_CHART_POINTS, MAX_CHART_POINTS
+)
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+from app.services import surfaces
+from app.schemas.encoding import encode_response
+
+def make_history(bars=300):
+    index = pd.bdate_range(end="2026-06-30", periods=bars, tz="America/New_York")
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, bars))
+    return pd.DataFrame({"Close": close}, index=index)
+
+def iterrows_reference(hist):
+    # The previous row-by-row implementation
+    hist = hist.copy()
+    for window in (20, 60, 120):
+        hist[f"MA{window}"] = hist["Close"].rolling(window=window).mean()
+    prices, ma20, ma60, ma120 = [], [], [], []
+    for index, row in hist.iterrows():
+        time_str = index.strftime("%Y-%m-%d")
+        prices.append({"time": time_str, "value": float(row["Close"])})
+        if not pd.isna(row["MA20"]):
+            ma20.append({"time": time_str, "value": float(row["MA20"])})
+        if not pd.isna(row["MA60"]):
+            ma60.append({"time": time_str, "value": float(row["MA60"])})
+        if not pd.isna(row["MA120"]):
+            ma120.append({"time": time_str, "value": float(row["MA120"])})
+    return [prices, ma20, ma60, ma120]
+
+def test_matches_iterrows_output():
+    hist = make_history()
+    close = hist["Close"]
+    specs = [("Price", "Close", "#0F9D58")]
+    specs += [(name, close.rolling(window=w).mean(), color) for name, w, color in StockService.CHART_OVERLAYS]
+    series = build_chart_series(hist, specs)
+    assert [s["data"] for s in series] == iterrows_reference(hist)
+    assert [len(s["data"]) for s in series] == [300, 281, 241, 181]
+    assert all(type(p["value"]) is float for s in series for p in s["data"])
+    print("iterrows parity test passed")
+
+def test_extra_overlay_and_nan_masking():
+    hist = make_history(5)
+    overlay = np.array([np.nan, 1.0, np.nan, 2.0, 3.0])
+    series = build_chart_series(hist, [("Band", overlay, "#000000")])
+    assert [p["value"] for p in series[0]["data"]] == [1.0, 2.0, 3.0]
+    times = format_times(hist.index, "%m/%d")
+    assert series_points(times, [1, 2, 3, 4, 5])[0] == {"time": times[0], "value": 1.0}
+    try:
+        build_chart_series(hist, [("Short", [1.0], "#000000")])
+        assert False, "length mismatch should raise"
+    except ValueError:
+        pass
+    print("Overlay test passed")
+
+def test_stock_chart_renders_all_series():
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=lambda symbol, **kwargs: make_history())
+    try:
+        result, context = StockService().get_stock_chart("aapl")
+    finally:
+        StockService.price_history = original
+    components = {c.id: c.component for c in result.data.surfaceUpdate.components}
+    uid = result.data.beginRendering.root[:-len("_root")]
+    chart = components[f"{uid}_chart_viz"].Chart
+    assert [s.name for s in chart.series] == ["Price", "MA20", "MA60", "MA120"]
+    assert f"{uid}_legend_ma120" in components
+    assert "Current price" in context
+    print("Stock chart render test passed")
+
+def chart_specs(hist):
+    close = hist["Close"]
+    specs = [("Price", "Close", "#0F9D58")]
+    return specs + [(name, close.rolling(window=w).mean(), color) for name, w, color in StockService.CHART_OVERLAYS]
+
+def test_columns_decode_to_the_same_series():
+    hist = make_history()
+    series = build_chart_series(hist, chart_specs(hist))
+    columns = build_chart_columns(hist, chart_specs(hist), precision=None)
+    assert len(columns["time"]) == 300 and "start" not in columns
+    assert columns["series"][1]["values"][:19] == [None] * 19
+    assert columns_to_series(columns) == series
+    # Rounded values stay within half a unit of the last kept decimal
+    rounded = build_chart_columns(hist, chart_specs(hist), precision=2)
+    assert rounded["precision"] == 2
+    for full, short in zip(series, columns_to_series(rounded)):
+        assert [p["time"] for p in full["data"]] == [p["time"] for p in short["data"]]
+        assert max(abs(a["value"] - b["value"]) for a, b in zip(full["data"], short["data"])) <= 0.005
+    print("Columnar round-trip test passed")
+
+def test_evenly_spaced_axis_uses_start_and_step():
+    index = pd.date_range("2026-01-05", periods=10, freq="7D", tz="America/New_York")
+    hist = pd.DataFrame({"Close": np.arange(10.0)}, index=index)
+    columns = build_chart_columns(hist, [("Weekly", "Close", "#000000")])
+    assert (columns["start"], columns["step"]) == ("2026-01-05", 7) and "time" not in columns
+    assert columns_to_series(columns) == build_chart_series(hist, [("Weekly", "Close", "#000000")])
+    print("Start/step axis test passed")
+
+def test_columnar_surfaces_are_smaller():
+    hist = make_history(252)
+    plain = surfaces.stock_chart(symbol="AAPL", series=build_chart_series(hist, chart_specs(hist)), current_price="$1.00", uid="u1")
+    packed = surfaces.stock_chart(symbol="AAPL", series=build_chart_columns(hist, chart_specs(hist)), current_price="$1.00",
+                                  uid="u1", columns=True)
+    chart = {c.id: c.component for c in packed.data.surfaceUpdate.components}["u1_chart_viz"].Chart
+    assert chart.series is None and [s.name for s in chart.columns.series] == ["Price", "MA20", "MA60", "MA120"]
+    assert len(encode_response(packed)) * 2 < len(encode_response(plain))
+    divs = pd.DataFrame({"Dividends": [0.24, 0.25, 0.25, 0.26]}, index=pd.to_datetime(["2025-02-10", "2025-05-12", "2025-08-11", "2025-11-10"]))
+    packed = surfaces.stock_dividends(symbol="AAPL", dividends=build_chart_columns(divs, [("Dividends", "Dividends", "#4285F4")], precision=4),
+                                      dividend_yield="0.45%", uid="u1", columns=True)
+    chart = {c.id: c.component for c in packed.data.surfaceUpdate.components}["u1_chart_section"].Chart
+    assert chart.columns.series[0].values == [0.24, 0.25, 0.25, 0.26]
+    print("Columnar surface test passed")
+
+def test_stock_chart_columns_capability():
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=lambda symbol, **kwargs: make_history())
+    try:
+        result, _ = StockService().get_stock_chart("aapl", columns=True)
+    finally:
+        StockService.price_history = original
+    charts = [c.component.Chart for c in result.data.surfaceUpdate.components if c.component.Chart]
+    columns = charts[0].columns
+    assert columns.precision == 2 and columns.time
+    assert all(len(s.values) == len(columns.time) for s in columns.series)
+    print("Stock chart capability test passed")
+
+def test_lttb_keeps_extremes_and_endpoints():
+    y = np.sin(np.arange(2000) / 40) + np.random.default_rng(2).normal(0, 0.05, 2000)
+    y[777], y[1500] = 9.0, -9.0
+    kept = lttb_indices(y, 200)
+    assert len(kept) == 200 and kept[0] == 0 and kept[-1] == 1999
+    assert (np.diff(kept) > 0).all()
+    assert 777 in kept and 1500 in kept
+    assert (lttb_indices(y[:150], 200) == np.arange(150)).all()
+    print("LTTB extremes test passed")
+
+def test_downsampled_overlays_stay_aligned():
+    hist = make_history(1260)
+    series = build_chart_series(hist, chart_specs(hist), max_points=300)
+    assert 250 < len(series[0]["data"]) <= 300
+    full = {s["name"]: {p["time"]: p["value"] for p in s["data"]} for s in build_chart_series(hist, chart_specs(hist))}
+    price_times = [p["time"] for p in series[0]["data"]]
+    for s in series[1:]:
+        # Overlays only drop their warm-up bars and keep their exact values at the price line's dates
+        times = [p["time"] for p in s["data"]]
+        assert times == [t for t in price_times if t in full[s["name"]]]
+        assert all(full[s["name"]][p["time"]] == p["value"] for p in s["data"])
+    columns = build_chart_columns(hist, chart_specs(hist), precision=None, max_points=300)
+    assert columns_to_series(columns) == series
+    print("Downsampled alignment test passed")
+
+def test_every_line_keeps_its_own_extremes():
+    # A comparison: the second stock's spike and dip are not where the first one's are
+    index = pd.bdate_range(end="2026-06-30", periods=1500)
+    rng = np.random.default_rng(4)
+    first, second = np.cumsum(rng.normal(0, 1, 1500)), np.cumsum(rng.normal(0, 1, 1500))
+    first[700] = 300.0
+    second[321], second[1234] = 500.0, -500.0
+    hist = pd.DataFrame({"A": first, "B": second}, index=index)
+    series = build_chart_series(hist, [("A", "A", "#000"), ("B", "B", "#fff")], max_points=200)
+    assert len(series[0]["data"]) == len(series[1]["data"]) <= 200
+    values = [p["value"] for p in series[1]["data"]]
+    assert 500.0 in values and -500.0 in values
+    assert 300.0 in [p["value"] for p in series[0]["data"]]
+    print("Per-line extremes test passed")
+
+def test_point_budget_clamps_client_values():
+    assert point_budget() == point_budget("not a number") == DEFAULT_CHART_POINTS
+    assert point_budget("612") == point_budget(649.5) == 600
+    assert point_budget(10) == 50 and point_budget(10 ** 6) == MAX_CHART_POINTS
+    print("Point budget test passed")
+
+if __name__ == "__main__":
+    test_matches_iterrows_output()
+    test_extra_overlay_and_nan_masking()
+    test_stock_chart_renders_all_series()
+    test_columns_decode_to_the_same_series()
+    test_evenly_spaced_axis_uses_start_and_step()
+    test_columnar_surfaces_are_smaller()
+    test_stock_chart_columns_capability()
+    test_lttb_keeps_extremes_and_endpoints()
+    test_downsampled_overlays_stay_aligned()
+    test_every_line_keeps_its_own_extremes()
+    test_point_budget_clamps_client_values()
@@ -0,0 +1,124 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+import numpy as np
+import pandas as pd
+from app.services import indicators as ind
+from app.services.price_history import PriceHistoryCache, period_start
+from app.services.agent import StockService
+from app.services.fast_router import FastRouter
+from app.services.chart_series import shared_point_budget
+
+class FakeBulkUpstream:
+    """Synthetic daily bars per symbol (younger listings for later symbols), recording every bulk call."""
+
+    def __init__(self, symbols=("AAPL", "MSFT", "NVDA", "TSLA"), days=600):
+        tz = "America/New_York"
+        rng = np.random.default_rng(5)
+        market = rng.normal(0, 0.01, days)
+        index = pd.bdate_range(end=pd.Timestamp.now(tz=tz).normalize(), periods=days, tz=tz)
+        self.frames = {}
+        for i, symbol in enumerate(symbols):
+            # Shared market factor so the correlations are far from zero
+            steps = market * (1 + 0.3 * i) + rng.normal(0, 0.01, days)
+            close = 100 * np.exp(np.cumsum(steps))
+            frame = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                                  "Volume": np.full(days, 1e6)}, index=index)
+            self.frames[symbol] = frame.iloc[60 * i:]
+        self.calls = []
+
+    def __call__(self, symbols, period=None, start=None, interval="1d"):
+        self.calls.append({"symbols": list(symbols), "period": period, "start": start})
+        out = {}
+        for symbol in symbols:
+            frame = self.frames.get(symbol, pd.DataFrame())
+            if not frame.empty and period is not None:
+                frame = frame[frame.index >= period_start(period, pd.Timestamp.now(tz=frame.index.tz))]
+            if not frame.empty and start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+            out[symbol] = frame.copy()
+        return out
+
+def single_fetch_forbidden(symbol, **kwargs):
+    raise AssertionError(f"per-symbol fetch for {symbol}")
+
+def test_get_many_fetches_missing_symbols_in_one_request():
+    upstream = FakeBulkUpstream()
+    cache = PriceHistoryCache(fetcher=single_fetch_forbidden, bulk_fetcher=upstream)
+    frames = cache.get_many(["aapl", "MSFT", "AAPL", "nvda"], period="1y")
+    assert list(frames) == ["AAPL", "MSFT", "NVDA"]
+    assert len(upstream.calls) == 1 and upstream.calls[0]["symbols"] == ["AAPL", "MSFT", "NVDA"]
+    # Cached symbols are not fetched again; only the new one is
+    frames = cache.get_many(["AAPL", "TSLA"], period="6mo")
+    assert len(upstream.calls) == 2 and upstream.calls[1]["symbols"] == ["TSLA"]
+    # The single-symbol path reads the same entries
+    assert cache.get("NVDA", period="6mo").equals(cache.get_many(["NVDA"], period="6mo")["NVDA"])
+    # Stale entries are refreshed together from the earliest last bar
+    cache.stale_after = 0
+    before = cache.stats()["delta_fetches"]
+    cache.get_many(["AAPL", "MSFT"], period="1y")
+    assert upstream.calls[-1]["start"] is not None and upstream.calls[-1]["symbols"] == ["AAPL", "MSFT"]
+    assert cache.stats()["delta_fetches"] == before + 2
+    assert cache.stats()["bulk_fetches"] == 3
+    print("Bulk fetch test passed")
+
+def test_comparison_statistics_match_pandas():
+    upstream = FakeBulkUpstream()
+    frames = {s: f for s, f in upstream.frames.items()}
+    names, index, panel = ind.panel_from_frames(frames, columns=("Close",))
+    close = pd.DataFrame(panel["Close"].T, index=index, columns=names)
+    returns = ind.log_returns(panel["Close"])
+    expected_returns = np.log(close.ffill() / close.ffill().shift()).where(close.notna())
+    assert np.allclose(returns.T, expected_returns.to_numpy(), equal_nan=True)
+    assert np.allclose(ind.correlation(returns), expected_returns.corr().to_numpy(), atol=1e-12)
+    assert np.allclose(ind.volatility(returns), expected_returns.std().to_numpy() * np.sqrt(252) * 100)
+    performance = ind.normalized_returns(panel["Close"])
+    first = close.apply(lambda c: c.dropna().iloc[0])
+    assert np.allclose(performance[:, -1], (close.iloc[-1] / first - 1).to_numpy() * 100)
+    print("Comparison statistics test passed")
+
+def test_compare_stocks_tool():
+    upstream = FakeBulkUpstream()
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=single_fetch_forbidden, bulk_fetcher=upstream)
+    try:
+        service = StockService()
+        result, context = service.compare_stocks(["AAPL", "msft", "NVDA", "XXXX"], columns=True)
+        too_few, _ = service.compare_stocks(["AAPL"])
+    finally:
+        StockService.price_history = original
+    assert len(upstream.calls) == 1
+    chart = next(c.component.Chart for c in result.data.surfaceUpdate.components if c.component.Chart)
+    assert [s.name for s in chart.columns.series] == ["AAPL", "MSFT", "NVDA"]
+    # One shared time axis; every line starts at 0% on its own first bar
+    assert all(s.values[next(i for i, v in enumerate(s.values) if v is not None)] == 0 for s in chart.columns.series)
+    texts = [c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text]
+    assert any(t.startswith("● NVDA: ") for t in texts)
+    # Correlation matrix: a header line and one line per symbol, 1.00 on the diagonal
+    matrix = [t for t in texts if t.lstrip().startswith(("AAPL", "MSFT", "NVDA")) and "1.00" in t]
+    assert len(matrix) == 3 and matrix[1].split()[2] == "1.00"
+    # Lines of a comparison share the point budget: the total grows ~sqrt(lines)
+    assert [shared_point_budget(400, n) for n in (1, 2, 3, 8)] == [400, 400, 300, 200]
+    assert shared_point_budget(50, 8) == 50
+    assert "AAPL/MSFT" in context and "No data for XXXX" in context
+    assert "at least two" in too_few.text
+    print("compare_stocks tool test passed")
+
+def test_fast_router_sends_one_comparison():
+    router = FastRouter()
+    route = router.route("AAPL, MSFT, NVDA 비교해줘")
+    assert [(c["tool_name"], c["tool_args"]) for c in route["calls"]] == [
+        ("compare_stocks", {"symbols": ["AAPL", "MSFT", "NVDA"]})]
+    route = router.route("애플 vs 테슬라 뉴스")
+    assert [c["tool_name"] for c in route["calls"]] == ["compare_stocks", "get_stock_news", "get_stock_news"]
+    assert router.route("애플 비교") is None
+    print("Fast router compare test passed")
+
+if __name__ == "__main__":
+    test_get_many_fetches_missing_symbols_in_one_request()
+    test_comparison_statistics_match_pandas()
+    test_compare_stocks_tool()
+    test_fast_router_sends_one_comparison()
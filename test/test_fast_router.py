@@ -0,0 +1,109 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+from app.services.fast_router import FastRouter
+from app.services.llm_wrapper import LLMWrapper
+
+def calls_of(result):
+    return [(c["tool_name"], c["tool_args"]) for c in result["calls"]] if result else None
+
+def test_unambiguous_queries_are_routed():
+    router = FastRouter()
+    assert calls_of(router.route("TSLA chart")) == [("get_stock_chart", {"symbol": "TSLA"})]
+    assert calls_of(router.route("삼성전자 주가")) == [("get_stock_chart", {"symbol": "005930.KS"})]
+    assert calls_of(router.route("삼성전자주가 알려줘")) == [("get_stock_chart", {"symbol": "005930.KS"})]
+    assert calls_of(router.route("애플의 배당금은?")) == [("get_stock_dividends", {"symbol": "AAPL"})]
+    assert calls_of(router.route("Check RSI and MACD for Tesla")) == [("get_technical_indicators", {"symbol": "TSLA"})]
+    assert calls_of(router.route("강남 맛집")) == [("find_places", {"location": "강남", "keyword": "맛집"})]
+    assert calls_of(router.route("홍대에서 카페 추천해줘")) == [("find_places", {"location": "홍대", "keyword": "카페"})]
+    assert calls_of(router.route("Find hospitals in Gangnam")) == [("find_places", {"location": "Gangnam", "keyword": "hospitals"})]
+    assert calls_of(router.route("연희동 근처 카페")) == [("find_places", {"location": "연희동", "keyword": "카페"})]
+    assert calls_of(router.route("cafes near Mangwon")) == [("find_places", {"location": "Mangwon", "keyword": "cafes"})]
+    print("Fast routing test passed")
+
+def test_ambiguous_queries_fall_back():
+    router = FastRouter()
+    for query in [
+        "애플",                              # entity without intent
+        "애플 매장",                         # Apple Store, not the stock
+        "아이폰 가격",                       # product price belongs to the LLM
+        "애플 주가랑 강남 맛집",             # mixed domains
+        "Find Italian restaurants in Downtown",
+        "Book a table for 2 at Bella Italia",
+        "株価 AAPL",
+        "조용한 카페",                       # adjectives are not locations
+        "cheap restaurants",
+        "best cafe",
+        "24시 약국",
+    ]:
+        assert router.route(query) is None, query
+    stats = router.stats()
+    assert stats["queries"] == 11
+    assert stats["routed"] == 0
+    print("Fallback test passed")
+
+def test_time_words_set_the_period_or_fall_back():
+    router = FastRouter()
+    assert calls_of(router.route("TSLA 오늘 차트")) == [("get_stock_chart", {"symbol": "TSLA", "period": "1d"})]
+    assert calls_of(router.route("오늘 애플 주가")) == [("get_stock_chart", {"symbol": "AAPL", "period": "1d"})]
+    # No period for news: the time word is filler
+    assert calls_of(router.route("테슬라 오늘 뉴스")) == [("get_stock_news", {"symbol": "TSLA"})]
+    # "최근" could be any period, and a backtest has no 1d period: the LLM decides
+    assert router.route("TSLA 최근 차트") is None
+    assert router.route("current AAPL price") is None
+    assert router.route("테슬라 오늘 백테스트") is None
+    print("Time word test passed")
+
+def test_backtest_strategy_keywords():
+    router = FastRouter()
+    assert calls_of(router.route("삼성전자 RSI 백테스트")) == [("backtest_strategy", {"symbol": "005930.KS", "strategy": "rsi"})]
+    assert calls_of(router.route("테슬라 골든크로스 백테스트")) == [("backtest_strategy", {"symbol": "TSLA", "strategy": "ma_cross"})]
+    assert calls_of(router.route("AAPL backtest")) == [("backtest_strategy", {"symbol": "AAPL"})]
+    # A strategy the router cannot express, or two at once: the LLM decides
+    assert router.route("TSLA MACD 백테스트") is None
+    assert router.route("TSLA RSI 골든크로스 백테스트") is None
+    print("Backtest strategy test passed")
+
+def test_shadow_mode_reports_agreement():
+    router = FastRouter(mode="shadow")
+    fast = router.route("AAPL 차트")
+    router.record_shadow("AAPL 차트", fast, {"type": "multiple_tool_calls", "calls": [
+        {"tool_name": "get_stock_chart", "tool_args": {"symbol": "aapl"}}]})
+    fast = router.route("테슬라 뉴스")
+    router.record_shadow("테슬라 뉴스", fast, {"type": "multiple_tool_calls", "calls": [
+        {"tool_name": "get_stock_chart", "tool_args": {"symbol": "TSLA"}}]})
+    router.record_shadow("애플", router.route("애플"), {"type": "text", "text": "..."})
+    stats = router.stats()
+    assert stats["coverage"] == round(2 / 3, 4)
+    assert stats["shadow_compared"] == 2
+    assert stats["agreement"] == 0.5
+    assert stats["recent_disagreements"][0]["query"] == "테슬라 뉴스"
+    print("Shadow mode test passed")
+
+def test_process_query_skips_llm_when_confident():
+    llm = LLMWrapper()
+    llm_calls = []
+
+    async def fake_llm_route(text):
+        llm_calls.append(text)
+        return {"type": "text", "text": ""}
+
+    llm._process_query_with_llm = fake_llm_route
+
+    result = asyncio.run(llm.process_query("NVDA 차트 보여줘"))
+    assert calls_of(result) == [("get_stock_chart", {"symbol": "NVDA"})]
+    assert llm_calls == []
+
+    asyncio.run(llm.process_query("엔비디아 전망이 어떤가요"))
+    assert llm_calls == ["엔비디아 전망이 어떤가요"]
+    print("process_query fast path test passed")
+
+if __name__ == "__main__":
+    test_unambiguous_queries_are_routed()
+    test_ambiguous_queries_fall_back()
+    test_time_words_set_the_period_or_fall_back()
+    test_backtest_strategy_keywords()
+    test_shadow_mode_reports_agreement()
+    test_process_query_skips_llm_when_confident()
@@ -1,6 +1,7 @@
 
 import sys
 import os
+import asyncio
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.services.llm_wrapper import LLMWrapper
 
@@ -10,7 +11,7 @@ def test_fundamentals():
     print("\n--- Testing 'Get Company Fundamentals' ---")
     query = "Show me the financials and ownership of Apple"
     print(f"Query: {query}")
-    processed = llm.process_query(query)
+    processed = asyncio.run(llm.process_query(query))
     print(f"Result: {processed}")
     
     if processed['type'] == 'multiple_tool_calls':
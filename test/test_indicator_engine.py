@@ -0,0 +1,133 @@
+import sys
+import os
+import math
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+import numpy as np
+import pandas as pd
+from app.services.indicator_engine import IndicatorEngine, IndicatorEngines
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+
+def pandas_reference(close):
+    # The previous full recompute in get_technical_indicators
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rsi = 100 - (100 / (1 + gain / loss))
+    macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+    return rsi, macd_line, signal_line, macd_line - signal_line
+
+def random_closes(rng, bars):
+    kind = rng.integers(4)
+    if kind == 0:
+        steps = rng.normal(0, 1, bars)
+    elif kind == 1:
+        # Flat stretches: zero gains and losses, RSI undefined or pinned
+        steps = np.where(rng.random(bars) < 0.6, 0.0, rng.normal(0, 1, bars))
+    elif kind == 2:
+        # Only rising: no losses, RSI 100
+        steps = np.abs(rng.normal(0, 1, bars))
+    else:
+        steps = rng.standard_t(2, bars) * rng.uniform(0.01, 50)
+    index = pd.bdate_range("2020-01-01", periods=bars)
+    return pd.Series(rng.uniform(1, 1000) + np.cumsum(steps), index=index)
+
+def same(a, b):
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+def test_streaming_matches_full_recompute():
+    rng = np.random.default_rng(42)
+    for case in range(200):
+        close = random_closes(rng, int(rng.integers(1, 120)))
+        rsi, macd_line, signal_line, histogram = pandas_reference(close)
+        engine = IndicatorEngine()
+        for i, (time, value) in enumerate(close.items()):
+            # Sometimes the bar first arrives partial and is revised before the next one
+            if rng.random() < 0.3:
+                engine.update(time, value + rng.normal(0, 5))
+            engine.update(time, value)
+            latest = engine.snapshot()
+            assert same(latest["rsi"], rsi.iloc[i]), (case, i, latest["rsi"], rsi.iloc[i])
+            assert same(latest["macd"], macd_line.iloc[i]), (case, i)
+            assert same(latest["signal"], signal_line.iloc[i]), (case, i)
+            assert same(latest["histogram"], histogram.iloc[i]), (case, i)
+            if i > 0:
+                assert same(latest["previous_histogram"], histogram.iloc[i - 1]), (case, i)
+    print("Streaming/pandas property test passed")
+
+def test_sync_applies_only_new_bars_and_rebuilds_on_rewrite():
+    close = random_closes(np.random.default_rng(7), 300)
+    engines = IndicatorEngines()
+    engines.sync("aapl", close.iloc[:250])
+    assert engines.stats() == {"engines": 1, "rebuilds": 1, "bars_applied": 250}
+    # Two new bars: the last known bar is re-applied (it may have been partial) plus the new ones
+    latest = engines.sync("AAPL", close.iloc[:252])
+    assert engines.stats()["bars_applied"] == 253
+    rsi, macd_line, _, _ = pandas_reference(close.iloc[:252])
+    assert same(latest["rsi"], rsi.iloc[-1]) and same(latest["macd"], macd_line.iloc[-1])
+    # Adjusted prices rewritten (split/dividend): the engine is rebuilt from the given bars
+    adjusted = close.iloc[:253] * 0.5
+    latest = engines.sync("AAPL", adjusted)
+    assert engines.stats()["rebuilds"] == 2
+    rsi, macd_line, _, _ = pandas_reference(adjusted)
+    assert same(latest["rsi"], rsi.iloc[-1]) and same(latest["macd"], macd_line.iloc[-1])
+    print("Incremental sync test passed")
+
+def test_rolling_window_keeps_the_engine_origin():
+    # The tool passes a window that rolls forward a bar every day as a new bar arrives
+    close = random_closes(np.random.default_rng(11), 400)
+    engines = IndicatorEngines()
+    engines.sync("AAPL", close.iloc[:280])
+    for end in range(281, 300):
+        window = close.iloc[end - 252:end]
+        applied = engines.stats()["bars_applied"]
+        latest = engines.sync("AAPL", window)
+        # No rebuild: only the last known bar and the new one are applied
+        assert engines.stats()["rebuilds"] == 1, end
+        assert engines.stats()["bars_applied"] == applied + 2, end
+        # Values are those of a full recompute from the engine's first bar, not the window's
+        rsi, macd_line, signal_line, histogram = pandas_reference(close.iloc[:end])
+        assert same(latest["rsi"], rsi.iloc[-1]), end
+        assert same(latest["macd"], macd_line.iloc[-1]) and same(latest["signal"], signal_line.iloc[-1]), end
+        assert same(latest["histogram"], histogram.iloc[-1]) and same(latest["previous_histogram"], histogram.iloc[-2]), end
+    # A window that ends before the engine's last bar cannot be resumed: it is rebuilt from its first bar,
+    # and RSI is defined from the 14th bar
+    latest = engines.sync("AAPL", close.iloc[50:64])
+    assert engines.stats()["rebuilds"] == 2
+    assert same(latest["rsi"], pandas_reference(close.iloc[50:64])[0].iloc[-1]) and not math.isnan(latest["rsi"])
+    print("Rolling window test passed")
+
+def test_technical_indicators_tool_uses_engine():
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=400, tz="America/New_York")
+    close = random_closes(np.random.default_rng(3), 400).to_numpy()
+    frame = pd.DataFrame({"Close": close}, index=index)
+    original_history, original_engines = StockService.price_history, StockService.indicator_engines
+    StockService.price_history = PriceHistoryCache(fetcher=lambda symbol, **kwargs: frame)
+    StockService.indicator_engines = IndicatorEngines()
+    # The engine was built from an older, longer history: the tool resumes it rather than reseeding
+    StockService.indicator_engines.sync("AAPL", frame["Close"].iloc[:-1])
+    try:
+        result, context = StockService().get_technical_indicators("AAPL")
+        stats = StockService.indicator_engines.stats()
+    finally:
+        StockService.price_history, StockService.indicator_engines = original_history, original_engines
+    assert stats["rebuilds"] == 1
+    rsi, macd_line, signal_line, _ = pandas_reference(frame["Close"])
+    texts = [c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text]
+    assert f"Value: {rsi.iloc[-1]:.1f}" in texts
+    assert f"MACD is {macd_line.iloc[-1]:.2f}" in context
+    assert f"MACD: {macd_line.iloc[-1]:.2f} | Signal: {signal_line.iloc[-1]:.2f}" in texts
+    # Price and date still come from the displayed 6 months
+    assert f"Based on close price ${close[-1]:.2f} at {index[-1].strftime('%Y-%m-%d')}" in texts
+    print("Technical indicators tool test passed")
+
+if __name__ == "__main__":
+    test_streaming_matches_full_recompute()
+    test_sync_applies_only_new_bars_and_rebuilds_on_rewrite()
+    test_rolling_window_keeps_the_engine_origin()
+    test_technical_indicators_tool_uses_engine()
@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+import numpy as np
+import pandas as pd
+from app.services import indicators as ind
+from app.services.indicator_engine import IndicatorEngines
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+
+def make_frames(symbols=6, bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    end = pd.Timestamp.now(tz="America/New_York").normalize()
+    for i in range(symbols):
+        # Later listings: some symbols have fewer bars
+        n = bars - 37 * i
+        index = pd.bdate_range(end=end, periods=n, tz="America/New_York")
+        close = 50 + 10 * i + np.cumsum(rng.normal(0, 1, n))
+        spread = rng.uniform(0.1, 2, n)
+        frames[f"S{i}"] = pd.DataFrame({
+            "Open": close + rng.normal(0, 0.5, n), "High": close + spread, "Low": close - spread,
+            "Close": close, "Volume": rng.integers(1_000, 1_000_000, n).astype(float),
+        }, index=index)
+    return frames
+
+def pandas_reference(f):
+    c, h, l, v = f["Close"], f["High"], f["Low"], f["Volume"]
+    delta = c.diff()
+    rsi = 100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean())
+    macd = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    middle = c.rolling(20).mean()
+    std = c.rolling(20).std(ddof=0)
+    tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+    k = 100 * (c - l.rolling(14).min()) / (h.rolling(14).max() - l.rolling(14).min())
+    typical = (h + l + c) / 3
+    return {
+        "ma": {"ma20": c.rolling(20).mean(), "ma60": c.rolling(60).mean(), "ma120": c.rolling(120).mean()},
+        "rsi": {"rsi": rsi},
+        "macd": {"macd": macd, "signal": signal, "histogram": macd - signal},
+        "bollinger": {"middle": middle, "upper": middle + 2 * std, "lower": middle - 2 * std},
+        "atr": {"atr": tr.ewm(alpha=1 / 14, adjust=False).mean()},
+        "stochastic": {"k": k, "d": k.rolling(3).mean()},
+        "obv": {"obv": (np.sign(c.diff()).fillna(0) * v).cumsum()},
+        "vwap": {"vwap": (typical * v).rolling(20).sum() / v.rolling(20).sum()},
+    }
+
+def test_panel_matches_pandas_per_symbol():
+    frames = make_frames()
+    symbols, index, panel = ind.panel_from_frames(frames)
+    assert panel["Close"].shape == (6, 400)
+    results = ind.compute(panel)
+    assert set(results) == set(ind.INDICATORS)
+    for row, symbol in enumerate(symbols):
+        reference = pandas_reference(frames[symbol])
+        # The symbol's own bars sit at the end of the shared axis, after NaN padding
+        mask = index.isin(frames[symbol].index)
+        assert not np.isfinite(panel["Close"][row, ~mask]).any()
+        for name, outputs in reference.items():
+            for output, expected in outputs.items():
+                got = results[name][output][row, mask]
+                assert np.allclose(got, expected.to_numpy(), rtol=1e-9, atol=1e-7, equal_nan=True), (symbol, name, output)
+    print("Panel/pandas parity test passed")
+
+def test_one_dimensional_input_and_short_history():
+    close = np.array([1.0, 2.0, 3.0])
+    assert ind.sma(close, 2).shape == (1, 3)
+    assert np.isnan(ind.sma(close, 5)).all()
+    assert np.isnan(ind.bollinger(close, 20)[1]).all()
+    assert np.isnan(ind.rsi(close)).all()
+    assert ind.obv(close, [10, 10, 10]).tolist() == [[0, 10, 20]]
+    try:
+        ind.compute({"Close": ind._panel(close)}, ["fibonacci"])
+        assert False, "unknown indicator should raise"
+    except ValueError:
+        pass
+    print("Shape test passed")
+
+def test_wilder_rsi_differs_but_is_bounded():
+    close = make_frames(1)["S0"]["Close"].to_numpy()
+    simple, wilder = ind.rsi(close), ind.rsi(close, wilder=True)
+    assert np.isnan(wilder[0, :13]).all() and np.isfinite(wilder[0, 13:]).all()
+    assert ((wilder[0, 13:] > 0) & (wilder[0, 13:] < 100)).all()
+    assert not np.allclose(simple[0, 14:], wilder[0, 14:])
+    print("Wilder RSI test passed")
+
+def test_indicator_tool_options():
+    frame = make_frames(1)["S0"]
+    original_history, original_engines = StockService.price_history, StockService.indicator_engines
+    StockService.price_history = PriceHistoryCache(fetcher=lambda symbol, **kwargs: frame)
+    StockService.indicator_engines = IndicatorEngines()
+    try:
+        service = StockService()
+        result, context = service.get_technical_indicators("AAPL", indicators=["Bollinger", "atr", "rsi", "vwap"])
+        unknown, _ = service.get_technical_indicators("AAPL", indicators=["fibonacci"])
+    finally:
+        StockService.price_history, StockService.indicator_engines = original_history, original_engines
+    texts = [c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text]
+    assert "RSI (14-day)" in texts and "MACD (12, 26, 9)" in texts
+    assert [t for t in texts if t in ind.INDICATOR_TITLES.values()] == [
+        "RSI (14-day)", "MACD (12, 26, 9)", "Bollinger Bands (20, 2σ)", "ATR (14)", "VWAP (20)"]
+    assert "ATR (14): $" in context
+    assert "Unknown indicators" in unknown.text
+    print("Indicator tool options test passed")
+
+if __name__ == "__main__":
+    test_panel_matches_pandas_per_symbol()
+    test_one_dimensional_input_and_short_history()
+    test_wilder_rsi_differs_but_is_bounded()
+    test_indicator_tool_options()
@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+from fastapi.testclient import TestClient
+from app.api.main import app
+from app.services.agent import LoanCalculatorService
+
+client = TestClient(app)
+UI_HEADERS = {"X-Client-A2UI": "true", "X-A2UI-Capabilities": "chart-columns"}
+
+def first_surface():
+    result, _ = LoanCalculatorService().calculate_loan(300000, 6.5, 30, is_ui_mode=True, columns=True)
+    data = result.data
+    button = next(c.component.Button for c in data.surfaceUpdate.components if c.component.Button)
+    context = {ctx.key: ctx.value for ctx in button.action.context}
+    return data, context["uid"].literalString
+
+def test_texts_are_bound_to_the_loan_data_model():
+    data, uid = first_surface()
+    texts = {c.id: c.component.Text.text for c in data.surfaceUpdate.components if c.component.Text}
+    assert texts[f"{uid}_result_monthly"].path == "/loan/monthly"
+    loan = next(c for c in data.dataModelUpdate.contents if c.key == "loan")
+    values = {kv.key: kv.valueString for kv in loan.valueMap}
+    assert values["monthly"] == texts[f"{uid}_result_monthly"].literalString == "💳 Monthly Payment: $1,896.20"
+    print("Binding test passed")
+
+def test_recalculate_sends_only_the_changed_values():
+    data, uid = first_surface()
+    response = client.post("/chat", headers=UI_HEADERS, json={
+        "text": "recalculate", "surface_id": "loan_calculator",
+        "client_context": {"principal": "200000", "annualRate": "5", "years": "15", "uid": uid},
+    })
+    assert response.status_code == 200
+    update = response.json()["data"]
+    assert update["beginRendering"] is None
+    assert update["dataModelUpdate"]["surfaceId"] == "loan_calculator"
+    # Only the chart is re-sent, under the id the client already shows
+    assert [c["id"] for c in update["surfaceUpdate"]["components"]] == [f"{uid}_schedule_chart"]
+    values = {kv["key"]: kv["valueString"] for kv in update["dataModelUpdate"]["contents"][0]["valueMap"]}
+    assert values["monthly"] == "💳 Monthly Payment: $1,581.59" and values["years"] == "• Duration: 15 Years"
+
+    full = len(json.dumps(data.model_dump()))
+    patch = len(response.content)
+    print(f"Full surface {full} bytes, recalculation {patch} bytes")
+    assert patch < full / 3
+    print("Recalculate update test passed")
+
+def test_recalculate_without_a_surface():
+    # Older clients (or text mode) get a complete response, encoded like every other one
+    context = {"principal": "200000", "annualRate": "5", "years": "15"}
+    response = client.post("/chat", json={"text": "recalculate", "client_context": context})
+    assert response.status_code == 200 and response.json()["kind"] == "text"
+    assert "1581.59" in response.json()["text"]
+    response = client.post("/chat", headers=UI_HEADERS, json={"text": "recalculate", "client_context": context})
+    assert response.json()["data"]["beginRendering"] is not None
+    response = client.post("/chat", headers=UI_HEADERS, json={
+        "text": "recalculate", "surface_id": "loan_calculator", "client_context": {**context, "years": "0", "uid": "u1"}})
+    assert "Cannot calculate" in response.json()["text"]
+    print("Recalculate fallback test passed")
+
+if __name__ == "__main__":
+    test_texts_are_bound_to_the_loan_data_model()
+    test_recalculate_sends_only_the_changed_values()
+    test_recalculate_without_a_surface()
@@ -0,0 +1,214 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+import numpy as np
+import pandas as pd
+from app.services.price_history import PriceHistoryCache, period_start, resample_ohlcv, chart_range
+from app.services.agent import StockService
+from app.schemas.models import A2UIResponse
+
+class FakeUpstream:
+    """Synthetic daily bars up to `self.today`, recording every history() call."""
+
+    def __init__(self, days=3000):
+        tz = "America/New_York"
+        self.today = pd.Timestamp.now(tz=tz).normalize()
+        index = pd.bdate_range(end=self.today, periods=days, tz=tz)
+        close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, len(index)))
+        self.full = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                                  "Volume": np.arange(len(index), dtype=float)}, index=index)
+        self.calls = []
+
+    def __call__(self, symbol, period=None, start=None, interval="1d"):
+        self.calls.append({"symbol": symbol, "period": period, "start": start})
+        frame = self.full
+        if period is not None:
+            begin = period_start(period, pd.Timestamp.now(tz=frame.index.tz))
+            if begin is not None:
+                frame = frame[frame.index >= begin]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return frame.copy()
+
+class FakeMinuteUpstream:
+    """Synthetic 1m bars for the last 7 sessions (9:30-16:00)."""
+
+    def __init__(self, sessions=7):
+        tz = "America/New_York"
+        days = pd.bdate_range(end=pd.Timestamp.now(tz=tz).normalize().tz_localize(None), periods=sessions)
+        index = pd.DatetimeIndex(np.concatenate([
+            pd.date_range(day + pd.Timedelta(hours=9, minutes=30), periods=390, freq="1min") for day in days
+        ])).tz_localize(tz)
+        close = 100 + np.cumsum(np.random.default_rng(3).normal(0, 0.1, len(index)))
+        self.full = pd.DataFrame({"Open": close, "High": close + 0.2, "Low": close - 0.2, "Close": close,
+                                  "Volume": np.ones(len(index))}, index=index)
+        self.calls = []
+
+    def __call__(self, symbol, period=None, start=None, interval="1m"):
+        assert interval == "1m"
+        self.calls.append({"symbol": symbol, "period": period, "start": start})
+        frame = self.full
+        if period is not None:
+            frame = frame[frame.index >= period_start(period, pd.Timestamp.now(tz=frame.index.tz), frame.index)]
+        return frame.copy()
+
+def test_chart_and_indicators_share_one_download():
+    upstream = FakeUpstream()
+    cache = PriceHistoryCache(fetcher=upstream)
+    six_months = cache.get("aapl", period="6mo")
+    one_year = cache.get("AAPL", period="1y")
+    assert len(upstream.calls) == 1
+    assert upstream.calls[0]["period"] == "1y"
+    # The 6mo slice is the tail of the 1y window
+    assert one_year.index[-1] == six_months.index[-1]
+    assert len(six_months) < len(one_year)
+    assert six_months.equals(one_year[one_year.index >= six_months.index[0]])
+    assert cache.stats()["hits"] == 1
+    print("Shared download test passed")
+
+def test_returned_frames_are_copies():
+    cache = PriceHistoryCache(fetcher=FakeUpstream())
+    hist = cache.get("AAPL")
+    hist["MA20"] = hist["Close"].rolling(20).mean()
+    assert "MA20" not in cache.get("AAPL").columns
+    print("Copy isolation test passed")
+
+def test_stale_entry_fetches_only_new_bars():
+    upstream = FakeUpstream()
+    cache = PriceHistoryCache(fetcher=upstream, stale_after=0)
+    cache.get("AAPL")
+    # A new bar arrives upstream
+    new_day = upstream.full.index[-1] + pd.offsets.BDay(1)
+    upstream.full.loc[new_day] = upstream.full.iloc[-1] + 1
+    refreshed = cache.get("AAPL")
+    assert len(upstream.calls) == 2
+    assert upstream.calls[1]["period"] is None and upstream.calls[1]["start"] is not None
+    assert refreshed.index[-1] == new_day
+    assert not refreshed.index.has_duplicates
+    assert cache.stats()["delta_fetches"] == 1
+    print("Delta refresh test passed")
+
+def test_wider_request_refetches_wider_window():
+    upstream = FakeUpstream()
+    cache = PriceHistoryCache(fetcher=upstream)
+    cache.get("AAPL", period="1y")
+    cache.get("AAPL", period="5y")
+    cache.get("AAPL", period="6mo")
+    assert [c["period"] for c in upstream.calls] == ["1y", "5y"]
+    print("Wider window test passed")
+
+def test_memory_bound_evicts_lru():
+    upstream = FakeUpstream()
+    cache = PriceHistoryCache(fetcher=upstream)
+    cache.get("AAA")
+    cache.max_bytes = int(cache.stats()["bytes"] * 2.5)
+    cache.get("BBB")
+    cache.get("AAA")   # AAA is now most recent
+    cache.get("CCC")   # over budget: evicts BBB
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+    calls_before = len(upstream.calls)
+    cache.get("AAA")
+    assert len(upstream.calls) == calls_before
+    print("Memory bound test passed")
+
+def test_stock_service_tools_use_the_shared_cache():
+    upstream = FakeUpstream()
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=upstream)
+    try:
+        service = StockService()
+        chart, _ = service.get_stock_chart("AAPL")
+        indicators, context = service.get_technical_indicators("AAPL")
+    finally:
+        StockService.price_history = original
+    assert isinstance(chart, A2UIResponse)
+    assert isinstance(indicators, A2UIResponse)
+    assert "RSI" in context
+    assert len(upstream.calls) == 1
+    print("StockService integration test passed")
+
+def test_weekly_and_monthly_bars_are_rolled_up_once():
+    upstream = FakeUpstream()
+    cache = PriceHistoryCache(fetcher=upstream)
+    weekly = cache.get("AAPL", period="5y", interval="1wk")
+    monthly = cache.get("AAPL", period="max", interval="1mo")
+    again = cache.get("AAPL", period="5y", interval="1wk")
+    # Only daily bars are fetched; the weekly level is read from the pyramid, not re-aggregated
+    assert [(c["period"], c["start"]) for c in upstream.calls] == [("5y", None), ("max", None)]
+    entry = cache._entries[("AAPL", "1d")]
+    rolled = entry.rollups["1wk"]
+    cache.get("AAPL", period="2y", interval="1wk")
+    assert entry.rollups["1wk"] is rolled
+    assert again.equals(weekly)
+    # Every weekly bar matches pandas' own resampling of the daily bars it covers
+    daily = cache.get("AAPL", period="max")
+    reference = daily.tz_localize(None).resample("W").agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+    full_weekly = entry.rollups["1wk"]
+    assert np.allclose(full_weekly[["Open", "High", "Low", "Close", "Volume"]].to_numpy(), reference.to_numpy())
+    assert (full_weekly.index.dayofweek <= 4).all() and full_weekly.index.is_monotonic_increasing
+    assert len(monthly) == len(daily.index.tz_localize(None).to_period("M").unique())
+    print("Weekly/monthly rollup test passed")
+
+def test_intraday_pyramid_from_minute_bars():
+    upstream = FakeMinuteUpstream()
+    cache = PriceHistoryCache(fetcher=upstream)
+    one_day = cache.get("AAPL", period="1d", interval="5m")
+    five_days = cache.get("AAPL", period="5d", interval="1h")
+    assert [c["period"] for c in upstream.calls] == ["5d"]
+    # 1d is the last session, 5d the last five sessions (not calendar days)
+    assert len(one_day) == 78 and one_day.index[0].strftime("%H:%M") == "09:30"
+    assert len(five_days.index.normalize().unique()) == 5
+    # Hourly bars start at the open: 9:30, 10:30, ... 15:30 (a half hour)
+    assert [t.strftime("%H:%M") for t in five_days.index[:7]] == ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    minutes = upstream.full
+    session = minutes[minutes.index.normalize() == one_day.index[0].normalize()]
+    reference = resample_ohlcv(session, pd.Timedelta(minutes=5))
+    assert np.allclose(one_day.to_numpy(), reference.to_numpy())
+    try:
+        cache.get("AAPL", period="1mo", interval="1m")
+        assert False, "minute bars beyond 5d should be rejected"
+    except ValueError:
+        pass
+    print("Intraday pyramid test passed")
+
+def test_chart_range_defaults():
+    assert chart_range() == ("1y", "1d")
+    assert chart_range("5y") == ("5y", "1wk")
+    assert chart_range("5d", "1m") == ("5d", "1m")
+    assert chart_range("1d", "1d") == ("1d", "5m")
+    assert chart_range("1y", "5m") == ("1y", "1d")
+    assert chart_range("forever", None) == ("1y", "1d")
+    print("Chart range test passed")
+
+def test_stock_chart_periods():
+    original = StockService.price_history
+    StockService.price_history = PriceHistoryCache(fetcher=FakeUpstream())
+    try:
+        chart, context = StockService().get_stock_chart("AAPL", period="5y")
+    finally:
+        StockService.price_history = original
+    texts = [c.component.Text.text.literalString for c in chart.data.surfaceUpdate.components if c.component.Text]
+    assert "📈 AAPL Stock Price (5 Years)" in texts
+    price = [c.component.Chart for c in chart.data.surfaceUpdate.components if c.component.Chart][0].series[0]
+    # About 52 weekly bars a year
+    assert 255 <= len(price.data) <= 265
+    assert "1wk bar" in context
+    print("Stock chart period test passed")
+
+if __name__ == "__main__":
+    test_chart_and_indicators_share_one_download()
+    test_returned_frames_are_copies()
+    test_stale_entry_fetches_only_new_bars()
+    test_wider_request_refetches_wider_window()
+    test_memory_bound_evicts_lru()
+    test_stock_service_tools_use_the_shared_cache()
+    test_weekly_and_monthly_bars_are_rolled_up_once()
+    test_intraday_pyramid_from_minute_bars()
+    test_chart_range_defaults()
+    test_stock_chart_periods()
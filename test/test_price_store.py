@@ -0,0 +1,197 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+from app.services.price_history import PriceHistoryCache, period_start
+from app.services.price_store import PriceStore, main
+
+class FakeUpstream:
+    """Synthetic daily bars ending today, recording every history() call."""
+
+    def __init__(self, days=3000):
+        tz = "America/New_York"
+        index = pd.bdate_range(end=pd.Timestamp.now(tz=tz).normalize(), periods=days, tz=tz)
+        close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, len(index)))
+        self.full = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                                  "Volume": np.arange(len(index), dtype=float)}, index=index)
+        self.calls = []
+
+    def __call__(self, symbol, period=None, start=None, interval="1d"):
+        self.calls.append({"symbol": symbol, "period": period, "start": start})
+        frame = self.full
+        if period is not None:
+            begin = period_start(period, pd.Timestamp.now(tz=frame.index.tz))
+            if begin is not None:
+                frame = frame[frame.index >= begin]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return frame.copy()
+
+    def add_bar(self, close):
+        day = self.full.index[-1] + pd.offsets.BDay(1)
+        self.full.loc[day] = [close, close + 1, close - 1, close, 1.0]
+        return day
+
+def test_restart_reads_from_disk():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        first = PriceStore(root, fetcher=upstream).fetch("AAPL", period="1y")
+        restarted = PriceStore(root, fetcher=upstream)
+        again = restarted.fetch("aapl", period="1y")
+        six_months = restarted.fetch("AAPL", period="6mo")
+        assert len(upstream.calls) == 1
+        pd.testing.assert_frame_equal(first, again, check_freq=False)
+        assert str(again.index.tz) == "America/New_York"
+        # Columns are read-only maps of the column files, not parsed copies
+        assert not again["Close"].to_numpy().flags.writeable
+        assert six_months.index[0] >= period_start("6mo", pd.Timestamp.now(tz=again.index.tz))
+        assert restarted.stats()["hits"] == 2
+    print("Restart test passed")
+
+def test_stale_symbol_fetches_only_new_bars():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream, stale_after=0)
+        rows = len(store.fetch("AAPL", period="1y"))
+        # Today's bar was partial; it changes and a new bar is published
+        upstream.full.iloc[-1, upstream.full.columns.get_loc("Close")] = 999.0
+        day = upstream.add_bar(1000.0)
+        refreshed = store.fetch("AAPL", period="1y")
+        assert upstream.calls[-1]["period"] is None and upstream.calls[-1]["start"] is not None
+        assert refreshed.index[-1] == day
+        assert refreshed["Close"].iloc[-2:].tolist() == [999.0, 1000.0]
+        assert not refreshed.index.has_duplicates
+        assert len(store.read("AAPL")) == rows + 1
+        assert store.stats()["delta_fetches"] == 1
+    print("Delta refresh test passed")
+
+def test_delta_refresh_leaves_earlier_reads_unchanged():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream, stale_after=0)
+        before = store.fetch("AAPL", period="1y")
+        expected = before.copy()
+        upstream.full.iloc[-1, upstream.full.columns.get_loc("Close")] = 999.0
+        upstream.add_bar(1000.0)
+        after = store.fetch("AAPL", period="1y")
+        # The revised last bar went to a new generation; the frame read before still maps the old one
+        pd.testing.assert_frame_equal(before, expected)
+        assert after["Close"].iloc[-2] == 999.0 != before["Close"].iloc[-1]
+        assert "g2.time.i8" in os.listdir(os.path.join(root, "1d", "AAPL"))
+    print("Copy-on-write delta test passed")
+
+def test_wider_period_replaces_generation():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream)
+        store.fetch("AAPL", period="1y")
+        store.fetch("AAPL", period="5y")
+        store.fetch("AAPL", period="1y")
+        assert [c["period"] for c in upstream.calls] == ["1y", "5y"]
+        files = sorted(os.listdir(os.path.join(root, "1d", "AAPL")))
+        assert files == ["g2.c0.f8", "g2.c1.f8", "g2.c2.f8", "g2.c3.f8", "g2.c4.f8", "g2.time.i8", "meta.json"]
+    print("Wider period test passed")
+
+def test_minute_bars_are_fetched_within_the_upstream_limit():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream)
+        store.fetch("AAPL", period="1d", interval="1m")
+        # A longer request is capped too, and served from what is stored
+        store.fetch("AAPL", period="1y", interval="1m")
+        assert [c["period"] for c in upstream.calls] == ["5d"]
+        with open(os.path.join(root, "1m", "AAPL", "meta.json")) as f:
+            assert json.load(f)["period"] == "5d"
+    print("Minute bar period test passed")
+
+def test_compact_trims_and_cleans():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream)
+        full = store.fetch("AAPL", period="1y")
+        directory = os.path.join(root, "1d", "AAPL")
+        # Pretend the stored window shrank, and leave junk from a crashed write behind
+        meta_path = os.path.join(directory, "meta.json")
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta["period"] = "6mo"
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        open(os.path.join(directory, "g0.time.i8"), "wb").close()
+        os.makedirs(os.path.join(root, "1d", "BROKEN"))
+
+        result = store.compact()
+        stored = store.read("AAPL")
+        assert result["trimmed_rows"] == len(full) - len(stored) > 0
+        assert result["removed_files"] == 1
+        assert result["bytes_after"] < result["bytes_before"]
+        assert not os.path.exists(os.path.join(root, "1d", "BROKEN"))
+        pd.testing.assert_frame_equal(stored, full.iloc[len(full) - len(stored):], check_freq=False)
+    print("Compaction test passed")
+
+def test_size_cap_evicts_least_recently_read():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        store = PriceStore(root, fetcher=upstream)
+        store.fetch("AAA", period="1y")
+        one_symbol = store.stats()["bytes"]
+        store.max_bytes = int(one_symbol * 2.5)
+        store.fetch("BBB", period="1y")
+        store.fetch("AAA", period="1y")
+        store.fetch("CCC", period="1y")
+        assert store.read("BBB") is None
+        assert store.read("AAA") is not None and store.read("CCC") is not None
+        assert store.stats()["evictions"] == 1
+    print("Size cap test passed")
+
+def test_size_cap_does_not_walk_the_store():
+    upstream = FakeUpstream(days=300)
+    with tempfile.TemporaryDirectory() as root:
+        PriceStore(root, fetcher=upstream).fetch("S00", period="1y")
+        store = PriceStore(root, fetcher=upstream)
+        one_symbol = store.stats()["bytes"]
+        assert store.stats()["symbols"] == 1
+        store.max_bytes = one_symbol * 10
+
+        def no_scan():
+            raise AssertionError("directory scan on write")
+        store._keys = no_scan
+        for i in range(1, 50):
+            store.fetch(f"S{i:02d}", period="1y")
+        stats = store.stats()
+        # meta.json sizes vary by a few bytes (timestamps), so about ten symbols fit
+        assert 9 <= stats["symbols"] <= 10 and stats["bytes"] <= store.max_bytes
+        assert stats["evictions"] == 50 - stats["symbols"]
+        assert len(store._key_locks) == len(PriceStore(root)._key_locks)
+        # A rescan finds what the running total says
+        del store._keys
+        total = stats["bytes"]
+        store.compact()
+        assert store.stats()["bytes"] == total
+    print("Running size total test passed")
+
+def test_memory_cache_on_top_of_store():
+    upstream = FakeUpstream()
+    with tempfile.TemporaryDirectory() as root:
+        PriceHistoryCache(store=PriceStore(root, fetcher=upstream)).get("AAPL", period="6mo")
+        cache = PriceHistoryCache(store=PriceStore(root, fetcher=upstream))
+        hist = cache.get("AAPL", period="1y")
+        assert len(upstream.calls) == 1
+        assert len(hist) > 200
+        assert cache.stats()["store"]["symbols"] == 1
+        main(["compact", "--dir", root])
+    print("Memory cache + store test passed")
+
+if __name__ == "__main__":
+    test_restart_reads_from_disk()
+    test_stale_symbol_fetches_only_new_bars()
+    test_delta_refresh_leaves_earlier_reads_unchanged()
+    test_wider_period_replaces_generation()
+    test_minute_bars_are_fetched_within_the_upstream_limit()
+    test_compact_trims_and_cleans()
+    test_size_cap_evicts_least_recently_read()
+    test_size_cap_does_not_walk_the_store()
+    test_memory_cache_on_top_of_store()
@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.services.llm_wrapper import LLMWrapper
 
@@ -10,7 +11,7 @@ def test_restaurant_finder():
     print("\n--- Testing 'Find Restaurants' ---")
     query = "Find Italian restaurants in Downtown"
     print(f"Query: {query}")
-    processed = llm.process_query(query)
+    processed = asyncio.run(llm.process_query(query))
     print(f"Result: {processed}")
     
     if processed['type'] == 'tool_call' and processed['tool_name'] == 'find_restaurants':
@@ -22,7 +23,7 @@ def test_restaurant_finder():
     print("\n--- Testing 'Reserve Table' ---")
     query = "Book a table for 2 at Bella Italia on 2024-05-20 at 7pm"
     print(f"Query: {query}")
-    processed = llm.process_query(query)
+    processed = asyncio.run(llm.process_query(query))
     print(f"Result: {processed}")
 
     if processed['type'] == 'tool_call' and processed['tool_name'] == 'reserve_table':
@@ -0,0 +1,138 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+import numpy as np
+import pandas as pd
+from app.services import screener
+from app.services.price_history import PriceHistoryCache
+from app.services.agent import StockService
+from app.services.singleflight import normalize_args
+
+def synthetic_frames(count=250, days=140, seed=3):
+    """Random walks; every 10th symbol is listed too recently to screen."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=days, tz="America/New_York")
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        frame = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                              "Volume": rng.uniform(1e6, 2e6, days)}, index=index)
+        frames[f"S{i:03d}"] = frame.iloc[-20:] if i % 10 == 9 else frame
+    return frames
+
+class FakeBulkUpstream:
+    def __init__(self, frames, delay=0.0, slow=()):
+        self.frames, self.delay, self.slow = frames, delay, set(slow)
+        self.calls = 0
+
+    def __call__(self, symbols, period=None, start=None, interval="1d"):
+        self.calls += 1
+        if self.slow & set(symbols):
+            time.sleep(self.delay)
+        return {s: self.frames.get(s, pd.DataFrame()).copy() for s in symbols}
+
+def single_fetch_forbidden(symbol, **kwargs):
+    raise AssertionError(f"per-symbol fetch for {symbol}")
+
+def cache_for(upstream):
+    return PriceHistoryCache(fetcher=single_fetch_forbidden, bulk_fetcher=upstream)
+
+def test_features_match_pandas():
+    frames = synthetic_frames(12)
+    names, panel = screener.tail_panel(frames)
+    values = screener.features(panel)
+    for row, name in enumerate(names):
+        close = frames[name]["Close"].iloc[-screener.SCREEN_BARS:]
+        if len(close) < 120:
+            # Too short for MA120: NaN, which fails any condition on it
+            assert np.isnan(values["ma120"][row])
+            continue
+        assert np.isclose(values["price"][row], close.iloc[-1])
+        assert np.isclose(values["ma60"][row], close.rolling(60).mean().iloc[-1])
+        assert np.isclose(values["ma20_gap"][row], (close.iloc[-1] / close.rolling(20).mean().iloc[-1] - 1) * 100)
+        assert np.isclose(values["return_1m"][row], (close.iloc[-1] / close.iloc[-22] - 1) * 100)
+        volume = frames[name]["Volume"]
+        assert np.isclose(values["volume_ratio"][row], volume.iloc[-1] / volume.iloc[-20:].mean())
+    print("Screener features test passed")
+
+def test_parse_conditions():
+    parsed = screener.parse_conditions(["RSI < 30", {"field": "ma20", "op": ">", "value": "MA60"},
+                                        {"field": "volume_ratio", "op": ">=", "value": "1.5"}])
+    assert parsed == [("rsi", "<", 30.0), ("ma20", ">", "ma60"), ("volume_ratio", ">=", 1.5)]
+    for bad in (["pe < 10"], ["rsi = 30"], [{"field": "rsi", "op": "<", "value": "low"}]):
+        try:
+            screener.parse_conditions(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad}")
+    print("Condition parsing test passed")
+
+def test_screen_filters_and_ranks():
+    frames = synthetic_frames()
+    upstream = FakeBulkUpstream(frames)
+    conditions = screener.parse_conditions(["rsi < 45", "ma20 > ma60"])
+    result = screener.screen(cache_for(upstream), list(frames) + ["GONE"], conditions, limit=10)
+    # Reference: the same conditions with pandas, symbol by symbol
+    expected = {}
+    for name, frame in frames.items():
+        close = frame["Close"]
+        if len(frame) < screener.MIN_BARS:
+            continue
+        delta = close.diff()
+        gain = delta.clip(lower=0).rolling(14).mean()
+        loss = (-delta.clip(upper=0)).rolling(14).mean()
+        rsi = (100 - 100 / (1 + gain / loss)).iloc[-1]
+        if rsi < 45 and close.rolling(20).mean().iloc[-1] > close.rolling(60).mean().iloc[-1]:
+            expected[name] = rsi
+    assert result["requested"] == 251 and result["scanned"] == 225
+    assert sorted(result["skipped"]["no data"]) == sorted(["GONE"] + [s for s, f in frames.items() if len(f) < 30])
+    assert result["matched"] == len(expected) > 10
+    # "<" on the first condition ranks ascending
+    assert [m["symbol"] for m in result["matches"]] == sorted(expected, key=expected.get)[:10]
+    assert result["fields"] == ["price", "change_pct", "rsi", "ma20", "ma60"]
+    assert upstream.calls == 3
+    print(f"Screen test passed: {result['matched']} of {result['scanned']} matched")
+
+def test_screen_stays_within_the_time_budget():
+    frames = synthetic_frames(300)
+    upstream = FakeBulkUpstream(frames, delay=1.5, slow=["S250"])
+    start = time.perf_counter()
+    result = screener.screen(cache_for(upstream), list(frames), screener.parse_conditions(["rsi > 0"]), budget=0.5)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0
+    # The third batch (S200-S299) missed the deadline; the others were screened
+    assert result["skipped"]["time budget"] == [f"S{i:03d}" for i in range(200, 300)]
+    assert result["scanned"] == 180
+    print(f"Time budget test passed ({elapsed:.2f}s)")
+
+def test_screen_stocks_tool():
+    frames = synthetic_frames(30)
+    frames = {symbol: frames[f"S{i:03d}"] for i, symbol in enumerate(screener.UNIVERSES["dow30"])}
+    original = StockService.price_history
+    StockService.price_history = cache_for(FakeBulkUpstream(frames))
+    try:
+        service = StockService()
+        result, context = service.screen_stocks([{"field": "ma20_gap", "op": ">", "value": "-100"}], universe="dow30", limit=5)
+        unknown, _ = service.screen_stocks(["rsi < 30"], universe="nowhere")
+        invalid, _ = service.screen_stocks(["pe < 10"])
+    finally:
+        StockService.price_history = original
+    texts = [c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text]
+    assert "🔎 Stock Screener: Dow 30" in texts and "vs MA20 %" in texts
+    assert any(t.startswith("27 of 27 matched") and "3 no data" in t for t in texts)
+    assert "Top: " in context and "Skipped (no data)" in context
+    assert "Unknown universe" in unknown.text and "Unknown field: pe" in invalid.text
+    # Condition lists are hashable request keys
+    assert normalize_args({"conditions": [{"field": "rsi", "op": "<", "value": "30"}]})
+    print("screen_stocks tool test passed")
+
+if __name__ == "__main__":
+    test_features_match_pandas()
+    test_parse_conditions()
+    test_screen_filters_and_ranks()
+    test_screen_stays_within_the_time_budget()
+    test_screen_stocks_tool()
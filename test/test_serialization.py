@@ -0,0 +1,142 @@
+import sys
+import os
+import json
+from contextlib import contextmanager
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+from fastapi.testclient import TestClient
+from app.api import main
+from app.schemas.models import A2UIResponse, TrustedA2UIResponse
+from app.schemas.encoding import encode_response, dumps
+from app.services import surfaces
+from app.services.chart_series import DEFAULT_CHART_POINTS
+
+LOAN = {"principal": 250000.0, "rate": 4.0, "years": 20, "monthly": 1514.95, "total": 363588.0, "interest": 113588.0}
+
+@contextmanager
+def surface_mode(strict):
+    previous = os.environ.get("A2UI_STRICT_SURFACES")
+    os.environ["A2UI_STRICT_SURFACES"] = "1" if strict else "0"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["A2UI_STRICT_SURFACES"]
+        else:
+            os.environ["A2UI_STRICT_SURFACES"] = previous
+
+class FakeLLM:
+    async def process_query(self, text):
+        return {"type": "multiple_tool_calls", "calls": [
+            {"tool_name": "calculate_loan", "tool_args": {"principal": 100000, "rate": 5, "years": 10}},
+            {"tool_name": "reserve_table", "tool_args": {"restaurant_name": 'Joe\'s "Diner"', "date": "2026-10-20", "guests": 2}},
+        ]}
+
+    async def answer_with_context_stream(self, user_query, context_items):
+        yield "ok"
+
+def post_with_fake_llm(path):
+    original = main.llm
+    main.llm = FakeLLM()
+    try:
+        return TestClient(main.app).post(path, json={"text": "loan and table"}, headers={"X-Client-A2UI": "true"})
+    finally:
+        main.llm = original
+
+def test_trusted_and_strict_encode_the_same_json():
+    with surface_mode(strict=False):
+        trusted = surfaces.loan_result(uid="u1", **LOAN)
+    with surface_mode(strict=True):
+        strict = surfaces.loan_result(uid="u1", **LOAN)
+    assert isinstance(trusted, TrustedA2UIResponse)
+    assert type(strict) is A2UIResponse
+    assert json.loads(encode_response(trusted)) == json.loads(encode_response(strict)) == strict.model_dump()
+    # Trusted results are encoded once and reused
+    assert encode_response(trusted) is encode_response(trusted)
+    print("Trusted/strict encoding test passed")
+
+def test_trusted_dump_is_a_copy():
+    with surface_mode(strict=False):
+        trusted = surfaces.loan_result(uid="u1", **LOAN)
+    expected = trusted.model_dump()
+    # Callers modify what they get (the /chat dashboard merge); the shared result is untouched
+    dumped = trusted.model_dump(mode="json")
+    dumped["data"]["surfaceUpdate"]["components"].clear()
+    dumped["data"]["beginRendering"]["root"] = "dashboard"
+    assert trusted.model_dump() == expected
+    assert json.loads(encode_response(trusted)) == expected
+    # Options that would change the output are refused rather than ignored
+    for options in ({"exclude": {"kind"}}, {"include": {"data"}}, {"exclude_none": True}):
+        try:
+            trusted.model_dump(**options)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError(options)
+    assert trusted.model_dump(exclude=None, exclude_none=False, by_alias=True) == expected
+    print("Trusted dump copy test passed")
+
+def test_encoder_output_is_compact_utf8():
+    encoded = dumps({"text": "삼성전자 \"quote\"\n"})
+    assert encoded == '{"text":"삼성전자 \\"quote\\"\\n"}'.encode("utf-8")
+    print("Encoder test passed")
+
+def test_chat_writes_pre_encoded_dashboard():
+    for strict in (False, True):
+        with surface_mode(strict):
+            response = post_with_fake_llm("/chat")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        # Whatever the mode, the body is a valid A2UIResponse
+        merged = A2UIResponse.model_validate(response.json())
+        assert merged.data.surfaceUpdate.surfaceId == "dashboard"
+        roots = [c for c in merged.data.surfaceUpdate.components if c.id == merged.data.beginRendering.root]
+        assert len(roots[0].component.Column.children.explicitList) == 2
+        texts = [c.component.Text.text.literalString for c in merged.data.surfaceUpdate.components if c.component.Text]
+        assert '📍 Joe\'s "Diner"' in texts
+        assert merged.data.dataModelUpdate.contents[0].key == "calculator"
+    print("/chat encoding test passed")
+
+def test_stream_frames_are_valid_json():
+    with surface_mode(strict=False):
+        response = post_with_fake_llm("/chat/stream")
+    frames = [block.split("data: ", 1)[1] for block in response.text.split("\n\n") if block.startswith("event: a2ui")]
+    assert len(frames) == 2
+    for frame in frames:
+        A2UIResponse.model_validate(json.loads(frame))
+    assert "event: done" in response.text
+    print("/chat/stream encoding test passed")
+
+def test_chart_options_reach_tools():
+    seen = []
+
+    async def fake_dispatch(tool_name, args, services, is_ui_mode=True, chart_columns=False, chart_points=None):
+        seen.append((chart_columns, chart_points))
+        return surfaces.loan_result(**LOAN), "ok"
+
+    cases = [
+        ({}, None, (False, DEFAULT_CHART_POINTS)),
+        ({"X-A2UI-Capabilities": "markdown, Chart-Columns", "X-A2UI-Chart-Points": "733"}, None, (True, 700)),
+        ({}, {"chart_points": 260}, (False, 250)),
+    ]
+    original = main._dispatch_tool_call
+    main._dispatch_tool_call = fake_dispatch
+    try:
+        for headers, client_context, expected in cases:
+            main.llm, llm = FakeLLM(), main.llm
+            try:
+                TestClient(main.app).post("/chat/stream", json={"text": "loan", "client_context": client_context}, headers=headers)
+            finally:
+                main.llm = llm
+            assert seen[-1] == expected
+    finally:
+        main._dispatch_tool_call = original
+    print("Chart options test passed")
+
+if __name__ == "__main__":
+    test_trusted_and_strict_encode_the_same_json()
+    test_trusted_dump_is_a_copy()
+    test_encoder_output_is_compact_utf8()
+    test_chat_writes_pre_encoded_dashboard()
+    test_stream_frames_are_valid_json()
+    test_chart_options_reach_tools()
@@ -0,0 +1,99 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.singleflight import SingleFlight, normalize_args
+
+def test_normalize_args():
+    assert normalize_args({"symbol": " aapl "}) == normalize_args({"symbol": "AAPL"})
+    assert normalize_args({"guests": 2}) == normalize_args({"guests": 2.0})
+    assert normalize_args({"location": "강남", "keyword": None}) == normalize_args({"location": "강남"})
+    assert normalize_args({"symbol": "AAPL"}) != normalize_args({"symbol": "MSFT"})
+    print("normalize_args test passed")
+
+def test_list_valued_args_make_hashable_keys():
+    # Screener conditions: a list of dicts, with lists inside them
+    conditions = [{"indicator": "RSI", "op": "<", "value": 30, "universe": [" aapl", "MSFT"]},
+                  {"indicator": "sma", "window": [20, 50], "nested": [[1, 2], {"x": [3]}]}]
+    key = ("screen_stocks", normalize_args({"conditions": conditions, "symbols": ["AAPL", "msft"]}))
+    hash(key)
+    respelled = [{"indicator": "rsi", "op": "<", "value": 30.0, "universe": ["AAPL", "msft"]},
+                 {"indicator": "SMA", "window": [20.0, 50.0], "nested": [(1, 2), {"x": (3,)}]}]
+    assert key == ("screen_stocks", normalize_args({"symbols": ("aapl", "MSFT"), "conditions": respelled}))
+
+    async def fetch():
+        return "rows"
+
+    async def run():
+        return await SingleFlight().do(key, fetch)
+    assert asyncio.run(run()) == "rows"
+    print("List-valued args test passed")
+
+def test_concurrent_identical_calls_share_one_fetch():
+    async def run():
+        flight = SingleFlight()
+        upstream_calls = []
+
+        async def fetch(symbol):
+            upstream_calls.append(symbol)
+            await asyncio.sleep(0.05)
+            return {"symbol": symbol}
+
+        def call(symbol):
+            key = ("get_stock_chart", normalize_args({"symbol": symbol}))
+            return flight.do(key, lambda: fetch(symbol.upper()))
+
+        results = await asyncio.gather(*[call("aapl") for _ in range(20)], call("MSFT"))
+        return flight, upstream_calls, results
+
+    flight, upstream_calls, results = asyncio.run(run())
+    assert sorted(upstream_calls) == ["AAPL", "MSFT"]
+    # All AAPL waiters got the very same result object
+    assert all(r is results[0] for r in results[:20])
+    stats = flight.stats()
+    assert stats["calls"] == 21
+    assert stats["executions"] == 2
+    assert stats["merged"] == 19
+    assert stats["merged_by_tool"] == {"get_stock_chart": 19}
+    assert stats["in_flight"] == 0
+    print("Single-flight coalescing test passed")
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    async def run():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "ok"
+    print("Cancellation isolation test passed")
+
+def test_finished_calls_are_not_cached():
+    async def run():
+        flight = SingleFlight()
+        counter = {"n": 0}
+
+        async def fetch():
+            counter["n"] += 1
+            return counter["n"]
+
+        first = await flight.do("k", fetch)
+        second = await flight.do("k", fetch)
+        return first, second
+
+    assert asyncio.run(run()) == (1, 2)
+    print("No-cache test passed")
+
+if __name__ == "__main__":
+    test_normalize_args()
+    test_list_valued_args_make_hashable_keys()
+    test_concurrent_identical_calls_share_one_fetch()
+    test_cancelled_waiter_does_not_cancel_shared_fetch()
+    test_finished_calls_are_not_cached()
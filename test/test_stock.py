@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.services.llm_wrapper import LLMWrapper
 
@@ -10,7 +11,7 @@ def test_stock_chart():
     print("\n--- Testing 'Get Stock Chart' ---")
     query = "Show me the stock chart for NVDA"
     print(f"Query: {query}")
-    processed = llm.process_query(query)
+    processed = asyncio.run(llm.process_query(query))
     print(f"Result: {processed}")
     
     if processed['type'] == 'tool_call' and processed['tool_name'] == 'get_stock_chart':
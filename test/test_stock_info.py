@@ -1,6 +1,7 @@
 
 import sys
 import os
+import asyncio
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.services.llm_wrapper import LLMWrapper
 
@@ -10,7 +11,7 @@ def test_stock_info():
     print("\n--- Testing 'Get Stock Info' ---")
     query = "Analyze Apple stock and show me the profile"
     print(f"Query: {query}")
-    processed = llm.process_query(query)
+    processed = asyncio.run(llm.process_query(query))
     print(f"Result: {processed}")
     
     if processed['type'] == 'multiple_tool_calls':
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import json
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+from fastapi.testclient import TestClient
+from app.api import main
+from app.schemas.models import A2UIResponse, A2UIData, BeginRendering
+
+# Per-tool latency in seconds; the slowest call is listed first on purpose
+TOOL_DELAYS = {"get_stock_chart": 0.6, "get_company_fundamentals": 0.3, "find_places": 0.05}
+
+class FakeLLM:
+    def __init__(self):
+        self.received_context = None
+
+    async def process_query(self, text):
+        return {
+            "type": "multiple_tool_calls",
+            "calls": [{"tool_name": name, "tool_args": {}} for name in TOOL_DELAYS],
+        }
+
+    async def answer_with_context_stream(self, user_query, context_items):
+        self.received_context = list(context_items)
+        yield "done"
+
+async def fake_execute_tool_call(tool_name, args, services, is_ui_mode=True, chart_columns=False, chart_points=None):
+    await asyncio.sleep(TOOL_DELAYS[tool_name])
+    res = A2UIResponse(data=A2UIData(beginRendering=BeginRendering(surfaceId=tool_name, root="root")))
+    return res, f"context from {tool_name}"
+
+def read_a2ui_surfaces(body):
+    surfaces = []
+    for block in body.split("\n\n"):
+        if block.startswith("event: a2ui"):
+            data = json.loads(block.split("data: ", 1)[1])
+            surfaces.append(data["data"]["beginRendering"]["surfaceId"])
+    return surfaces
+
+def test_stream_runs_tools_concurrently():
+    fake_llm = FakeLLM()
+    original_llm, original_execute = main.llm, main.execute_tool_call
+    main.llm = fake_llm
+    main.execute_tool_call = fake_execute_tool_call
+    try:
+        client = TestClient(main.app)
+        start = time.perf_counter()
+        response = client.post("/chat/stream", json={"text": "dashboard"})
+        elapsed = time.perf_counter() - start
+    finally:
+        main.llm, main.execute_tool_call = original_llm, original_execute
+
+    assert response.status_code == 200
+    # Total latency tracks the slowest tool, not the sum (0.95s)
+    assert elapsed < 0.85, f"stream took {elapsed:.2f}s"
+    # A2UI events arrive in completion order
+    assert read_a2ui_surfaces(response.text) == ["find_places", "get_company_fundamentals", "get_stock_chart"]
+    # The final answer still sees contexts in call order
+    assert fake_llm.received_context == [f"context from {name}" for name in TOOL_DELAYS]
+    print("Stream concurrency test passed")
+
+def test_chat_bounds_concurrent_tools():
+    running, peak = 0, 0
+
+    async def counting_execute_tool_call(tool_name, args, services, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        res = A2UIResponse(data=A2UIData(beginRendering=BeginRendering(surfaceId=tool_name, root="root")))
+        return res, f"context from {tool_name}"
+
+    class ManyCallsLLM(FakeLLM):
+        async def process_query(self, text):
+            calls = [{"tool_name": f"tool_{i}", "tool_args": {}} for i in range(main.MAX_CONCURRENT_TOOLS * 3)]
+            return {"type": "multiple_tool_calls", "calls": calls}
+
+    original_llm, original_execute = main.llm, main.execute_tool_call
+    main.llm = ManyCallsLLM()
+    main.execute_tool_call = counting_execute_tool_call
+    try:
+        response = TestClient(main.app).post("/chat", json={"text": "dashboard"})
+    finally:
+        main.llm, main.execute_tool_call = original_llm, original_execute
+
+    assert response.status_code == 200
+    assert peak == main.MAX_CONCURRENT_TOOLS
+    print("Chat concurrency bound test passed")
+
+if __name__ == "__main__":
+    test_stream_runs_tools_concurrently()
+    test_chat_bounds_concurrent_tools()
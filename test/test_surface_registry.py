@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+from fastapi.testclient import TestClient
+from app.services import surfaces
+from app.services.surface_registry import SurfaceRegistry
+from app.schemas.encoding import to_wire, encode_response
+from app.api import main
+
+def products(count, price=1000):
+    items = [{"title": f"Keyboard {i}", "link": f"https://shop/{i}", "image": f"https://img/{i}.jpg",
+              "mallName": "Mall", "lprice": f"{price * i:,}"} for i in range(1, count + 1)]
+    return to_wire(surfaces.product_list("keyboard", items))["data"]
+
+def test_refresh_sends_only_changed_components():
+    registry = SurfaceRegistry()
+    first = products(5)
+    root = first["beginRendering"]["root"]
+    assert registry.update("s1", first) is None
+
+    # Same products, one new price: only that text, under the ids the client holds
+    second = products(5)
+    second["surfaceUpdate"]["components"][-2]["component"]["Text"]["text"]["literalString"] = "₩9,999"
+    diff = registry.update("s1", second, root=root)
+    assert diff["beginRendering"] is None and diff["surfaceUpdate"]["removed"] == []
+    assert [c["id"] for c in diff["surfaceUpdate"]["components"]] == [root.replace("root", "price_3_1")]
+
+    # Two products fewer: the count text, root column and last row change, the third row's components go
+    diff = registry.update("s1", products(3), root=root)
+    changed = {c["id"].split("_", 1)[1] for c in diff["surfaceUpdate"]["components"]}
+    assert changed == {"root", "result_count", "row_2"}
+    assert sorted(i.split("_", 1)[1] for i in diff["surfaceUpdate"]["removed"]) == sorted(
+        ["row_3", "item_col_2_2", "image_2_2", "name_2_2", "price_2_2", "mall_2_2",
+         "item_col_3_1", "image_3_1", "name_3_1", "price_3_1", "mall_3_1"])
+    print("Diff test passed")
+
+def test_unknown_or_stale_surfaces_are_sent_in_full():
+    registry = SurfaceRegistry(max_entries=2)
+    first = products(2)
+    registry.update("s1", first)
+    root = first["beginRendering"]["root"]
+    # Another session, or a root the session does not hold
+    assert registry.update("s2", products(2), root=root) is None
+    assert registry.update("s1", products(2), root="other_root") is None
+    registry.update("s3", products(2))
+    stats = registry.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 2 and stats["diffs"] == 0
+    print("Full response test passed")
+
+def test_widgets_with_the_same_surface_id_are_kept_apart():
+    registry = SurfaceRegistry()
+    first, second = products(2), products(4)
+    registry.update("s1", first)
+    registry.update("s1", second)
+    # Refreshing the first widget diffs against its own tree, under its own ids
+    diff = registry.update("s1", products(3), root=first["beginRendering"]["root"])
+    uid = first["beginRendering"]["root"].split("_")[0]
+    assert diff["surfaceUpdate"]["removed"] == []
+    assert all(c["id"].startswith(uid + "_") for c in diff["surfaceUpdate"]["components"])
+    # The second widget's baseline is untouched: the same content is no change at all
+    diff = registry.update("s1", products(4), root=second["beginRendering"]["root"])
+    assert diff["surfaceUpdate"] is None and diff["dataModelUpdate"] is None
+    print("Same surface id test passed")
+
+def test_partial_updates_are_merged():
+    registry = SurfaceRegistry()
+    first = to_wire(surfaces.loan_result(300000, 6.5, 30, 1896.20, 682633.47, 382633.47, uid="u1"))["data"]
+    registry.update("s1", first)
+    update = to_wire(surfaces.loan_update("loan_calculator", "u1", 200000, 5, 15, 1581.59, 284685.71, 84685.71))["data"]
+    assert registry.update("s1", update, root="u1_root") is None
+    # Refreshing to those same values afterwards: the bound "loan" values are already current,
+    # only the inputs changed (the texts' literal fallbacks differ but are not resent)
+    again = to_wire(surfaces.loan_result(200000, 5, 15, 1581.59, 284685.71, 84685.71, uid="u2"))["data"]
+    diff = registry.update("s1", again, root="u1_root")
+    assert [c["key"] for c in diff["dataModelUpdate"]["contents"]] == ["calculator"]
+    assert diff["surfaceUpdate"] is None
+    print("Partial update test passed")
+
+def test_refresh_endpoint_returns_a_diff():
+    client = TestClient(main.app)
+    headers = {"X-Client-A2UI": "true", "X-A2UI-Session": "test-session"}
+    call = {"tool_name": "calculate_loan", "tool_args": {"principal": 300000, "rate": 6.5, "years": 30}}
+    # The widget as /chat/stream recorded it
+    first, _ = asyncio.run(main.execute_tool_call(call["tool_name"], call["tool_args"], main.services))
+    root = to_wire(first)["data"]["beginRendering"]["root"]
+    main.surface_registry.update("test-session", to_wire(first)["data"])
+
+    refresh = client.post("/surface/refresh", headers=headers, json={
+        "tool_name": "calculate_loan", "tool_args": {"principal": 300000, "rate": 6.5, "years": 20}, "surface_root": root})
+    diff = refresh.json()["data"]
+    assert diff["beginRendering"] is None
+    assert {c["id"] for c in diff["surfaceUpdate"]["components"]} == {root.replace("root", "schedule_chart")}
+    print(f"Full {len(encode_response(first))} bytes, refresh {len(refresh.content)} bytes")
+    assert len(refresh.content) < len(encode_response(first)) / 2
+    assert main.surface_registry.stats()["diffs"] >= 1
+
+    # Side-effecting tools are never re-run
+    reserve = {"tool_name": "reserve_table", "tool_args": {}, "surface_root": root}
+    assert client.post("/surface/refresh", headers=headers, json=reserve).status_code == 400
+    print("Refresh endpoint test passed")
+
+def test_stream_events_carry_their_tool_call():
+    first, _ = asyncio.run(main.execute_tool_call("calculate_loan", {"principal": 1000, "rate": 5, "years": 1}, main.services))
+    event = main.a2ui_event(first, "calculate_loan", {"principal": 1000, "rate": 5, "years": 1})
+    assert event.startswith(b"event: a2ui\ndata: ") and event.endswith(b"\n\n")
+    payload = json.loads(event[len(b"event: a2ui\ndata: "):])
+    assert payload["tool"] == {"name": "calculate_loan", "args": {"principal": 1000, "rate": 5, "years": 1}}
+    assert payload["kind"] == "a2ui" and payload["data"] == to_wire(first)["data"]
+    print("Stream event test passed")
+
+if __name__ == "__main__":
+    test_refresh_sends_only_changed_components()
+    test_unknown_or_stale_surfaces_are_sent_in_full()
+    test_partial_updates_are_merged()
+    test_widgets_with_the_same_surface_id_are_kept_apart()
+    test_refresh_endpoint_returns_a_diff()
+    test_stream_events_carry_their_tool_call()
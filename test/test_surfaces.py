@@ -0,0 +1,126 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+from jinja2 import Environment, FileSystemLoader
+from app.schemas.models import A2UIResponse, A2UIData
+from app.services import surfaces
+from app.services.agent import RestaurantService, LoanCalculatorService
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "templates")
+UID = "abcd1234"
+
+PLACES = [
+    {"name": "Cafe A", "category": "카페", "location": "서울 강남구 1", "lat": 37.5, "lng": 127.03},
+    {"name": "Cafe B", "category": "디저트", "location": "서울 강남구 2", "lat": 37.51, "lng": 127.04},
+]
+SERIES = [
+    {"name": "Price", "color": "#0F9D58", "data": [{"time": "2026-01-02", "value": 101.5}, {"time": "2026-01-05", "value": 102.25}]},
+    {"name": "MA20", "color": "#FF6B6B", "data": [{"time": "2026-01-05", "value": 101.875}]},
+]
+
+# template file -> (surface function, template context); builder kwargs are the same except where renamed
+CASES = {
+    "loan_result.json.j2": (surfaces.loan_result, {
+        "principal": 300000.0, "rate": 4.5, "years": 30, "monthly": 1520.06, "total": 547221.6, "interest": 247221.6}),
+    "place_list.json.j2": (surfaces.place_list, {
+        "places": PLACES, "location": "강남", "keyword": "카페", "maps_api_key": "maps-key"}),
+    "restaurant_list.json.j2": (surfaces.restaurant_list, {
+        "restaurants": [dict(p, cuisine=p["category"]) for p in PLACES], "location": "Downtown", "maps_api_key": ""}),
+    "reservation_confirmed.json.j2": (surfaces.reservation_confirmed, {
+        "restaurant_name": "Bella Italia", "date": "2026-10-20", "guests": 2}),
+    "product_list.json.j2": (surfaces.product_list, {
+        "query": "키보드", "items": [
+            {"title": f"Keyboard {i}", "link": f"https://shop/{i}", "image": f"https://img/{i}.jpg", "mallName": "Mall", "lprice": f"{i * 1000:,}"}
+            for i in range(1, 6)]}),
+    "stock_chart.json.j2": (surfaces.stock_chart, {
+        "symbol": "AAPL", "series": SERIES, "current_price": "$102.25"}),
+    "stock_dividends.json.j2": (surfaces.stock_dividends, {
+        "symbol": "AAPL", "dividends": [{"time": "2025-11-10", "value": 0.26}], "yield": "0.41%"}),
+    "stock_holders.json.j2": (surfaces.stock_holders, {
+        "symbol": "AAPL", "insider_pct": "1.70%", "inst_pct": "62.10%", "top_holders": [
+            {"name": "Vanguard", "shares": "1,000", "value": "$2,000", "pct": "1.00%"},
+            {"name": "BlackRock", "shares": "900", "value": "$1,800", "pct": "-0.50%"}]}),
+    "stock_calendar.json.j2": (surfaces.stock_calendar, {
+        "symbol": "AAPL", "events": [{"name": "Earnings Date", "value": "2026-10-30"}, {"name": "Ex-Dividend Date", "value": "2026-11-10"}]}),
+    "stock_news.json.j2": (surfaces.stock_news, {
+        "symbol": "AAPL", "news_list": [
+            {"title": "Apple beats estimates", "link": "https://news/1", "publisher": "Reuters", "date": "2026-10-15 09:00"},
+            {"title": "iPhone sales", "link": "https://news/2", "publisher": "Bloomberg", "date": "2026-10-14 18:30"}]}),
+    "stock_info.json.j2": (surfaces.stock_info, {
+        "symbol": "AAPL",
+        "profile": {"name": "Apple Inc.", "sector": "Technology", "industry": "Consumer Electronics", "summary": "Designs phones.", "website": "#"},
+        "financials": {"marketCap": "$3500.00B", "trailingPE": 35.2, "dividendYield": "0.41%", "fiftyTwoWeekHigh": 260.1,
+                       "fiftyTwoWeekLow": 169.2, "targetMeanPrice": 250, "recommendationKey": "Buy"}}),
+    "stock_indicators.json.j2": (surfaces.stock_indicators, {
+        "symbol": "AAPL", "rsi": {"value": "55.2", "signal": "Neutral", "color": "#eab308"},
+        "macd": {"line": "1.20", "signal_line": "0.80", "histogram": "0.40", "signal": "Bullish Trend", "color": "#22c55e"},
+        "price": "$102.25", "date": "2026-10-15"}),
+    "stock_fundamentals.json.j2": (surfaces.stock_fundamentals, {
+        "symbol": "AAPL",
+        "financials": [{"year": "2025", "revenue": "$400.0B", "net_income": "$100.0B"}, {"year": "2024", "revenue": "$390.0B", "net_income": "$95.0B"}],
+        "holders": {"insiders": "1.7%", "institutions": "62.1%"},
+        "recommendations": [{"label": "Strong Buy", "count": 10}, {"label": "Hold", "count": 5}]}),
+}
+RENAMED = {"yield": "dividend_yield"}
+
+def render_template(name, context):
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    rendered = env.get_template(name).render(uid=UID, **context)
+    return A2UIResponse(data=A2UIData(**json.loads(rendered)))
+
+def test_builder_matches_every_template():
+    assert sorted(CASES) == sorted(os.listdir(TEMPLATES_DIR))
+    for name, (build, context) in CASES.items():
+        expected = render_template(name, context)
+        built = build(uid=UID, **{RENAMED.get(k, k): v for k, v in context.items()})
+        assert built.model_dump() == expected.model_dump(), name
+        assert built.model_dump(exclude_unset=True) == expected.model_dump(exclude_unset=True), name
+    print(f"Parity test passed for {len(CASES)} templates")
+
+def test_trusted_surfaces_match_strict():
+    for name, (build, context) in CASES.items():
+        kwargs = {RENAMED.get(k, k): v for k, v in context.items()}
+        os.environ["A2UI_STRICT_SURFACES"] = "0"
+        try:
+            trusted = build(uid=UID, **kwargs)
+        finally:
+            os.environ["A2UI_STRICT_SURFACES"] = "1"
+        assert trusted.model_dump() == build(uid=UID, **kwargs).model_dump(), name
+    print("Trusted surface test passed")
+
+def test_text_is_not_escaped_by_hand():
+    title = 'Apple says "record" quarter \\ new high'
+    result = surfaces.stock_news(symbol="AAPL", news_list=[{"title": title, "link": "#", "publisher": 'The "Street"', "date": ""}])
+    texts = {c.id: c.component.Text.text.literalString for c in result.data.surfaceUpdate.components if c.component.Text}
+    assert texts[f"{result.data.beginRendering.root[:-5]}_news_title_1"] == title
+    assert 'The "Street"' in texts.values()
+    reservation, _ = RestaurantService().reserve_table('Joe\'s "Diner"', "2026-10-20", 2)
+    assert isinstance(reservation, A2UIResponse)
+    print("Escaping test passed")
+
+def test_empty_lists_build_valid_surfaces():
+    # The templates produced a trailing comma (invalid JSON) for these
+    calendar = surfaces.stock_calendar(symbol="AAPL", events=[])
+    fundamentals = surfaces.stock_fundamentals(symbol="AAPL", financials=[], holders={"insiders": "N/A", "institutions": "N/A"}, recommendations=[])
+    for result in (calendar, fundamentals):
+        assert isinstance(result, A2UIResponse)
+        assert result.data.surfaceUpdate.components[0].id == result.data.beginRendering.root
+    print("Empty list test passed")
+
+def test_render_falls_back_to_text():
+    result = surfaces.render(surfaces.stock_chart, symbol="AAPL", series=[{"name": "Price", "data": [{"time": "x", "value": "nan?"}]}], current_price="-")
+    assert result.kind == "text"
+    assert "Error rendering UI" in result.text
+    loan, _ = LoanCalculatorService().calculate_loan(100000, 5, 10, is_ui_mode=True)
+    assert loan.data.dataModelUpdate.contents[0].valueMap[0].valueString == "100000"
+    print("Render fallback test passed")
+
+if __name__ == "__main__":
+    test_builder_matches_every_template()
+    test_trusted_surfaces_match_strict()
+    test_text_is_not_escaped_by_hand()
+    test_empty_lists_build_valid_surfaces()
+    test_render_falls_back_to_text()
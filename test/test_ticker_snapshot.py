@@ -0,0 +1,142 @@
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Typed access to the built components needs validated (strict) surfaces
+os.environ.setdefault("A2UI_STRICT_SURFACES", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+import pandas as pd
+from app.services.ticker_snapshot import SnapshotCache, next_quarter_start, next_earnings_date
+from app.services.agent import StockService
+
+NOW = pd.Timestamp("2025-05-20 15:00", tz="UTC").timestamp()
+
+class Clock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class FakeTicker:
+    """Counts upstream downloads per data family, shared by every instance."""
+    downloads = []
+    delay = 0.0
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def _download(self, family, value):
+        time.sleep(self.delay)
+        self.downloads.append((self.symbol, family))
+        return value
+
+    @property
+    def info(self):
+        return self._download("info", {
+            "longName": "Apple Inc.", "sector": "Technology", "industry": "Consumer Electronics",
+            "longBusinessSummary": "Designs phones.", "website": "https://apple.com",
+            "marketCap": 3.0e12, "trailingPE": 30.5, "dividendYield": 0.005,
+            "heldPercentInsiders": 0.02, "heldPercentInstitutions": 0.6, "recommendationKey": "buy",
+        })
+
+    @property
+    def dividends(self):
+        index = pd.date_range("2024-01-01", periods=8, freq="QS", tz="America/New_York")
+        return self._download("dividends", pd.Series([0.24] * 8, index=index))
+
+    @property
+    def institutional_holders(self):
+        return self._download("institutional_holders", pd.DataFrame(
+            {"Holder": ["Vanguard"], "Shares": [1_300_000_000], "Value": [2.6e11], "pctChange": [0.01]}))
+
+    @property
+    def calendar(self):
+        return self._download("calendar", {"Earnings Date": [pd.Timestamp("2025-07-31").date()], "Dividend Date": pd.Timestamp("2025-05-15").date()})
+
+    @property
+    def financials(self):
+        return self._download("financials", pd.DataFrame())
+
+def snapshots(clock):
+    FakeTicker.downloads = []
+    return SnapshotCache(ticker_factory=FakeTicker, clock=clock)
+
+def test_dashboard_downloads_info_once():
+    clock = Clock()
+    original = StockService.snapshots
+    StockService.snapshots = snapshots(clock)
+    try:
+        service = StockService()
+        service.get_stock_info("aapl")
+        service.get_stock_holders("AAPL")
+        service.get_stock_dividends("AAPL")
+        holders, _ = service.get_stock_holders("AAPL")
+        assert FakeTicker.downloads == [("AAPL", "info"), ("AAPL", "institutional_holders"), ("AAPL", "dividends")]
+        texts = [c.component.Text.text.literalString for c in holders.data.surfaceUpdate.components if c.component.Text]
+        assert "• Insiders: 2.00%" in texts
+
+        # Two minutes later the price fields are stale; ownership and the profile are not
+        clock.now += 120
+        service.get_stock_holders("AAPL")
+        assert len(FakeTicker.downloads) == 3
+        service.get_stock_info("AAPL")
+        assert FakeTicker.downloads[-1] == ("AAPL", "info") and len(FakeTicker.downloads) == 4
+        service.get_stock_dividends("AAPL")
+        assert len(FakeTicker.downloads) == 4
+        # Dividends are kept for a day
+        clock.now += 86400
+        service.get_stock_dividends("AAPL")
+        assert FakeTicker.downloads[-2:] == [("AAPL", "dividends"), ("AAPL", "info")]
+    finally:
+        StockService.snapshots = original
+    print("Dashboard snapshot test passed")
+
+def test_quarterly_data_expires_after_next_earnings():
+    now = pd.Timestamp(NOW, unit="s", tz="UTC")
+    assert next_quarter_start(now) == pd.Timestamp("2025-07-01", tz="UTC")
+    assert next_earnings_date({"Earnings Date": [pd.Timestamp("2025-04-30").date(), pd.Timestamp("2025-07-31").date()]}, now) == pd.Timestamp("2025-07-31", tz="UTC")
+
+    clock = Clock()
+    cache = snapshots(clock)
+    snapshot = cache.get("AAPL")
+    snapshot.get("financials")
+    # No calendar cached: kept until the quarter turns
+    clock.now = pd.Timestamp("2025-06-30 23:00", tz="UTC").timestamp()
+    snapshot.get("financials")
+    assert FakeTicker.downloads.count(("AAPL", "financials")) == 1
+    clock.now = pd.Timestamp("2025-07-01 01:00", tz="UTC").timestamp()
+    snapshot.get("calendar")
+    snapshot.get("financials")
+    assert FakeTicker.downloads.count(("AAPL", "financials")) == 2
+    # With the calendar cached: kept until the day after the next earnings date
+    clock.now = pd.Timestamp("2025-07-31 12:00", tz="UTC").timestamp()
+    snapshot.get("financials")
+    assert FakeTicker.downloads.count(("AAPL", "financials")) == 2
+    clock.now = pd.Timestamp("2025-08-01 01:00", tz="UTC").timestamp()
+    snapshot.get("financials")
+    assert FakeTicker.downloads.count(("AAPL", "financials")) == 3
+    print("Quarterly expiry test passed")
+
+def test_concurrent_tools_share_one_download():
+    cache = snapshots(Clock())
+    FakeTicker.delay = 0.05
+    try:
+        threads = [threading.Thread(target=cache.get("AAPL").info, args=(group,))
+                   for group in ("profile", "price", "ownership", "analyst")]
+        threads.append(threading.Thread(target=cache.get("AAPL").get, args=("dividends",)))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        FakeTicker.delay = 0.0
+    assert sorted(FakeTicker.downloads) == [("AAPL", "dividends"), ("AAPL", "info")]
+    assert cache.stats()["fetches"] == 2 and cache.stats()["hits"] == 3
+    print("Concurrent snapshot test passed")
+
+if __name__ == "__main__":
+    test_dashboard_downloads_info_once()
+    test_quarterly_data_expires_after_next_earnings()
+    test_concurrent_tools_share_one_download()